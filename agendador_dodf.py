@@ -0,0 +1,374 @@
+import hashlib
+import os
+import smtplib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from dodf import datas_do_periodo
+from localizador import Localizador, normalizar_nome
+from rastreamento import span
+
+ESTADO_DB = os.environ.get('DODF_ESTADO', 'dodf_estado.db')
+
+# Intervalo entre duas verificações do agendador
+INTERVALO_VERIFICACAO = int(os.environ.get('DODF_INTERVALO_MIN', '30')) * 60
+
+# Quantos dias para trás cada verificação revisita (dias cuja leitura falhou
+# ou em que o agendador ficou parado)
+DIAS_RECUPERACAO = 7
+
+# Datas listadas (e edições baixadas) por vez no preenchimento de períodos
+DATAS_POR_LOTE = 7
+
+
+def _data_iso(data):
+    return datetime.strptime(data, '%d/%m/%Y').strftime('%Y-%m-%d')
+
+
+def _data_br(data):
+    return datetime.strptime(data, '%Y-%m-%d').strftime('%d/%m/%Y')
+
+
+def _agora():
+    """
+    Data e hora atuais em texto, no formato que o adaptador padrão do
+    sqlite3 (obsoleto desde o Python 3.12) gravava nas colunas TIMESTAMP
+    """
+    return datetime.now().isoformat(sep=' ')
+
+
+def assinatura_termos(nomes, tombamentos=None):
+    """
+    Identifica a lista de termos monitorados. Uma edição verificada com
+    outra lista (um nome novo, por exemplo) é verificada de novo.
+    """
+    termos = sorted({normalizar_nome(nome) for nome in nomes})
+    if tombamentos is True:
+        termos.append('#tombamentos')
+    elif tombamentos:
+        termos.extend('#' + numero for numero in sorted(tombamentos))
+    return hashlib.sha1('\n'.join(termos).encode('utf-8')).hexdigest()[:16]
+
+
+class EstadoMonitoramento:
+    def __init__(self, db_path=None):
+        """
+        Estado do monitoramento contínuo do DODF: datas e edições já
+        verificadas para uma lista de termos e menções já encontradas, para
+        que cada verificação só baixe e leia o que ainda não foi visto.
+        """
+        self.db_path = db_path or ESTADO_DB
+        self.init_database()
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def init_database(self):
+        """Inicializa o banco de dados com as tabelas necessárias"""
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        # Datas passadas cujas edições foram todas verificadas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS datas_verificadas (
+                data TEXT,
+                assinatura TEXT,
+                edicoes INTEGER,
+                verificada_em TIMESTAMP,
+                PRIMARY KEY (data, assinatura)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS edicoes_verificadas (
+                link TEXT,
+                assinatura TEXT,
+                data TEXT,
+                nome TEXT,
+                mencoes INTEGER,
+                verificada_em TIMESTAMP,
+                PRIMARY KEY (link, assinatura)
+            ) WITHOUT ROWID
+        ''')
+
+        # notificada_em fica nulo até o notificador aceitar a menção
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mencoes (
+                termo TEXT,
+                link TEXT,
+                pagina INTEGER,
+                edicao TEXT,
+                data TEXT,
+                contexto TEXT,
+                encontrada_em TIMESTAMP,
+                notificada_em TIMESTAMP,
+                PRIMARY KEY (termo, link, pagina)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mencoes_pendentes ON mencoes (notificada_em)')
+
+        conn.commit()
+        conn.close()
+
+    def datas_pendentes(self, datas, assinatura):
+        """Das datas informadas, as que ainda não foram verificadas por completo"""
+        conn = self._conectar()
+        verificadas = {
+            linha[0] for linha in conn.execute(
+                'SELECT data FROM datas_verificadas WHERE assinatura = ?', (assinatura,)
+            )
+        }
+        conn.close()
+        return [data for data in datas if _data_iso(data) not in verificadas]
+
+    def marcar_data(self, data, assinatura, edicoes):
+        conn = self._conectar()
+        conn.execute('''
+            INSERT OR REPLACE INTO datas_verificadas (data, assinatura, edicoes, verificada_em)
+            VALUES (?, ?, ?, ?)
+        ''', (_data_iso(data), assinatura, edicoes, _agora()))
+        conn.commit()
+        conn.close()
+
+    def edicoes_pendentes(self, edicoes, assinatura):
+        """Das edições informadas, as que ainda não foram verificadas"""
+        conn = self._conectar()
+        verificadas = {
+            linha[0] for linha in conn.execute(
+                'SELECT link FROM edicoes_verificadas WHERE assinatura = ?', (assinatura,)
+            )
+        }
+        conn.close()
+        return [edicao for edicao in edicoes if edicao['link'] not in verificadas]
+
+    def registrar_edicao(self, edicao, assinatura, mencoes):
+        """
+        Marca a edição como verificada e guarda as menções encontradas, em
+        uma única transação. Menções já conhecidas não são duplicadas.
+        """
+        agora = _agora()
+        conn = self._conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR IGNORE INTO mencoes (termo, link, pagina, edicao, data, contexto, encontrada_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(m['termo'], edicao['link'], m['pagina'], edicao['nome'], _data_iso(edicao['data']),
+                   m['contexto'], agora) for m in mencoes])
+            cursor.execute('''
+                INSERT OR REPLACE INTO edicoes_verificadas (link, assinatura, data, nome, mencoes, verificada_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (edicao['link'], assinatura, _data_iso(edicao['data']), edicao['nome'], len(mencoes), agora))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def mencoes_pendentes(self):
+        """Menções encontradas que ainda não foram entregues ao notificador"""
+        conn = self._conectar()
+        linhas = conn.execute('''
+            SELECT termo, edicao, data, link, pagina, contexto
+            FROM mencoes
+            WHERE notificada_em IS NULL
+            ORDER BY data, edicao, pagina
+        ''').fetchall()
+        conn.close()
+        return [
+            {'termo': termo, 'edicao': edicao, 'data': _data_br(data), 'link': link,
+             'pagina': pagina, 'contexto': contexto}
+            for termo, edicao, data, link, pagina, contexto in linhas
+        ]
+
+    def marcar_notificadas(self, mencoes):
+        conn = self._conectar()
+        conn.executemany(
+            'UPDATE mencoes SET notificada_em = ? WHERE termo = ? AND link = ? AND pagina = ?',
+            [(_agora(), m['termo'], m['link'], m['pagina']) for m in mencoes]
+        )
+        conn.commit()
+        conn.close()
+
+
+class NotificadorConsole:
+    """Imprime as menções novas (notificador padrão)"""
+
+    def notificar(self, mencoes):
+        for mencao in mencoes:
+            print(f"\n'{mencao['termo']}' em {mencao['edicao']} ({mencao['data']}), página {mencao['pagina']}")
+            print(f"Link: {mencao['link']}")
+            print(f"Contexto: ...{mencao['contexto']}...")
+        return True
+
+
+class NotificadorEmail:
+    def __init__(self, email_remetente, senha_email, email_destinatario,
+                 servidor='smtp.gmail.com', porta=587):
+        """Envia as menções novas por email (SMTP com STARTTLS)"""
+        self.email_remetente = email_remetente.strip()
+        self.senha_email = senha_email
+        self.email_destinatario = email_destinatario.strip()
+        self.servidor = servidor
+        self.porta = porta
+
+    def montar_mensagem(self, mencoes):
+        termos = sorted({m['termo'] for m in mencoes})
+        mensagem = EmailMessage()
+        mensagem['Subject'] = f"DODF: {len(mencoes)} nova(s) menção(ões) de {', '.join(termos)}"
+        mensagem['From'] = self.email_remetente
+        mensagem['To'] = self.email_destinatario
+
+        partes = []
+        for mencao in mencoes:
+            partes.append(
+                f"{mencao['termo']}\n"
+                f"Edição: {mencao['edicao']} ({mencao['data']}), página {mencao['pagina']}\n"
+                f"Link: {mencao['link']}\n"
+                f"Contexto: ...{mencao['contexto']}...\n"
+            )
+        mensagem.set_content(('-' * 80 + '\n').join(partes))
+        return mensagem
+
+    def notificar(self, mencoes):
+        try:
+            with smtplib.SMTP(self.servidor, self.porta, timeout=30) as smtp:
+                smtp.starttls()
+                smtp.login(self.email_remetente, self.senha_email)
+                smtp.send_message(self.montar_mensagem(mencoes))
+            return True
+        except Exception as e:
+            print(f"Erro ao enviar email: {str(e)}")
+            return False
+
+
+class AgendadorDODF:
+    def __init__(self, monitor, nomes, tombamentos=None, estado=None, notificador=None,
+                 intervalo=INTERVALO_VERIFICACAO):
+        """
+        Monitoramento contínuo do DODF. A cada verificação só as edições que
+        ainda não constam no estado são baixadas e lidas; datas passadas já
+        verificadas nem são listadas de novo. As menções novas vão para o
+        notificador (qualquer objeto com notificar(mencoes) -> bool).
+
+        Se o monitor tiver email configurado e nenhum notificador for
+        informado, as menções são enviadas por email.
+        """
+        if isinstance(nomes, str):
+            nomes = [nomes]
+        self.monitor = monitor
+        self.localizador = Localizador(nomes, tombamentos)
+        self.assinatura = assinatura_termos(nomes, tombamentos)
+        self.estado = estado or EstadoMonitoramento()
+        if notificador is None:
+            if monitor.email_remetente and monitor.email_destinatario:
+                notificador = NotificadorEmail(monitor.email_remetente, monitor.senha_email,
+                                               monitor.email_destinatario)
+            else:
+                notificador = NotificadorConsole()
+        self.notificador = notificador
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+
+    def _verificar_edicoes(self, edicoes):
+        """Pesquisa as edições ainda não verificadas e grava o resultado de cada uma"""
+        novas = self.estado.edicoes_pendentes(edicoes, self.assinatura)
+        falhas = 0
+        for edicao, ocorrencias in self.monitor.pesquisar_edicoes(novas, self.localizador):
+            if ocorrencias is None:
+                # Fica pendente para a próxima verificação
+                falhas += 1
+                continue
+            mencoes = [
+                {'termo': termo, 'pagina': ocorrencia['pagina'], 'contexto': ocorrencia['contexto']}
+                for ocorrencia in ocorrencias
+                for termo in ocorrencia['termos']
+            ]
+            self.estado.registrar_edicao(edicao, self.assinatura, mencoes)
+        return len(novas) - falhas, falhas
+
+    def preencher(self, data_inicio, data_fim):
+        """
+        Verifica todas as datas do período que ainda não foram verificadas,
+        em lotes de DATAS_POR_LOTE datas: as pastas de um lote são listadas
+        e as edições baixadas com no máximo `monitor.workers` requisições
+        simultâneas, e o estado é gravado a cada edição. Uma data só é
+        marcada como verificada quando a listagem dela foi lida depois que
+        o dia terminou (monitor.listagem_definitiva) e todas as edições
+        foram verificadas; aí não é visitada de novo.
+        Retorna quantas edições foram verificadas.
+        """
+        pendentes = self.estado.datas_pendentes(datas_do_periodo(data_inicio, data_fim), self.assinatura)
+        total = 0
+
+        for inicio_lote in range(0, len(pendentes), DATAS_POR_LOTE):
+            lote = pendentes[inicio_lote:inicio_lote + DATAS_POR_LOTE]
+            with span('dodf_agendador_lote', datas=len(lote)):
+                listagens = self.monitor.listar_periodo(lote)
+                edicoes = [edicao for data in lote for edicao in (listagens[data] or [])]
+                verificadas, falhas = self._verificar_edicoes(edicoes)
+            total += verificadas
+            if falhas:
+                print(f"{falhas} edição(ões) não puderam ser lidas e ficam para a próxima verificação")
+
+            for data in lote:
+                if listagens[data] is None or not self.monitor.listagem_definitiva(data):
+                    # Pasta ilegível ou listada durante o próprio dia: pode ter edições novas
+                    continue
+                if not self.estado.edicoes_pendentes(listagens[data], self.assinatura):
+                    self.estado.marcar_data(data, self.assinatura, len(listagens[data]))
+        return total
+
+    def notificar_pendentes(self):
+        """Entrega ao notificador as menções ainda não notificadas"""
+        mencoes = self.estado.mencoes_pendentes()
+        if not mencoes:
+            return 0
+        try:
+            entregue = self.notificador.notificar(mencoes)
+        except Exception as e:
+            print(f"Erro ao notificar: {str(e)}")
+            entregue = False
+        if not entregue:
+            # Continuam pendentes e são reenviadas na próxima verificação
+            return 0
+        self.estado.marcar_notificadas(mencoes)
+        return len(mencoes)
+
+    def verificar(self):
+        """
+        Uma verificação: procura edições novas de hoje e dos dias dos
+        últimos DIAS_RECUPERACAO dias que ainda não foram verificados por
+        completo (inclusive os anteriores a um dia já verificado, cuja
+        leitura tenha falhado) e notifica as menções novas.
+        Retorna {edicoes, mencoes}.
+        """
+        hoje = datetime.now()
+        # Os dias já marcados como verificados são pulados em preencher()
+        inicio = hoje - timedelta(days=DIAS_RECUPERACAO)
+
+        with span('dodf_agendador_verificacao'):
+            edicoes = self.preencher(inicio.strftime('%d/%m/%Y'), hoje.strftime('%d/%m/%Y'))
+            mencoes = self.notificar_pendentes()
+        print(f"{hoje.strftime('%d/%m/%Y %H:%M')}: {edicoes} edição(ões) nova(s), {mencoes} menção(ões) nova(s)")
+        return {'edicoes': edicoes, 'mencoes': mencoes}
+
+    def executar(self, data_inicio=None):
+        """
+        Verifica o DODF a cada `intervalo` segundos até parar() ser chamado.
+        Com data_inicio, preenche antes o período de data_inicio até hoje.
+        """
+        self._parar.clear()
+        if data_inicio:
+            self.preencher(data_inicio, datetime.now().strftime('%d/%m/%Y'))
+        while not self._parar.is_set():
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"Erro durante a verificação: {str(e)}")
+            self._parar.wait(self.intervalo)
+
+    def parar(self):
+        self._parar.set()
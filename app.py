@@ -1,10 +1,17 @@
 import streamlit as st
 import pandas as pd
-import time
-from tomb import SisgepatAutomation, process_pdf
 import os
+import io
+import sqlite3
 from datetime import datetime
 from database import TombamentoDatabase
+from rastreamento import assinatura_spans, resumo_por_etapa
+from ingestao import ingerir
+from execucao import ExecucaoTombamento, SEGUNDOS_POR_NUMERO
+from concorrencia import admitir, espaco_trabalho
+from progresso import PainelProgresso
+from historico import DIAS_RETENCAO, arquivar, assinatura, carregar_tombamentos, estatisticas_gerais, \
+    motivos_falha, sucesso_por_mes, sucesso_por_usuario
 
 # Configuração da página
 st.set_page_config(
@@ -39,8 +46,43 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Inicializa o banco de dados como variável global
-db = TombamentoDatabase()
+@st.cache_resource
+def obter_db():
+    """Banco de dados criado uma vez por processo (o Streamlit reexecuta o script a cada interação)"""
+    return TombamentoDatabase()
+
+db = obter_db()
+
+def em_cache_sessao(nome, arquivos, calcular):
+    """
+    Resultado de `calcular()` guardado na sessão enquanto os arquivos
+    enviados forem os mesmos, para não extrair ou ler tudo de novo a cada
+    interação com a página.
+    """
+    chave = tuple(arquivo.file_id for arquivo in arquivos)
+    guardado = st.session_state.get(nome)
+    if guardado is None or guardado[0] != chave:
+        guardado = (chave, calcular())
+        st.session_state[nome] = guardado
+    return guardado[1]
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def estatisticas_em_cache(assinatura_historico):
+    """Estatísticas gerais, recalculadas só quando o banco ou o arquivo mudam"""
+    return estatisticas_gerais(obter_db())
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def relatorios_em_cache(assinatura_historico):
+    """Relatórios por mês, por usuário e de motivos de falha, recalculados só quando o banco ou o arquivo mudam"""
+    df = carregar_tombamentos(obter_db())
+    if df.empty:
+        return None
+    return sucesso_por_mes(df), sucesso_por_usuario(df), motivos_falha(df)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def resumo_etapas_em_cache(assinatura_arquivo):
+    """Latência por etapa, recalculada só quando o arquivo de spans muda"""
+    return resumo_por_etapa()
 
 def init_session_state():
     """Inicializa variáveis do session_state"""
@@ -57,57 +99,283 @@ def init_session_state():
     if 'num_falhas' not in st.session_state:
         st.session_state.num_falhas = 0
 
-def process_tombamentos(bot, tombamentos, status_text, progress_bar):
-    total = len(tombamentos)
-    sucessos = 0
-    
-    for idx, numero in enumerate(tombamentos):
-        status_text.text(f"Processando tombamento {idx + 1}/{total}: {numero}")
-        progress_bar.progress((idx + 1) / total)
-        
-        if bot.preencher_tombamento(numero):
-            sucessos += 1
-        else:
-            st.warning(f"Falha ao processar tombamento {numero}")
-        
-        time.sleep(0.5)
-    
-    return sucessos
-
-def process_multiple_pdfs(pdf_files):
+def process_multiple_pdfs(pdf_files, usuario=None):
     """
     Processa múltiplos arquivos PDF e retorna um DataFrame combinado
     """
+    # Importado no primeiro uso: tomb carrega o Selenium e a extração de PDF
+    from tomb import process_pdf
+
     all_tombamentos = []
     progress_text = st.empty()
     progress_bar = st.progress(0)
     
+    # Os PDFs ficam no espaço de trabalho desta execução e a extração
+    # espera a vez se outras sessões já estiverem usando o OCR
+    with espaco_trabalho() as diretorio, admitir(
+        'ocr', usuario,
+        lambda posicao: progress_text.text(f"Aguardando a vez para extrair os números ({posicao}º na fila)...")
+    ):
+        for idx, pdf_path in enumerate(salvar_pdfs_temporarios(pdf_files, diretorio)):
+            pdf_file = pdf_files[idx]
+            progress_text.text(f"Processando PDF {idx + 1}/{len(pdf_files)}: {pdf_file.name}")
+            progress_bar.progress((idx + 1) / len(pdf_files))
+            
+            try:
+                # Processar PDF
+                tombamentos = process_pdf(pdf_path, output_file=None)
+                if tombamentos:
+                    all_tombamentos.extend(tombamentos)
+                    
+            except Exception as e:
+                st.error(f"Erro ao processar {pdf_file.name}: {str(e)}")
+    
+    # Remover duplicatas mantendo a ordem
+    unique_tombamentos = list(dict.fromkeys(all_tombamentos))
+    
+    return pd.DataFrame(unique_tombamentos, columns=['Numero_Tombamento'])
+
+def salvar_pdfs_temporarios(pdf_files, diretorio):
+    """Grava os PDFs enviados no diretório da execução e retorna os caminhos"""
+    temp_paths = []
     for idx, pdf_file in enumerate(pdf_files):
-        # Salvar PDF temporariamente
-        temp_pdf_path = f"temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{idx}.pdf"
+        temp_pdf_path = os.path.join(diretorio, f"{idx}.pdf")
         with open(temp_pdf_path, "wb") as f:
             f.write(pdf_file.getvalue())
+        temp_paths.append(temp_pdf_path)
+    return temp_paths
+
+def acompanhar_execucao(execucao):
+    """
+    Executa um processamento (ExecucaoTombamento) mostrando o andamento no
+    painel de progresso. Usado pelas abas de PDF e de Excel.
+    """
+    if execucao.continuo:
+        painel = PainelProgresso(["Extraídos", "Enviados", "Sucessos", "Falhas"])
+        painel.atualizar(status="Extraindo números e realizando login...")
+    else:
+        painel = PainelProgresso(["Tempo Estimado", "Progresso", "Sucessos", "Falhas"])
+        painel.metrica(0, f"{execucao.tempo_estimado()//60} min")
+        painel.metrica(1, "0%")
+        painel.atualizar(status="Realizando login...")
+
+    def aguardando(recurso, posicao):
+        espera = "um navegador livre" if recurso == 'navegador' else "a vez para extrair os números"
+        painel.atualizar(status=f"Aguardando {espera} ({posicao}º na fila)...")
+
+    for info in execucao.executar(ao_esperar=aguardando):
+        if info['status'] == 'extraido':
+            painel.metrica(0, info['extraidos'])
+
+        elif info['status'] == 'extracao_concluida':
+            painel.metrica(0, f"{info['extraidos']} ✓")
+
+        elif info['status'] == 'pronto':
+            painel.atualizar(status="Login realizado! Enviando números...")
+
+        elif info['status'] == 'aviso':
+            painel.registrar('aviso', detalhe=info['mensagem'])
+
+        elif info['status'] == 'ignorado':
+            painel.registrar('ignorado', info['numero'], info['motivo'])
+            painel.atualizar(info['progresso'], f"Ignorado {info['index']}/{info['total'] or '?'}: {info['numero']}")
+
+        elif info['status'] == 'processando':
+            if not info['sucesso']:
+                painel.registrar('falha', info['numero'], info.get('mensagem_erro'))
+            if execucao.continuo:
+                painel.metrica(1, execucao.processados)
+            else:
+                tempo_restante = int(info['tempo_restante'] or 0)
+                painel.metrica(0, f"{tempo_restante//60} min {tempo_restante%60} seg", "Tempo Restante")
+                painel.metrica(1, f"{info['progresso']*100:.1f}%")
+            painel.metrica(2, info['sucessos'])
+            painel.metrica(3, info['falhas'])
+            painel.atualizar(info['progresso'], f"Processando {info['index']}/{info['total'] or '?'}: {info['numero']}")
+
+        elif info['status'] == 'concluido':
+            tempo_total = int(info['tempo_total'])
+            if not execucao.continuo:
+                painel.metrica(0, f"{tempo_total//60} min {tempo_total%60} seg", "Tempo Total")
+                painel.metrica(1, "100%")
+            painel.atualizar(1.0, f"Processamento concluído em {tempo_total//60} min {tempo_total%60} seg!")
+            painel.renderizar()
+            if execucao.processados:
+                st.success(f"{info['mensagem']} Sucessos: {execucao.sucessos}, Falhas: {execucao.falhas}")
+            else:
+                st.warning(info['mensagem'])
+            if execucao.ignorados:
+                st.info(f"{execucao.ignorados} número(s) já enviado(s) ou em envio por outro processamento foram ignorados")
+
+        elif info['status'] == 'erro':
+            painel.renderizar()
+            st.error(f"Erro no processamento: {info['mensagem']}")
+
+    st.session_state.num_sucessos = execucao.sucessos
+    st.session_state.num_falhas = execucao.falhas
+    st.session_state.tombamentos_realizados += execucao.processados
+    return execucao
+
+def processar_pdfs_continuo(pdf_files, cpf, senha):
+    """
+    Extrai e envia os números ao mesmo tempo: o navegador faz login enquanto
+    os PDFs ainda estão sendo lidos e cada número segue para o SISGEPAT assim
+    que é encontrado.
+    """
+    with espaco_trabalho() as diretorio:
+        execucao = acompanhar_execucao(
+            ExecucaoTombamento(cpf, senha, "PDF", pdf_paths=salvar_pdfs_temporarios(pdf_files, diretorio), db=db)
+        )
+
+    st.session_state.pdfs_processados += len(pdf_files)
+    st.session_state.log_atividades.append(
+        f"{datetime.now().strftime('%H:%M:%S')} - Processados {execucao.processados} números de {len(pdf_files)} PDFs (contínuo)"
+    )
+
+def selecionar_numeros(df, prefixo, nome_download=None):
+    """
+    Mostra o histórico e as opções de processamento (todos, selecionados,
+    falhas ou pendentes) e retorna o DataFrame com os números a processar,
+    ou None se não houver o que processar. `prefixo` separa as chaves dos
+    widgets de cada aba.
+    """
+    # Carrega histórico de processamento se existir
+    df_historico = db.get_tombamentos_status()
+    if not df_historico.empty:
+        sucessos = df_historico[df_historico['status'] == 'sucesso']['numero'].tolist()
+        falhas = df_historico[df_historico['status'] == 'falha']['numero'].tolist()
         
-        progress_text.text(f"Processando PDF {idx + 1}/{len(pdf_files)}: {pdf_file.name}")
-        progress_bar.progress((idx + 1) / len(pdf_files))
-        
-        try:
-            # Processar PDF
-            tombamentos = process_pdf(temp_pdf_path)
-            if tombamentos:
-                all_tombamentos.extend(tombamentos)
+        # Mostra estatísticas do histórico
+        with st.expander("📊 Ver histórico de processamento"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Processados com sucesso", len(sucessos))
+            with col2:
+                st.metric("Falhas", len(falhas))
+            with col3:
+                taxa = len(sucessos)/(len(sucessos) + len(falhas)) * 100 if sucessos or falhas else 0
+                st.metric("Taxa de Sucesso", f"{taxa:.1f}%")
             
-            # Limpar arquivo temporário
-            if os.path.exists(temp_pdf_path):
-                os.remove(temp_pdf_path)
-                
-        except Exception as e:
-            st.error(f"Erro ao processar {pdf_file.name}: {str(e)}")
+            # Tabs para ver detalhes
+            tab_sucesso, tab_falha = st.tabs(["✅ Sucessos", "❌ Falhas"])
+            with tab_sucesso:
+                if sucessos:
+                    st.dataframe(df_historico[df_historico['status'] == 'sucesso'])
+                else:
+                    st.info("Nenhum tombamento processado com sucesso ainda.")
+            
+            with tab_falha:
+                if falhas:
+                    st.dataframe(df_historico[df_historico['status'] == 'falha'])
+                else:
+                    st.success("Nenhuma falha registrada!")
     
-    # Remover duplicatas mantendo a ordem
-    unique_tombamentos = list(dict.fromkeys(all_tombamentos))
+    # Opções de processamento
+    opcao = st.radio(
+        "Selecione o modo de processamento:",
+        ["✨ Processar todos",
+         "🎯 Processar selecionados",
+         "🔄 Reprocessar falhas",
+         "📝 Processar pendentes"],
+        key=f"{prefixo}_radio"
+    )
+
+    if opcao == "🎯 Processar selecionados":
+        st.write("Selecione os números para processar:")
+        
+        # Agrupa checkboxes em colunas para melhor visualização
+        cols = st.columns(4)
+        selected_indices = []
+        
+        for idx, row in df.iterrows():
+            numero = row['Numero_Tombamento']
+            col_idx = idx % 4
+            if cols[col_idx].checkbox(
+                f"{numero}",
+                key=f"{prefixo}_check_{idx}",
+                help="Marque para processar este número"
+            ):
+                selected_indices.append(idx)
+        
+        if not selected_indices:
+            st.warning("⚠️ Selecione pelo menos um número para processar")
+            return None
+        df = df.loc[selected_indices]
     
-    return pd.DataFrame(unique_tombamentos, columns=['Numero_Tombamento'])
+    elif opcao == "🔄 Reprocessar falhas":
+        if df_historico.empty:
+            st.warning("⚠️ Não há histórico de processamentos anteriores")
+            return None
+        
+        # Filtra apenas os números que falharam
+        falhas = df_historico[df_historico['status'] == 'falha']['numero'].tolist()
+        df_temp = df[df['Numero_Tombamento'].isin(falhas)]
+        if df_temp.empty:
+            st.success("✨ Não há falhas para reprocessar!")
+            return None
+        df = df_temp
+    
+    elif opcao == "📝 Processar pendentes":
+        if not df_historico.empty:
+            # Filtra números que nunca foram processados
+            processados = df_historico['numero'].tolist()
+            df_temp = df[~df['Numero_Tombamento'].isin(processados)]
+            if df_temp.empty:
+                st.success("✨ Não há números pendentes para processar!")
+                return None
+            df = df_temp
+    
+    # Mostra preview dos números a processar
+    with st.expander("🔍 Ver números a processar"):
+        st.dataframe(df)
+        st.info(f"Total de números a processar: {len(df)}")
+        ja_enviados = df['Numero_Tombamento'].isin(db.get_numeros_enviados()).sum()
+        if ja_enviados:
+            st.warning(f"{ja_enviados} número(s) já foram enviados e serão ignorados")
+        if nome_download:
+            # Gera o Excel em memória só para o download
+            excel_buffer = io.BytesIO()
+            df.to_excel(excel_buffer, index=False)
+            st.download_button(
+                label="📥 Baixar números em Excel",
+                data=excel_buffer.getvalue(),
+                file_name=nome_download,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+    return df
+
+def botao_processar(df, cpf, senha, tipo_arquivo, prefixo):
+    """Botão de início e execução do processamento dos números de `df`"""
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        iniciar = st.button(
+            "▶️ Iniciar Processamento", 
+            type="primary",
+            help="Clique para iniciar o processamento dos números selecionados",
+            key=f"{prefixo}_button"
+        )
+    with col2:
+        tempo_estimado = len(df) * SEGUNDOS_POR_NUMERO
+        st.info(f"⏱️ Tempo estimado: {tempo_estimado//60} min")
+    
+    if not iniciar:
+        return None
+    if not cpf or not senha:
+        st.error("Por favor, preencha as credenciais primeiro!")
+        return None
+
+    try:
+        execucao = acompanhar_execucao(
+            ExecucaoTombamento(cpf, senha, tipo_arquivo, numeros=df['Numero_Tombamento'].tolist(), db=db)
+        )
+    except Exception as e:
+        st.error(f"Erro: {str(e)}")
+        return None
+
+    st.session_state.log_atividades.append(
+        f"{datetime.now().strftime('%H:%M:%S')} - Processados {execucao.processados} números ({tipo_arquivo})"
+    )
+    return execucao
 
 def main():
     # Inicializa o session_state
@@ -133,285 +401,36 @@ def main():
             accept_multiple_files=True
         )
         
-        if uploaded_pdfs:
+        modo_continuo = st.toggle(
+            "⚡ Processamento contínuo",
+            help="Extrai e envia ao mesmo tempo: o login acontece enquanto os PDFs são lidos "
+                 "e cada número é enviado assim que encontrado (processa todos os números).",
+            key="pdf_continuo"
+        )
+
+        if uploaded_pdfs and modo_continuo:
+            if st.button("▶️ Extrair e processar", type="primary", key="pdf_continuo_button"):
+                if not cpf or not senha:
+                    st.error("Por favor, preencha as credenciais primeiro!")
+                else:
+                    processar_pdfs_continuo(uploaded_pdfs, cpf, senha)
+
+        elif uploaded_pdfs:
             total_pdfs = len(uploaded_pdfs)
             st.success(f"{total_pdfs} {'arquivo' if total_pdfs == 1 else 'arquivos'} carregado{'s' if total_pdfs > 1 else ''}!")
             
             try:
                 # Processar PDFs
                 with st.spinner("Extraindo números de tombamento..."):
-                    df = process_multiple_pdfs(uploaded_pdfs)
+                    df = em_cache_sessao(
+                        "numeros_pdfs", uploaded_pdfs, lambda: process_multiple_pdfs(uploaded_pdfs, cpf)
+                    )
                     
                 if not df.empty:
                     st.success(f"Encontrados {len(df)} números de tombamento únicos!")
-                    
-                    # Carrega histórico de processamento se existir
-                    df_historico = db.get_tombamentos_status()
-                    if not df_historico.empty:
-                        
-                        sucessos = df_historico[df_historico['status'] == 'sucesso']['numero'].tolist()
-                        falhas = df_historico[df_historico['status'] == 'falha']['numero'].tolist()
-                        
-                        # Mostra estatísticas do histórico
-                        with st.expander("📊 Ver histórico de processamento"):
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("Processados com sucesso", len(sucessos))
-                            with col2:
-                                st.metric("Falhas", len(falhas))
-                            with col3:
-                                taxa = len(sucessos)/(len(sucessos) + len(falhas)) * 100 if sucessos or falhas else 0
-                                st.metric("Taxa de Sucesso", f"{taxa:.1f}%")
-                            
-                            # Tabs para ver detalhes
-                            tab_sucesso, tab_falha = st.tabs(["✅ Sucessos", "❌ Falhas"])
-                            with tab_sucesso:
-                                if sucessos:
-                                    st.dataframe(df_historico[df_historico['status'] == 'sucesso'])
-                                else:
-                                    st.info("Nenhum tombamento processado com sucesso ainda.")
-                            
-                            with tab_falha:
-                                if falhas:
-                                    st.dataframe(df_historico[df_historico['status'] == 'falha'])
-                                else:
-                                    st.success("Nenhuma falha registrada!")
-                    
-                    # Opções de processamento
-                    opcao = st.radio(
-                        "Selecione o modo de processamento:",
-                        ["✨ Processar todos",
-                         "🎯 Processar selecionados",
-                         "🔄 Reprocessar falhas",
-                         "📝 Processar pendentes"],
-                        key="pdf_radio"
-                    )
-                    # Inicializa selected_indices
-                    selected_indices = None
-
-                    if opcao == "🎯 Processar selecionados":
-                        st.write("Selecione os números para processar:")
-                        cols = st.columns(4)
-                        selected_indices = []
-                        
-                        for idx, row in df.iterrows():
-                            numero = row['Numero_Tombamento']
-                            col_idx = idx % 4
-                            if cols[col_idx].checkbox(
-                                f"{numero}",
-                                key=f"pdf_check_{idx}",
-                                help="Marque para processar este número"
-                            ):
-                                selected_indices.append(idx)
-                        
-                        if not selected_indices:
-                            st.warning("⚠️ Selecione pelo menos um número para processar")
-                            return
-                    
-                    elif opcao == "🔄 Reprocessar falhas":
-                         if df_historico.empty:
-                            st.warning("⚠️ Não há histórico de processamentos anteriores")
-                            return
-                        
-                         falhas = df_historico[df_historico['status'] == 'falha']['numero'].tolist()
-                         df_temp = df[df['Numero_Tombamento'].isin(falhas)]
-                         if df_temp.empty:
-                             st.success("✨ Não há falhas para reprocessar!")
-                             return
-                         df = df_temp
-                    
-                    elif opcao == "📝 Processar pendentes":
-                        if not df_historico.empty:
-                            processados = df_historico['numero'].tolist()
-                            df_temp = df[~df['Numero_Tombamento'].isin(processados)]
-                            if df_temp.empty:
-                                st.success("✨ Não há números pendentes para processar!")
-                                return
-                            df = df_temp
-                    
-                    # Mostrar preview e opção de download
-                    with st.expander("🔍 Ver números a processar"):
-                        st.dataframe(df)
-                        st.info(f"Total de números a processar: {len(df)}")
-                        excel_path = "numeros_tombamento_combinados.xlsx"
-                        df.to_excel(excel_path, index=False)
-                        with open(excel_path, "rb") as f:
-                            st.download_button(
-                                label="📥 Baixar números em Excel",
-                                data=f,
-                                file_name="numeros_tombamento_combinados.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                            )
-                    
-                    # Botão de processamento
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        iniciar = st.button(
-                            "▶️ Iniciar Processamento", 
-                            type="primary",
-                            help="Clique para iniciar o processamento dos números selecionados",
-                            key="pdf_button"
-                        )
-                    with col2:
-                        tempo_estimado = len(df) * 10
-                        st.info(f"⏱️ Tempo estimado: {tempo_estimado//60} min")
-                    
-                    if iniciar:
-                        if not cpf or not senha:
-                            st.error("Por favor, preencha as credenciais primeiro!")
-                            return
-                        # Inicializa contadores AQUI, antes de qualquer processamento
-                        total_registros = len(df)
-                        tempo_inicio = time.time()
-                        tempo_estimado = total_registros * 10
-                        st.session_state.num_sucessos = 0
-                        st.session_state.num_falhas = 0
-                            
-                        try:
-                            bot = SisgepatAutomation()
-                            
-                            with st.spinner("Realizando login..."):
-                                if bot.login_with_javascript(cpf, senha):
-                                    st.success("Login realizado com sucesso!")
-                                    
-                                    # Processa tombamentos com base na opção selecionada
-                                    selected_indices = (
-                                        selected_indices if opcao == "🎯 Processar selecionados"
-                                        else None
-                                    )
-
-                                     # Calcula tempo estimado antes de iniciar
-                                    total_registros = len(df)
-                                    tempo_estimado = total_registros * 10 
-                                    
-                                    # Componentes de progresso
-                                    progress_bar = st.progress(0)
-                                    status_text = st.empty()
-                                    metrics_cols = st.columns(4)
-                                    tempo_col = metrics_cols[0].empty()
-                                    progresso_col = metrics_cols[1].empty()
-                                    sucessos_col = metrics_cols[2].empty()
-                                    falhas_col = metrics_cols[3].empty()
-                                    # Inicializa métricas
-                                    tempo_col.metric("Tempo Estimado", f"{tempo_estimado//60} min")
-                                    progresso_col.metric("Progresso", "0%")
-                                    sucessos_col.metric("Sucessos", "0")
-                                    falhas_col.metric("Falhas", "0")
-                                    # Registra o processamento inicial no banco
-                                    processamento_id = db.registrar_processamento(
-                                        usuario=cpf,
-                                        tipo_arquivo="PDF" if uploaded_pdfs else "Excel",
-                                        total=total_registros,
-                                        sucessos=0,
-                                        falhas=0
-                                    )
-
-                                    # Processa tombamentos
-                                    for info in bot.processar_tombamentos(excel_path, selected_indices):
-                                        if info['status'] == 'inicio':
-                                            status_text.text("Iniciando processamento...")
-                                            tempo_col.metric("Tempo Estimado", f"{info['tempo_estimado']//60} min")
-                                            
-                                        elif info['status'] == 'processando':
-                                            # Atualiza barra de progresso
-                                            progress_bar.progress(info['progresso'])
-                                            
-                                            # Atualiza status
-                                            status_text.text(f"Processando {info['index']}/{info['total']}: {info['numero']}")
-                                            # Calcula tempo restante
-                                            tempo_decorrido = time.time() - tempo_inicio
-                                            if info['index'] > 1:
-                                                tempo_por_item = tempo_decorrido / (info['index'])
-                                                tempo_restante = tempo_por_item * (total_registros - info['index'])
-                                            else:
-                                                tempo_restante = tempo_estimado - tempo_decorrido
-
-
-                                            # Atualiza métricas
-                                            tempo_col.metric(
-                                                "Tempo Restante", 
-                                                f"{max(0, int(tempo_restante))//60} min {max(0, int(tempo_restante))%60} seg"
-                                            )
-                                            progresso_col.metric("Progresso", f"{info['progresso']*100:.1f}%")
-                                            # Registra o tombamento no banco
-                                            try:
-                                                db.registrar_tombamento(
-                                                    numero=info['numero'],
-                                                    processamento_id=processamento_id,
-                                                    status='sucesso' if info['sucesso'] else 'falha',
-                                                    mensagem_erro=info.get('mensagem_erro')
-                                                )
-                                                
-                                                # Atualiza contadores
-                                                if info['sucesso']:
-                                                    st.session_state.num_sucessos += 1
-                                                else:
-                                                    st.session_state.num_falhas += 1
-                                                
-                                                # Atualiza métricas na interface
-                                                sucessos_col.metric("Sucessos", str(st.session_state.num_sucessos))
-                                                falhas_col.metric("Falhas", str(st.session_state.num_falhas))
-                                                
-                                            except Exception as e:
-                                                st.error(f"Erro ao registrar tombamento: {str(e)}")
-                                                st.session_state.num_falhas += 1
-                                                falhas_col.metric("Falhas", str(st.session_state.num_falhas))
-                                            
-                                        elif info['status'] == 'finalizando':
-                                            status_text.text("Finalizando processamento...")
-                                            
-                                        elif info['status'] == 'concluido':
-                                            progress_bar.progress(1.0)
-                                            # Calcula tempo total
-                                            tempo_total = time.time() - tempo_inicio
-                                            status_text.text("Processamento concluído!")
-                                            tempo_col.metric(
-                                                "Tempo Total", 
-                                                f"{int(tempo_total)//60} min {int(tempo_total)%60} seg"
-    )
-                                            sucessos_col.metric("Sucessos", f"{st.session_state.num_sucessos}/{info['total']}")
-                                            falhas_col.metric("Falhas", f"{info['total'] - st.session_state.num_sucessos}")
-                                             # Atualiza o processamento no banco
-                                            # Atualiza o processamento no banco
-                                            try:
-                                                db.atualizar_processamento(
-                                                    processamento_id,
-                                                    sucessos=st.session_state.num_sucessos,  # Usa a variável que foi sendo atualizada durante o processamento
-                                                    falhas=st.session_state.num_falhas      # Usa a variável que foi sendo atualizada durante o processamento
-                                                )
-                                                st.success(f"Processamento concluído com sucesso! Sucessos: {st.session_state.num_sucessos}, Falhas: {st.session_state.num_falhas}")
-                                            except Exception as e:
-                                                st.error(f"Erro ao atualizar processamento: {str(e)}")
-                                                
-                                            # Mostra resultados detalhados
-                                            if os.path.exists('resultados_tombamento.xlsx'):
-                                                df_resultados = pd.read_excel('resultados_tombamento.xlsx')
-                                                st.write("Resultados do processamento:")
-                                                st.dataframe(df_resultados)
-                                            
-                                            st.success("Processamento concluído com sucesso!")
-                                            
-                                        elif info['status'] == 'erro':
-                                            st.error(f"Erro no processamento: {info['mensagem']}")
-                                            break
-                                else:
-                                    st.error("Falha no login!")
-                                
-                        except Exception as e:
-                            st.error(f"Erro: {str(e)}")
-                        
-                        finally:
-                            try:
-                                bot.close()
-                            except:
-                                pass
-                                
-                            # Atualiza estatísticas
-                            st.session_state.pdfs_processados += len(uploaded_pdfs)
-                            st.session_state.tombamentos_realizados += len(df)
-                            st.session_state.log_atividades.append(
-                                f"{datetime.now().strftime('%H:%M:%S')} - Processados {len(df)} números de {len(uploaded_pdfs)} PDFs"
-                            )
+                    df = selecionar_numeros(df, "pdf", nome_download="numeros_tombamento_combinados.xlsx")
+                    if df is not None and botao_processar(df, cpf, senha, "PDF", "pdf"):
+                        st.session_state.pdfs_processados += total_pdfs
                 else:
                     st.warning("Nenhum número de tombamento encontrado nos PDFs!")
                     
@@ -421,209 +440,49 @@ def main():
     with tab2:
         st.header("Upload de Excel")
         
-        uploaded_excel = st.file_uploader("Escolha o arquivo Excel", type=['xlsx', 'xls'])
+        uploaded_excel = st.file_uploader(
+            "Escolha o arquivo Excel",
+            type=['xlsx', 'xls', 'csv', 'parquet']
+        )
         
         if uploaded_excel:
             try:
-                df = pd.read_excel(uploaded_excel)
-                if 'Numero_Tombamento' not in df.columns:
-                    st.error("O arquivo Excel deve conter uma coluna chamada 'Numero_Tombamento'")
-                    return
-                
-                st.success(f"Excel carregado com sucesso! {len(df)} números encontrados.")
-                
-                # Carrega histórico de processamento se existir
-                df_historico = db.get_tombamentos_status()
-                if not df_historico.empty:
-                    num_sucessos = df_historico[df_historico['status'] == 'sucesso']['numero'].tolist()
-                    num_falhas = df_historico[df_historico['status'] == 'falha']['numero'].tolist()
-                    
-                    # Mostra estatísticas do histórico
-                    with st.expander("📊 Ver histórico de processamento"):
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Processados com sucesso", len(num_sucessos))
-                        with col2:
-                            st.metric("Falhas", len(num_falhas))
-                        with col3:
-                            taxa = len(num_sucessos)/(len(num_sucessos) + len(num_falhas)) * 100 if num_sucessos or num_falhas else 0
-                            st.metric("Taxa de Sucesso", f"{taxa:.1f}%")
-                        
-                        # Tabs para ver detalhes
-                        tab_sucesso, tab_falha = st.tabs(["✅ Sucessos", "❌ Falhas"])
-                        with tab_sucesso:
-                            if num_sucessos:
-                                st.dataframe(df_historico[df_historico['status'] == 'sucesso'])
-                            else:
-                                st.info("Nenhum tombamento processado com sucesso ainda.")
-                        
-                        with tab_falha:
-                            if num_falhas:
-                                st.dataframe(df_historico[df_historico['status'] == 'falha'])
-                            else:
-                                st.success("Nenhuma falha registrada!")
-                
-                # Opções de processamento
-                opcao = st.radio(
-                    "Selecione o modo de processamento:",
-                    ["✨ Processar todos",
-                     "🎯 Processar selecionados",
-                     "🔄 Reprocessar falhas",
-                     "📝 Processar pendentes"]
-                )
-                
-                if opcao == "🎯 Processar selecionados":
-                    # Permite selecionar números específicos
-                    st.write("Selecione os números para processar:")
-                    
-                    # Agrupa checkboxes em colunas para melhor visualização
-                    cols = st.columns(4)
-                    selected_indices = []
-                    
-                    for idx, row in df.iterrows():
-                        numero = row['Numero_Tombamento']
-                        col_idx = idx % 4
-                        if cols[col_idx].checkbox(
-                            f"{numero}",
-                            key=f"check_{idx}",
-                            help="Marque para processar este número"
-                        ):
-                            selected_indices.append(idx)
-                    
-                    if not selected_indices:
-                        st.warning("⚠️ Selecione pelo menos um número para processar")
-                        return
-                
-                elif opcao == "🔄 Reprocessar falhas":
-                    if df_historico.empty:
-                        st.warning("⚠️ Não há histórico de processamentos anteriores")
-                        return
-                    
-                    # Filtra apenas os números que falharam
-                    num_falhas = df_historico[df_historico['status'] == 'falha']['numero'].tolist()
-                    df_temp = df[df['Numero_Tombamento'].isin(num_falhas)]
-                    if df_temp.empty:
-                        st.success("✨ Não há falhas para reprocessar!")
-                        return
-                    df = df_temp
-                
-                elif opcao == "📝 Processar pendentes":
-                    if not df_historico.empty:
-                        # Filtra números que nunca foram processados
-                        processados = df_historico['numero'].tolist()
-                        df_temp = df[~df['Numero_Tombamento'].isin(processados)]
-                        if df_temp.empty:
-                            st.success("✨ Não há números pendentes para processar!")
-                            return
-                        df = df_temp
-                
-                # Mostra preview dos números selecionados
-                with st.expander("🔍 Ver números a processar"):
-                    st.dataframe(df)
-                    st.info(f"Total de números a processar: {len(df)}")
-                
-                # Botão de processamento
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    iniciar = st.button(
-                        "▶️ Iniciar Processamento", 
-                        type="primary",
-                        help="Clique para iniciar o processamento dos números selecionados"
-                    )
-                with col2:
-                    tempo_estimado = len(df) * 10  # 10 segundos por tombamento
-                    st.info(f"⏱️ Tempo estimado: {tempo_estimado//60} min")
-                
-                if iniciar:
-                    # ... resto do código de processamento ...
-                    
-                    try:
-                        bot = SisgepatAutomation()
-                        
-                        with st.spinner("Realizando login..."):
-                            if bot.login_with_javascript(cpf, senha):
-                                st.success("Login realizado com sucesso!")
-                                
-                                # Processa tombamentos com base na opção selecionada
-                                selected_indices = (
-                                    selected_indices if opcao == "🎯 Processar selecionados"
-                                    else None
-                                )
-                                
-                                # Componentes de progresso
-                                progress_bar = st.progress(0)
-                                status_text = st.empty()
-                                metrics_cols = st.columns(4)
-                                tempo_col = metrics_cols[0].empty()
-                                progresso_col = metrics_cols[1].empty()
-                                sucessos_col = metrics_cols[2].empty()
-                                falhas_col = metrics_cols[3].empty()
-                                
-                                # Processa tombamentos
-                                for info in bot.processar_tombamentos(excel_path, selected_indices):
-                                    if info['status'] == 'inicio':
-                                        status_text.text("Iniciando processamento...")
-                                        tempo_col.metric("Tempo Estimado", f"{info['tempo_estimado']//60} min")
-                                        
-                                    elif info['status'] == 'processando':
-                                        # Atualiza barra de progresso
-                                        progress_bar.progress(info['progresso'])
-                                        
-                                        # Atualiza status
-                                        status_text.text(f"Processando {info['index']}/{info['total']}: {info['numero']}")
-                                        
-                                        # Atualiza métricas
-                                        tempo_col.metric("Tempo Restante", f"{info['tempo_restante']//60:.0f} min")
-                                        progresso_col.metric("Progresso", f"{info['progresso']*100:.1f}%")
-                                        
-                                    elif info['status'] == 'finalizando':
-                                        status_text.text("Finalizando processamento...")
-                                        
-                                    elif info['status'] == 'concluido':
-                                        progress_bar.progress(1.0)
-                                        status_text.text("Processamento concluído!")
-                                        tempo_col.metric("Tempo Total", f"{info['tempo_total']//60:.0f} min")
-                                        sucessos_col.metric("Sucessos", f"{info['sucessos']}/{info['total']}")
-                                        falhas_col.metric("Falhas", f"{info['total'] - info['sucessos']}")
-                                        
-                                        # Mostra resultados detalhados
-                                        if os.path.exists('resultados_tombamento.xlsx'):
-                                            df_resultados = pd.read_excel('resultados_tombamento.xlsx')
-                                            st.write("Resultados do processamento:")
-                                            st.dataframe(df_resultados)
-                                        
-                                        st.success("Processamento concluído com sucesso!")
-                                        
-                                    elif info['status'] == 'erro':
-                                        st.error(f"Erro no processamento: {info['mensagem']}")
-                                        break
-                            else:
-                                st.error("Falha no login!")
-                                
-                    except Exception as e:
-                        st.error(f"Erro: {str(e)}")
-                    
-                    finally:
-                        try:
-                            bot.close()
-                        except Exception as e:
-                            st.error(f"Erro ao fechar navegador: {str(e)}")
-                            
+                with st.spinner("Lendo planilha..."):
+                    ingestao = em_cache_sessao("ingestao_excel", [uploaded_excel], lambda: ingerir(uploaded_excel))
+            except ValueError as e:
+                st.error(str(e))
+                ingestao = None
             except Exception as e:
                 st.error(f"Erro ao ler arquivo: {str(e)}")
-                
-                # Após processar Excel:
-                st.session_state.pdfs_processados += 1
-                st.session_state.tombamentos_realizados += len(df)
-                st.session_state.log_atividades.append(
-                    f"{datetime.now().strftime('%H:%M:%S')} - Processados {len(df)} números do Excel"
+                ingestao = None
+            
+            if ingestao is not None and not ingestao.numeros:
+                st.error(f"Nenhum número de tombamento válido na coluna '{ingestao.coluna}'")
+            elif ingestao is not None:
+                df = pd.DataFrame({'Numero_Tombamento': ingestao.numeros})
+                st.success(
+                    f"Excel carregado com sucesso! {len(df)} números encontrados "
+                    f"na coluna '{ingestao.coluna}' "
+                    f"({ingestao.linhas} linhas em {ingestao.segundos:.1f}s, "
+                    f"{ingestao.linhas_por_s or 0:,.0f} linhas/s)."
                 )
+                if ingestao.duplicados or ingestao.invalidos:
+                    with st.expander(
+                        f"⚠️ {ingestao.duplicados} duplicados e "
+                        f"{len(ingestao.invalidos)} valores inválidos ignorados"
+                    ):
+                        if ingestao.invalidos:
+                            st.write(ingestao.invalidos[:100])
+                
+                df = selecionar_numeros(df, "excel")
+                if df is not None:
+                    botao_processar(df, cpf, senha, "Excel", "excel")
     
     with tab3:
         st.header("📊 Status do Sistema")
         
-        # Estatísticas gerais
-        stats = db.get_estatisticas_gerais()
+        # Estatísticas gerais (banco e arquivo dos processamentos antigos)
+        stats = estatisticas_em_cache(assinatura(db))
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -636,10 +495,13 @@ def main():
             st.metric("Total Falhas", stats['total_falhas'])
         
         # Tabs para diferentes visualizações
-        tab_processamentos, tab_sucessos, tab_falhas = st.tabs([
+        tab_processamentos, tab_sucessos, tab_falhas, tab_dodf, tab_relatorios, tab_desempenho = st.tabs([
             "📋 Últimos Processamentos",
             "✅ Sucessos",
-            "❌ Falhas"
+            "❌ Falhas",
+            "📰 DODF",
+            "📈 Relatórios",
+            "⏱️ Desempenho"
         ])
         
         with tab_processamentos:
@@ -666,5 +528,75 @@ def main():
             else:
                 st.success("Nenhuma falha registrada!")
 
+        with tab_dodf:
+            st.subheader("Publicações no DODF")
+            st.caption("Confere os números de um processamento contra o índice local das edições do DODF")
+            processamento_id = st.number_input("ID do processamento", min_value=1, step=1, key="conciliacao_id")
+            if st.button("🔎 Conferir no DODF", key="conciliacao_button"):
+                from conciliacao import conciliar_com_dodf
+
+                resultado = conciliar_com_dodf(processamento_id=int(processamento_id), db=db)
+                st.success(
+                    f"{len(resultado['publicados'])} de {resultado['total']} números publicados "
+                    f"({len(resultado['publicacoes'])} publicações) em {resultado['segundos']:.2f} s"
+                )
+                if resultado['nao_encontrados']:
+                    with st.expander(f"Não encontrados ({len(resultado['nao_encontrados'])})"):
+                        st.dataframe(pd.DataFrame({'numero': resultado['nao_encontrados']}),
+                                     use_container_width=True, hide_index=True)
+
+            df_publicacoes = db.get_publicacoes_dodf()
+            if not df_publicacoes.empty:
+                st.dataframe(df_publicacoes, use_container_width=True)
+            else:
+                st.info("Nenhuma publicação registrada ainda")
+
+        with tab_relatorios:
+            st.subheader("Relatórios")
+            st.caption("Inclui os processamentos antigos já arquivados em Parquet")
+            # Lê o histórico inteiro: só quando pedido, e em cache até o banco mudar
+            if st.toggle("Mostrar relatórios", key="relatorios_toggle"):
+                relatorios = relatorios_em_cache(assinatura(db))
+                if relatorios is not None:
+                    df_mes, df_usuarios, df_motivos = relatorios
+                    st.markdown("**Taxa de sucesso por mês**")
+                    st.bar_chart(df_mes.set_index('mes')[['sucessos', 'falhas']])
+                    st.dataframe(df_mes, use_container_width=True, hide_index=True)
+                    st.markdown("**Por usuário**")
+                    st.dataframe(df_usuarios, use_container_width=True, hide_index=True)
+                    st.markdown("**Motivos de falha mais frequentes**")
+                    st.dataframe(df_motivos, use_container_width=True, hide_index=True)
+                else:
+                    st.info("Nenhum tombamento registrado ainda")
+
+            with st.expander("🗄️ Arquivamento"):
+                st.caption("Move os processamentos antigos do banco para o arquivo em Parquet")
+                dias = st.number_input("Arquivar processamentos com mais de (dias)", min_value=1,
+                                       value=DIAS_RETENCAO, step=1, key="arquivamento_dias")
+                if st.button("🗄️ Arquivar", key="arquivamento_button"):
+                    try:
+                        resultado = arquivar(db, dias=int(dias))
+                    except sqlite3.OperationalError as e:
+                        st.warning(f"Não foi possível arquivar agora, o banco está em uso por outro "
+                                   f"processamento ({str(e)}). Tente de novo quando ele terminar.")
+                    else:
+                        st.success(
+                            f"{resultado['processamentos']} processamentos e {resultado['tombamentos']} "
+                            f"tombamentos arquivados em {resultado['segundos']:.2f} s"
+                        )
+                        if resultado['processamentos'] and not resultado['compactado']:
+                            st.warning("O banco está em uso por outro processamento e não foi compactado; "
+                                       "o espaço será devolvido no próximo arquivamento")
+
+        with tab_desempenho:
+            st.subheader("Latência por Etapa")
+            df_etapas = resumo_etapas_em_cache(assinatura_spans())
+            if not df_etapas.empty:
+                st.caption("Tempos em milissegundos, agregados de todas as execuções registradas")
+                st.dataframe(df_etapas, use_container_width=True, hide_index=True)
+                st.bar_chart(df_etapas.set_index('etapa')[['p50_ms', 'p95_ms']])
+            else:
+                st.info("Nenhuma medição registrada ainda")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
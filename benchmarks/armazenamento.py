@@ -0,0 +1,201 @@
+"""
+Benchmark do armazenamento compacto de tombamento.db (`database.py`).
+
+Uso:
+    python -m benchmarks.armazenamento
+    python -m benchmarks.armazenamento --tombamentos 500000 --consultas 20000
+
+Gera um tombamento.db no esquema antigo (versão 0: números, status e
+datas em texto) com `--tombamentos` resultados sintéticos, migra uma cópia
+com TombamentoDatabase e compara os dois bancos:
+
+- tamanho do arquivo e de cada tabela (com seus índices), após VACUUM;
+- consulta de um número em tombamentos_enviados (chave primária);
+- contagem por status e os últimos 100 tombamentos de um status (a
+  consulta do histórico do app.py);
+- carga do conjunto de números enviados (GuardaIdempotencia).
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ESQUEMA_V0 = '''
+    CREATE TABLE processamentos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data_hora TIMESTAMP,
+        usuario TEXT,
+        tipo_arquivo TEXT,
+        total_processado INTEGER,
+        sucessos INTEGER,
+        falhas INTEGER
+    );
+    CREATE TABLE tombamentos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        numero TEXT,
+        processamento_id INTEGER,
+        status TEXT,
+        data_processamento TIMESTAMP,
+        mensagem_erro TEXT,
+        FOREIGN KEY (processamento_id) REFERENCES processamentos(id)
+    );
+    CREATE INDEX idx_tombamentos_processamento ON tombamentos (processamento_id);
+    CREATE TABLE tombamentos_enviados (
+        numero TEXT PRIMARY KEY,
+        processamento_id INTEGER,
+        data_envio TIMESTAMP
+    ) WITHOUT ROWID;
+    CREATE TABLE reservas (
+        numero TEXT PRIMARY KEY,
+        dono TEXT,
+        expira_em REAL
+    ) WITHOUT ROWID;
+'''
+
+POR_PROCESSAMENTO = 50
+
+
+def numero_sintetico(rng):
+    texto = f'{rng.randrange(10 ** 11):011d}'
+    return f'{texto[:5]}.{texto[5:8]}.{texto[8:]}'
+
+
+def criar_v0(caminho, quantidade, semente):
+    """Banco no esquema antigo, preenchido como o app.py fazia antes"""
+    rng = random.Random(semente)
+    conn = sqlite3.connect(caminho)
+    conn.executescript(ESQUEMA_V0)
+
+    data = datetime(2024, 1, 2, 8, 0)
+    enviados = []
+    for inicio in range(0, quantidade, POR_PROCESSAMENTO):
+        linhas = []
+        for _ in range(min(POR_PROCESSAMENTO, quantidade - inicio)):
+            data += timedelta(seconds=rng.randrange(5, 15), microseconds=rng.randrange(10 ** 6))
+            sucesso = rng.random() < 0.9
+            numero = numero_sintetico(rng)
+            linhas.append((numero, 'sucesso' if sucesso else 'falha', data,
+                           None if sucesso else 'Erro ao processar: campo não encontrado'))
+        cursor = conn.execute(
+            'INSERT INTO processamentos (data_hora, usuario, tipo_arquivo, total_processado, sucessos, falhas) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (linhas[0][2], f'{rng.randrange(10 ** 11):011d}', 'PDF', len(linhas),
+             sum(linha[1] == 'sucesso' for linha in linhas), sum(linha[1] == 'falha' for linha in linhas))
+        )
+        processamento_id = cursor.lastrowid
+        conn.executemany(
+            'INSERT INTO tombamentos (numero, processamento_id, status, data_processamento, mensagem_erro) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(numero, processamento_id, status, data, erro) for numero, status, data, erro in linhas]
+        )
+        enviados.extend((numero, processamento_id, data) for numero, status, data, _ in linhas
+                        if status == 'sucesso')
+    conn.executemany('INSERT OR IGNORE INTO tombamentos_enviados VALUES (?, ?, ?)', enviados)
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+    return [numero for numero, _, _ in enviados]
+
+
+def tamanhos(caminho):
+    """Bytes do arquivo e de cada tabela (somando os índices dela)"""
+    conn = sqlite3.connect(caminho)
+    indices = dict(conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'"))
+    tabelas = {}
+    for nome, bytes_ in conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name'):
+        tabela = indices.get(nome, nome)
+        tabelas[tabela] = tabelas.get(tabela, 0) + bytes_
+    conn.close()
+    return os.path.getsize(caminho), tabelas
+
+
+def cronometrar(funcao, repeticoes=1):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+def medir_consultas(caminho, chaves, sucesso, formatar):
+    """Segundos de cada consulta; `chaves` já no tipo do esquema"""
+    conn = sqlite3.connect(caminho)
+    resultado = {}
+
+    def consultar_chaves():
+        return sum(
+            conn.execute('SELECT 1 FROM tombamentos_enviados WHERE numero = ?', (chave,)).fetchone() is not None
+            for chave in chaves
+        )
+    segundos, achados = cronometrar(consultar_chaves)
+    resultado['chave'] = (segundos / len(chaves), achados)
+
+    resultado['contagem'] = cronometrar(
+        lambda: conn.execute('SELECT COUNT(*) FROM tombamentos WHERE status = ?', (sucesso,)).fetchone()[0], 5
+    )
+    resultado['historico'] = cronometrar(
+        lambda: conn.execute(
+            f'SELECT {formatar} FROM (SELECT t.*, p.usuario FROM tombamentos t '
+            'JOIN processamentos p ON t.processamento_id = p.id '
+            'WHERE t.status = ? ORDER BY t.data_processamento DESC LIMIT 100)', (sucesso,)
+        ).fetchall(), 5
+    )
+    conn.close()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do armazenamento de tombamento.db')
+    parser.add_argument('--tombamentos', type=int, default=200000)
+    parser.add_argument('--consultas', type=int, default=10000)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    from database import STATUS, TombamentoDatabase, _DATA, _NUMERO, _STATUS
+    from extrator import numero_para_inteiro
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        antigo = os.path.join(diretorio, 'v0.db')
+        compacto = os.path.join(diretorio, 'v1.db')
+        enviados = criar_v0(antigo, args.tombamentos, args.semente)
+        shutil.copy(antigo, compacto)
+
+        segundos, db = cronometrar(lambda: TombamentoDatabase(compacto))
+        print(f'{args.tombamentos} tombamentos, migração para o esquema compacto: {segundos:.2f} s\n')
+
+        rng = random.Random(args.semente)
+        consultas = [rng.choice(enviados) if rng.random() < 0.5 else numero_sintetico(rng)
+                     for _ in range(args.consultas)]
+
+        (arquivo_v0, tabelas_v0), (arquivo_v1, tabelas_v1) = tamanhos(antigo), tamanhos(compacto)
+        print(f"{'tamanho':<26}{'antigo':>12}{'compacto':>12}{'redução':>10}")
+        for nome, v0, v1 in [('arquivo', arquivo_v0, arquivo_v1)] + [
+            (tabela, tabelas_v0[tabela], tabelas_v1.get(tabela, 0))
+            for tabela in ('processamentos', 'tombamentos', 'tombamentos_enviados')
+        ]:
+            print(f'{nome:<26}{v0 / 1024:>9.0f} KB{v1 / 1024:>9.0f} KB{1 - v1 / v0:>10.0%}')
+
+        r0 = medir_consultas(antigo, consultas, 'sucesso',
+                             'numero, status, data_processamento, mensagem_erro, usuario')
+        r1 = medir_consultas(compacto, [numero_para_inteiro(numero) for numero in consultas], STATUS['sucesso'],
+                             f"{_NUMERO.format('numero')}, {_STATUS.format('status')}, "
+                             f"{_DATA.format('data_processamento')}, mensagem_erro, usuario")
+        assert r0['chave'][1] == r1['chave'][1] and r0['contagem'][1] == r1['contagem'][1]
+
+        carga_v0 = cronometrar(lambda: {linha[0] for linha in sqlite3.connect(antigo).execute(
+            'SELECT numero FROM tombamentos_enviados')})[0]
+        carga_v1 = cronometrar(db.get_chaves_enviadas)[0]
+
+        print(f"\n{'consulta':<26}{'antigo':>12}{'compacto':>12}")
+        print(f"{'número enviado (chave)':<26}{r0['chave'][0] * 1e6:>9.1f} µs{r1['chave'][0] * 1e6:>9.1f} µs")
+        for nome, chave in (('contagem por status', 'contagem'), ('histórico por status', 'historico')):
+            print(f'{nome:<26}{r0[chave][0] * 1000:>9.1f} ms{r1[chave][0] * 1000:>9.1f} ms')
+        print(f"{'carga dos enviados':<26}{carga_v0 * 1000:>9.1f} ms{carga_v1 * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark da conciliação de números de tombamento com o DODF
+(`conciliacao.py`).
+
+Uso:
+    python -m benchmarks.conciliacao
+    python -m benchmarks.conciliacao --edicoes 500 --numeros 1000 10000 50000
+
+Monta um índice FTS5 com edições sintéticas (sem baixar PDFs) em que parte
+dos números de tombamento é citada e compara o tempo de conferir uma lista
+de números um a um (`IndiceDODF.buscar_tombamento`, como seria pela busca
+atual) com a conferência em lote, que também grava as publicações em um
+tombamento.db temporário.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def gerar_numero(rng):
+    valor = rng.randrange(10 ** 13)
+    texto = f'{valor:013d}'
+    return f'{texto[:5]}.{texto[5:8]}.{texto[8:11]}'
+
+
+def montar_indice(indice, rng, edicoes, paginas, publicados):
+    """Indexa edições sintéticas e devolve o gabarito {numero: quantidade de citações}"""
+    gabarito = {}
+    inicio = datetime(2023, 1, 2)
+    for i in range(edicoes):
+        data = (inicio + timedelta(days=i // 2)).strftime('%d/%m/%Y')
+        textos = []
+        for _ in range(paginas):
+            linhas = []
+            for numero in rng.sample(publicados, min(5, len(publicados))):
+                gabarito[numero] = gabarito.get(numero, 0) + 1
+                linhas.append(f'Ficam transferidos os bens de tombamento {numero} para a Gerencia de Patrimonio.')
+            linhas.append('O SECRETARIO DE ESTADO DE ECONOMIA DO DISTRITO FEDERAL, no uso das atribuicoes,')
+            textos.append('\n'.join(linhas))
+        edicao = {'numero': str(100 + i), 'nome': f'DODF {100 + i} {data.replace("/", "-")} INTEGRA.pdf',
+                  'link': f'http://dodf.invalido/{i}.pdf', 'data': data}
+        indice.indexar_edicao(edicao, textos)
+    return gabarito
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da conciliação com o DODF')
+    parser.add_argument('--edicoes', type=int, default=300)
+    parser.add_argument('--paginas', type=int, default=20)
+    parser.add_argument('--numeros', nargs='+', type=int, default=[1000, 10000, 50000])
+    parser.add_argument('--publicados', type=float, default=0.2,
+                        help='Fração dos números que aparece no DODF')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    from conciliacao import conciliar_com_dodf
+    from indice_dodf import IndiceDODF
+
+    rng = random.Random(args.semente)
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            from database import TombamentoDatabase
+
+            numeros = sorted({gerar_numero(rng) for _ in range(max(args.numeros))})
+            publicados = rng.sample(numeros, int(len(numeros) * args.publicados))
+            indice = IndiceDODF(os.path.join(diretorio, 'indice.db'))
+            inicio = time.perf_counter()
+            gabarito = montar_indice(indice, rng, args.edicoes, args.paginas, publicados)
+            print(f'índice: {args.edicoes} edições, {len(gabarito)} números citados '
+                  f'({time.perf_counter() - inicio:.1f} s para montar)')
+
+            db = TombamentoDatabase()
+            for quantidade in args.numeros:
+                lote = rng.sample(numeros, quantidade)
+                esperados = {numero for numero in lote if numero in gabarito}
+                print(f'\n{quantidade} números ({len(esperados)} publicados)')
+
+                inicio = time.perf_counter()
+                um_a_um = {numero for numero in lote if indice.buscar_tombamento(numero)}
+                segundos = time.perf_counter() - inicio
+                print(f'um a um      {quantidade / segundos:>10.0f} números/s   {segundos:>7.2f} s   '
+                      f'{len(um_a_um & esperados)}/{len(esperados)} publicados')
+
+                resultado = conciliar_com_dodf(lote, db=db, indice=indice)
+                segundos = resultado['segundos']
+                print(f'em lote      {quantidade / segundos:>10.0f} números/s   {segundos:>7.2f} s   '
+                      f'{len(set(resultado["publicados"]) & esperados)}/{len(esperados)} publicados, '
+                      f'{len(resultado["publicacoes"])} publicações gravadas')
+        finally:
+            os.chdir(diretorio_original)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark do controle de admissão (`concorrencia.py`).
+
+Uso:
+    python -m benchmarks.concorrencia
+    python -m benchmarks.concorrencia --vagas 2 --pesado 8 --leves 4 --duracao 0.2
+
+Um usuário "pesado" dispara vários processamentos de uma vez e, logo
+depois, alguns usuários "leves" disparam um processamento cada. Cada
+processamento ocupa uma vaga (navegador) por `--duracao` segundos.
+Compara um semáforo simples (quem chegou primeiro) com o ControleAdmissao
+(rodízio entre usuários): espera dos usuários leves, tempo total e o
+máximo de vagas ocupadas ao mesmo tempo.
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+
+
+class SemaforoSimples:
+    def __init__(self, vagas):
+        self._semaforo = threading.Semaphore(vagas)
+        self._lock = threading.Lock()
+        self.ativos = 0
+
+    def admitir(self, usuario):
+        controle = self
+
+        class Bloco:
+            def __enter__(self):
+                controle._semaforo.acquire()
+                with controle._lock:
+                    controle.ativos += 1
+
+            def __exit__(self, *args):
+                with controle._lock:
+                    controle.ativos -= 1
+                controle._semaforo.release()
+
+        return Bloco()
+
+    def em_uso(self):
+        return self.ativos
+
+
+def simular(controle, pesado, leves, duracao):
+    esperas = {}
+    lock = threading.Lock()
+
+    def processamento(usuario, indice):
+        chegada = time.perf_counter()
+        with controle.admitir(usuario):
+            with lock:
+                esperas[(usuario, indice)] = time.perf_counter() - chegada
+            time.sleep(duracao)
+
+    threads = [threading.Thread(target=processamento, args=('pesado', i)) for i in range(pesado)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    for i in range(leves):
+        thread = threading.Thread(target=processamento, args=(f'leve{i}', 0))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.005)
+
+    maximo = 0
+    while any(thread.is_alive() for thread in threads):
+        maximo = max(maximo, controle.em_uso())
+        time.sleep(duracao / 20)
+    total = time.perf_counter() - inicio
+
+    leves_espera = [espera for (usuario, _), espera in esperas.items() if usuario != 'pesado']
+    return {
+        'espera_leves_media': statistics.mean(leves_espera) if leves_espera else 0,
+        'espera_leves_max': max(leves_espera) if leves_espera else 0,
+        'total': total,
+        'maximo_em_uso': maximo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do controle de admissão')
+    parser.add_argument('--vagas', type=int, default=2)
+    parser.add_argument('--pesado', type=int, default=8, help='processamentos do usuário pesado')
+    parser.add_argument('--leves', type=int, default=4, help='usuários leves (um processamento cada)')
+    parser.add_argument('--duracao', type=float, default=0.2, help='segundos com a vaga ocupada')
+    args = parser.parse_args()
+
+    from concorrencia import ControleAdmissao
+
+    print(f"{args.vagas} vagas, {args.pesado} processamentos do usuário pesado, "
+          f"{args.leves} usuários leves, {args.duracao}s por processamento\n")
+    print(f"{'controle':<20}{'espera leves (média)':>22}{'espera leves (máx)':>20}{'total':>9}{'máx. vagas':>12}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, controle in (
+            ('semáforo', SemaforoSimples(args.vagas)),
+            ('ControleAdmissao', ControleAdmissao('benchmark', args.vagas, diretorio)),
+        ):
+            r = simular(controle, args.pesado, args.leves, args.duracao)
+            print(f"{nome:<20}{r['espera_leves_media']:>21.2f}s{r['espera_leves_max']:>19.2f}s"
+                  f"{r['total']:>8.2f}s{r['maximo_em_uso']:>12}")
+
+
+if __name__ == '__main__':
+    main()
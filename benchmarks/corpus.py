@@ -0,0 +1,280 @@
+"""
+Gerador de corpus sintético de PDFs para os benchmarks de extração.
+
+Os documentos imitam termos de movimentação: cabeçalho, tabela com números
+de tombamento e páginas finais de assinatura/anexo sem números. Tudo é
+derivado de uma semente, então o mesmo comando gera sempre o mesmo corpus
+(e o mesmo gabarito) em qualquer máquina.
+
+Tipos de documento:
+    digital      - todas as páginas com camada de texto
+    digitalizado - todas as páginas apenas imagem (como um scanner)
+    misto        - páginas de tabela com texto e páginas digitalizadas intercaladas
+"""
+import json
+import os
+import random
+
+TIPOS = ('digital', 'digitalizado', 'misto')
+
+# Números de tombamento por página de tabela
+DENSIDADES = {
+    'baixa': 5,
+    'media': 20,
+    'alta': 40,
+}
+
+# Dimensões de uma página A4 em pontos (PDF) e em pixels a 150 DPI (imagem)
+LARGURA_PT, ALTURA_PT = 595, 842
+DPI_IMAGEM = 150
+LARGURA_PX, ALTURA_PX = 1240, 1754
+
+DESCRICOES = [
+    'Cadeira giratoria com bracos',
+    'Mesa de escritorio em L',
+    'Monitor LED 24 polegadas',
+    'Microcomputador desktop',
+    'Armario de aco 2 portas',
+    'Impressora multifuncional',
+    'Notebook 14 polegadas',
+    'Estabilizador 1000VA',
+]
+
+
+def gerar_numero(rng):
+    """Gera um número de tombamento no formato 00000.000.000"""
+    return f"{rng.randint(0, 99999):05d}.{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}"
+
+
+def montar_paginas(rng, paginas, densidade):
+    """
+    Monta o conteúdo textual de cada página e o gabarito de números.
+    Aproximadamente 80% das páginas são de tabela e o restante são
+    páginas finais de assinatura/anexo, sem números.
+    """
+    por_pagina = DENSIDADES[densidade]
+    paginas_tabela = max(1, round(paginas * 0.8)) if paginas > 1 else 1
+
+    conteudo = []
+    gabarito = []
+    vistos = set()
+
+    for num_pagina in range(1, paginas + 1):
+        linhas = [f'TERMO DE MOVIMENTACAO DE BENS - Pagina {num_pagina}/{paginas}']
+        if num_pagina <= paginas_tabela:
+            linhas.append('Item   Tombamento       Descricao')
+            for item in range(por_pagina):
+                numero = gerar_numero(rng)
+                while numero in vistos:
+                    numero = gerar_numero(rng)
+                vistos.add(numero)
+                gabarito.append(numero)
+                descricao = rng.choice(DESCRICOES)
+                linhas.append(f'{item + 1:>4}   {numero}    {descricao}')
+        else:
+            linhas.append('Declaro ter recebido os bens relacionados neste termo.')
+            linhas.append('')
+            linhas.append('______________________________________')
+            linhas.append('Assinatura do responsavel pelo recebimento')
+            linhas.append(f'Processo SEI {rng.randint(0, 99999):05d}-{rng.randint(0, 99999999):08d}/2024-{rng.randint(10, 99)}')
+        conteudo.append(linhas)
+
+    return conteudo, gabarito
+
+
+def _escapar_texto_pdf(texto):
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _stream_pagina_texto(linhas):
+    partes = ['BT', '/F1 10 Tf', '12 TL', f'40 {ALTURA_PT - 50} Td']
+    for linha in linhas:
+        partes.append(f'({_escapar_texto_pdf(linha)}) Tj T*')
+    partes.append('ET')
+    return '\n'.join(partes).encode('latin-1', errors='replace')
+
+
+def escrever_pdf_texto(caminho, paginas):
+    """
+    Escreve um PDF mínimo com camada de texto (fonte Helvetica padrão),
+    sem depender de bibliotecas de geração de PDF.
+    """
+    objetos = []
+
+    def adicionar(conteudo):
+        objetos.append(conteudo)
+        return len(objetos)
+
+    catalogo = adicionar(None)
+    raiz_paginas = adicionar(None)
+    fonte = adicionar(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    ids_paginas = []
+    for linhas in paginas:
+        stream = _stream_pagina_texto(linhas)
+        conteudo = adicionar(
+            b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream'
+        )
+        ids_paginas.append(adicionar(
+            f'<< /Type /Page /Parent {raiz_paginas} 0 R /MediaBox [0 0 {LARGURA_PT} {ALTURA_PT}] '
+            f'/Resources << /Font << /F1 {fonte} 0 R >> >> /Contents {conteudo} 0 R >>'.encode()
+        ))
+
+    kids = ' '.join(f'{i} 0 R' for i in ids_paginas)
+    objetos[catalogo - 1] = f'<< /Type /Catalog /Pages {raiz_paginas} 0 R >>'.encode()
+    objetos[raiz_paginas - 1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(ids_paginas)} >>'.encode()
+
+    saida = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for numero, conteudo in enumerate(objetos, 1):
+        offsets.append(len(saida))
+        saida += f'{numero} 0 obj\n'.encode() + conteudo + b'\nendobj\n'
+
+    inicio_xref = len(saida)
+    saida += f'xref\n0 {len(objetos) + 1}\n'.encode()
+    saida += b'0000000000 65535 f \n'
+    for offset in offsets:
+        saida += f'{offset:010d} 00000 n \n'.encode()
+    saida += f'trailer\n<< /Size {len(objetos) + 1} /Root {catalogo} 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n'.encode()
+
+    with open(caminho, 'wb') as f:
+        f.write(saida)
+
+
+def _carregar_fonte(tamanho=22):
+    from PIL import ImageFont
+
+    for nome in ('DejaVuSansMono.ttf', 'DejaVuSans.ttf', 'Arial.ttf', 'arial.ttf'):
+        try:
+            return ImageFont.truetype(nome, tamanho)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=tamanho)
+    except TypeError:
+        # Pillow antigo: fonte bitmap de tamanho fixo
+        return ImageFont.load_default()
+
+
+def renderizar_pagina_imagem(linhas, rng, fonte):
+    """
+    Desenha as linhas em uma imagem em tons de cinza simulando uma página
+    digitalizada (leve rotação e ruído de fundo).
+    """
+    from PIL import Image, ImageDraw
+
+    imagem = Image.new('L', (LARGURA_PX, ALTURA_PX), 255)
+    desenho = ImageDraw.Draw(imagem)
+    y = 80
+    for linha in linhas:
+        desenho.text((80, y), linha, fill=0, font=fonte)
+        y += 34
+
+    # Pontos de ruído para não gerar uma imagem "perfeita"
+    for _ in range(400):
+        x, yy = rng.randrange(LARGURA_PX), rng.randrange(ALTURA_PX)
+        desenho.point((x, yy), fill=rng.randint(120, 220))
+
+    angulo = rng.uniform(-1.5, 1.5)
+    return imagem.rotate(angulo, fillcolor=255, expand=False)
+
+
+def escrever_pdf_imagem(caminho, paginas, rng):
+    """Escreve um PDF apenas com imagens (sem camada de texto)"""
+    fonte = _carregar_fonte()
+    imagens = [renderizar_pagina_imagem(linhas, rng, fonte) for linhas in paginas]
+    primeira, restantes = imagens[0], imagens[1:]
+    primeira.save(caminho, 'PDF', resolution=DPI_IMAGEM, save_all=True, append_images=restantes)
+
+
+def escrever_pdf_misto(caminho, paginas, rng):
+    """
+    Escreve um PDF alternando páginas com texto e páginas digitalizadas.
+    As páginas pares são imagens.
+    """
+    import tempfile
+    from PyPDF2 import PdfReader, PdfWriter
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        texto_path = os.path.join(temp_dir, 'texto.pdf')
+        imagem_path = os.path.join(temp_dir, 'imagem.pdf')
+        escrever_pdf_texto(texto_path, paginas)
+        escrever_pdf_imagem(imagem_path, paginas, rng)
+
+        paginas_texto = PdfReader(texto_path).pages
+        paginas_imagem = PdfReader(imagem_path).pages
+
+        writer = PdfWriter()
+        for indice in range(len(paginas)):
+            origem = paginas_imagem if indice % 2 == 1 else paginas_texto
+            writer.add_page(origem[indice])
+
+        with open(caminho, 'wb') as f:
+            writer.write(f)
+
+
+def nome_documento(tipo, paginas, densidade):
+    return f'{tipo}_{paginas:03d}p_{densidade}.pdf'
+
+
+def gerar_documento(diretorio, tipo, paginas, densidade, semente=42):
+    """
+    Gera um documento do corpus e retorna sua entrada de manifesto.
+    A semente de cada documento é derivada dos parâmetros, então gerar
+    um subconjunto do corpus produz os mesmos arquivos.
+    """
+    rng = random.Random(f'{semente}-{tipo}-{paginas}-{densidade}')
+    conteudo, gabarito = montar_paginas(rng, paginas, densidade)
+    caminho = os.path.join(diretorio, nome_documento(tipo, paginas, densidade))
+
+    if tipo == 'digital':
+        escrever_pdf_texto(caminho, conteudo)
+    elif tipo == 'digitalizado':
+        escrever_pdf_imagem(caminho, conteudo, rng)
+    elif tipo == 'misto':
+        escrever_pdf_misto(caminho, conteudo, rng)
+    else:
+        raise ValueError(f'Tipo de documento desconhecido: {tipo}')
+
+    return {
+        'arquivo': os.path.basename(caminho),
+        'tipo': tipo,
+        'paginas': paginas,
+        'densidade': densidade,
+        'numeros': gabarito,
+    }
+
+
+def gerar_corpus(diretorio, tipos=TIPOS, paginas=(1, 10, 50), densidades=('baixa', 'alta'), semente=42):
+    """
+    Gera o corpus completo no diretório e grava `manifesto.json` com o
+    gabarito de números de cada documento. Documentos já existentes com o
+    mesmo manifesto são reaproveitados.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    manifesto_path = os.path.join(diretorio, 'manifesto.json')
+
+    existente = {}
+    if os.path.exists(manifesto_path):
+        with open(manifesto_path, encoding='utf-8') as f:
+            dados = json.load(f)
+        if dados.get('semente') == semente:
+            existente = {doc['arquivo']: doc for doc in dados['documentos']}
+
+    documentos = []
+    for tipo in tipos:
+        for qtd_paginas in paginas:
+            for densidade in densidades:
+                nome = nome_documento(tipo, qtd_paginas, densidade)
+                if nome in existente and os.path.exists(os.path.join(diretorio, nome)):
+                    documentos.append(existente[nome])
+                    continue
+                print(f'Gerando {nome}...')
+                documentos.append(gerar_documento(diretorio, tipo, qtd_paginas, densidade, semente))
+
+    todos = {doc['arquivo']: doc for doc in existente.values()}
+    todos.update({doc['arquivo']: doc for doc in documentos})
+    with open(manifesto_path, 'w', encoding='utf-8') as f:
+        json.dump({'semente': semente, 'documentos': list(todos.values())}, f, indent=2)
+
+    return documentos
@@ -0,0 +1,202 @@
+"""
+Benchmark do monitoramento do DODF (`dodf.py`) contra o DODF simulado.
+
+Uso:
+    python -m benchmarks.dodf
+    python -m benchmarks.dodf --dias 30 --latencia 0.3 --banda-kbps 2048 --workers 1 4 8
+
+Gera um mês de edições sintéticas, sobe o servidor simulado e mede:
+- o tempo de listar as pastas de todos os dias por HTTP (sem e com cache)
+  e, com `--navegador`, com o Chrome headless usado antes;
+- edições/s da pesquisa de um nome (download + leitura do PDF) com
+  diferentes números de downloads simultâneos. Com workers=1 o fluxo é o
+  sequencial de antes.
+- o tempo de indexar o mês no índice FTS5 (`indice_dodf.py`) e de cada
+  pesquisa de nome e de número de tombamento feita só no índice.
+Confere as edições encontradas contra o gabarito.
+
+Antes das medições confere a virada do dia no agendador
+(`conferir_virada_do_dia`): uma edição publicada depois da última
+listagem do próprio dia precisa ser encontrada depois da meia-noite.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.mock_dodf import NOMES_MONITORADOS, MockDODF, gerar_catalogo
+
+
+def medir(mock, nome, workers):
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    from dodf import DODFMonitor
+
+    edicoes = mock.edicoes()
+    esperadas = {e['arquivo'] for e in edicoes if nome in e['citados']}
+
+    monitor = DODFMonitor(base_url=mock.base_url, workers=workers)
+    inicio = time.perf_counter()
+    resultados = monitor.pesquisar_nome_edicoes(nome, edicoes)
+    segundos = time.perf_counter() - inicio
+
+    encontradas = {r['edicao'] for r in resultados}
+    print(f'workers={workers:<3} {len(edicoes) / segundos:>8.2f} edições/s   {segundos:>7.2f} s   '
+          f'{len(encontradas & esperadas)}/{len(esperadas)} edições com o nome')
+    return segundos
+
+
+def datas_a_partir(inicio, dias):
+    data = datetime.strptime(inicio, '%d/%m/%Y')
+    return [(data + timedelta(days=d)).strftime('%d/%m/%Y') for d in range(dias)]
+
+
+def medir_listagem(mock, datas, navegador=False):
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    from dodf import DODFMonitor
+
+    with tempfile.TemporaryDirectory() as cache:
+        monitor = DODFMonitor(base_url=mock.base_url, diretorio_cache=cache)
+        for descricao in ('HTTP', 'HTTP (cache)'):
+            inicio = time.perf_counter()
+            edicoes = monitor.obter_edicoes_periodo(datas)
+            segundos = time.perf_counter() - inicio
+            print(f'listagem {descricao:<14} {len(datas) / segundos:>10.1f} dias/s   {segundos:>7.3f} s   '
+                  f'{len(edicoes)} edições')
+
+        if navegador:
+            inicio = time.perf_counter()
+            edicoes = [e for data in datas for e in (monitor.obter_edicoes_navegador(data) or [])]
+            segundos = time.perf_counter() - inicio
+            print(f'listagem {"navegador":<14} {len(datas) / segundos:>10.1f} dias/s   {segundos:>7.3f} s   '
+                  f'{len(edicoes)} edições')
+
+
+def medir_indice(mock, datas):
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    from dodf import DODFMonitor
+    from indice_dodf import IndiceDODF
+
+    edicoes = mock.edicoes()
+    with tempfile.TemporaryDirectory() as diretorio:
+        monitor = DODFMonitor(base_url=mock.base_url, diretorio_cache='')
+        indice = IndiceDODF(os.path.join(diretorio, 'indice.db'))
+
+        inicio = time.perf_counter()
+        monitor.indexar_periodo(datas[0], datas[-1], indice)
+        segundos = time.perf_counter() - inicio
+        print(f'indexação          {len(edicoes) / segundos:>8.2f} edições/s   {segundos:>7.2f} s')
+
+        for nome in NOMES_MONITORADOS:
+            esperadas = {(e['arquivo'], p) for e in edicoes for p in e['citados'].get(nome, [])}
+            inicio = time.perf_counter()
+            ocorrencias = indice.buscar(nome)
+            milissegundos = (time.perf_counter() - inicio) * 1000
+            encontradas = {(o['edicao'], o['pagina']) for o in ocorrencias}
+            print(f'busca nome         {milissegundos:>8.2f} ms   {len(encontradas & esperadas)}/{len(esperadas)} '
+                  f'páginas  ({nome})')
+
+        numeros = [(e['arquivo'], n) for e in edicoes for n in e['numeros'][:5]]
+        inicio = time.perf_counter()
+        acertos = sum(
+            any(r['edicao'] == arquivo for r in indice.buscar_tombamento(numero))
+            for arquivo, numero in numeros
+        )
+        milissegundos = (time.perf_counter() - inicio) * 1000 / len(numeros)
+        print(f'busca tombamento   {milissegundos:>8.2f} ms   {acertos}/{len(numeros)} números')
+
+
+def conferir_virada_do_dia():
+    """
+    Lista um dia às 22h (uma edição), acrescenta uma edição à pasta e
+    avança o relógio para depois da meia-noite: a listagem do dia anterior
+    tem de ser lida de novo, a edição nova verificada, e só então o dia
+    marcado como verificado.
+    """
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    import agendador_dodf
+    import dodf
+
+    class Relogio(datetime):
+        agora = None
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.agora
+
+    class MonitorSimulado(dodf.DODFMonitor):
+        def __init__(self, pastas):
+            super().__init__(diretorio_cache='')
+            self.pastas = pastas
+            self.pesquisadas = []
+
+        def listar_pasta_http(self, data):
+            return list(self.pastas.get(data, []))
+
+        def obter_edicoes_navegador(self, data):
+            return None
+
+        def pesquisar_edicoes(self, edicoes, localizador):
+            for edicao in edicoes:
+                self.pesquisadas.append(edicao['link'])
+                yield edicao, []
+
+    def edicao(numero):
+        return {'nome': f'DODF {numero}', 'numero': str(numero), 'data': dia,
+                'link': f'http://dodf.local/{numero}.pdf'}
+
+    originais = dodf.datetime, agendador_dodf.datetime
+    dodf.datetime = agendador_dodf.datetime = Relogio
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            Relogio.agora = Relogio(2024, 3, 5, 22, 0)
+            dia = '05/03/2024'
+            monitor = MonitorSimulado({dia: [edicao(1)]})
+            estado = agendador_dodf.EstadoMonitoramento(os.path.join(diretorio, 'estado.db'))
+            agendador = agendador_dodf.AgendadorDODF(monitor, ['Fulano de Tal'], estado=estado,
+                                                     notificador=agendador_dodf.NotificadorConsole())
+
+            agendador.verificar()
+            assert monitor.pesquisadas == [edicao(1)['link']]
+            assert estado.datas_pendentes([dia], agendador.assinatura) == [dia], 'dia marcado antes de terminar'
+
+            monitor.pastas[dia].append(edicao(2))
+            Relogio.agora = Relogio(2024, 3, 6, 0, 30)
+            agendador.verificar()
+            assert edicao(2)['link'] in monitor.pesquisadas, 'edição extra perdida depois da meia-noite'
+            assert estado.datas_pendentes([dia], agendador.assinatura) == [], 'dia encerrado não foi marcado'
+    finally:
+        dodf.datetime, agendador_dodf.datetime = originais
+    print('virada do dia: ok')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do monitoramento do DODF')
+    parser.add_argument('--inicio', default='01/08/2023')
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--edicoes-por-dia', type=int, default=2)
+    parser.add_argument('--paginas', type=int, default=20)
+    parser.add_argument('--latencia', type=float, default=0.3,
+                        help='Atraso (s) de cada requisição ao servidor simulado')
+    parser.add_argument('--banda-kbps', type=float, default=2048,
+                        help='Banda por download do servidor simulado')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 4, 8])
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--navegador', action='store_true',
+                        help='Também mede a listagem pelo Chrome headless (requer Chrome)')
+    args = parser.parse_args()
+
+    conferir_virada_do_dia()
+    with tempfile.TemporaryDirectory() as diretorio:
+        catalogo = gerar_catalogo(diretorio, args.inicio, args.dias, args.edicoes_por_dia,
+                                  args.paginas, args.semente)
+        with MockDODF(catalogo, latencia=args.latencia, banda_kbps=args.banda_kbps) as mock:
+            medir_listagem(mock, datas_a_partir(args.inicio, args.dias), args.navegador)
+            for workers in args.workers:
+                medir(mock, NOMES_MONITORADOS[0], workers)
+            medir_indice(mock, datas_a_partir(args.inicio, args.dias))
+            print(f'\nServidor: {mock.estado.resumo()}')
+
+
+if __name__ == '__main__':
+    main()
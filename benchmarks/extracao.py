@@ -0,0 +1,271 @@
+"""
+Benchmark do pipeline de extração (read_pdf, extract_text_with_ocr,
+extract_tombamento_numbers, process_pdf e process_pdf_stream) sobre o
+corpus sintético.
+
+Uso:
+    python -m benchmarks.extracao
+    python -m benchmarks.extracao --paginas 1 10 100 500 --densidades baixa media alta
+    python -m benchmarks.extracao --saida atual.json --comparar anterior.json
+
+Cada medição roda em um processo novo, para que o pico de memória (RSS)
+seja o da função medida e não o acumulado das anteriores. Os resultados são
+gravados em JSON junto com o commit atual; com `--comparar` o script aponta
+regressões de páginas/s ou de recall em relação a uma execução anterior e
+termina com código 1 se houver alguma.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.corpus import DENSIDADES, TIPOS, gerar_corpus
+
+FUNCOES = ('read_pdf', 'extract_text_with_ocr', 'extract_tombamento_numbers', 'process_pdf',
+           'process_pdf_stream')
+
+
+def _pico_rss_mb():
+    """Pico de memória residente do processo atual em MB (None no Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    if platform.system() == 'Darwin':
+        return pico / (1024 * 1024)
+    return pico / 1024
+
+
+def _medir(funcao, pdf_path, fila):
+    """Executa uma função do pipeline em um processo isolado"""
+    try:
+        # Spans do rastreamento não interessam ao benchmark
+        os.environ['TOMBAMENTO_SPANS_FILE'] = os.devnull
+        import tomb
+
+        # process_pdf grava numeros_tombamento.xlsx no diretório atual
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            bytes_texto = None
+
+            if funcao == 'extract_tombamento_numbers':
+                texto, usou_ocr = tomb.ler_pdf(pdf_path)
+                bytes_texto = len(texto.encode('utf-8'))
+                inicio = time.perf_counter()
+                numeros = tomb.extract_tombamento_numbers(texto, ocr=usou_ocr)
+            else:
+                inicio = time.perf_counter()
+                resultado = getattr(tomb, funcao)(pdf_path)
+                if funcao == 'process_pdf_stream':
+                    # O gerador só trabalha quando consumido
+                    numeros = list(resultado)
+                elif funcao == 'process_pdf':
+                    numeros = resultado
+                else:
+                    numeros = tomb.extract_tombamento_numbers(resultado, ocr=funcao == 'extract_text_with_ocr')
+            segundos = time.perf_counter() - inicio
+
+        fila.put({
+            'segundos': segundos,
+            'numeros': list(dict.fromkeys(numeros)),
+            'bytes_texto': bytes_texto,
+            'pico_rss_mb': _pico_rss_mb(),
+        })
+    except Exception as e:
+        fila.put({'erro': str(e)})
+
+
+def medir_isolado(funcao, pdf_path, timeout=3600):
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_medir, args=(funcao, pdf_path, fila))
+    processo.start()
+    try:
+        resultado = fila.get(timeout=timeout)
+    except Exception:
+        resultado = {'erro': f'Tempo limite de {timeout}s excedido'}
+    processo.join(5)
+    if processo.is_alive():
+        processo.terminate()
+    return resultado
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def executar(documentos, diretorio, funcoes, repeticoes=1):
+    resultados = []
+    for doc in documentos:
+        pdf_path = os.path.join(diretorio, doc['arquivo'])
+        esperados = set(doc['numeros'])
+
+        for funcao in funcoes:
+            medicoes = []
+            for _ in range(repeticoes):
+                medicao = medir_isolado(funcao, pdf_path)
+                if 'erro' in medicao:
+                    break
+                medicoes.append(medicao)
+
+            linha = {
+                'arquivo': doc['arquivo'],
+                'tipo': doc['tipo'],
+                'paginas': doc['paginas'],
+                'densidade': doc['densidade'],
+                'funcao': funcao,
+                'esperados': len(esperados),
+            }
+            if not medicoes:
+                linha['erro'] = medicao['erro']
+                print(f"✗ {doc['arquivo']} {funcao}: {medicao['erro']}")
+                resultados.append(linha)
+                continue
+
+            # Usa a melhor repetição para reduzir ruído
+            melhor = min(medicoes, key=lambda m: m['segundos'])
+            encontrados = set(melhor['numeros'])
+            segundos = melhor['segundos']
+            linha.update({
+                'segundos': round(segundos, 4),
+                'paginas_por_s': round(doc['paginas'] / segundos, 2) if segundos else None,
+                'pico_rss_mb': round(max(m['pico_rss_mb'] or 0 for m in medicoes), 1),
+                'encontrados': len(encontrados),
+                'corretos': len(encontrados & esperados),
+                'recall': round(len(encontrados & esperados) / len(esperados), 4) if esperados else None,
+            })
+            if melhor['bytes_texto'] is not None and segundos:
+                linha['mb_por_s'] = round(melhor['bytes_texto'] / segundos / (1024 * 1024), 2)
+
+            print(
+                f"✓ {doc['arquivo']:<32} {funcao:<28} {linha['paginas_por_s']:>9} pág/s "
+                f"{linha['pico_rss_mb']:>7} MB  {linha['corretos']}/{linha['esperados']}"
+            )
+            resultados.append(linha)
+    return resultados
+
+
+def resumo_por_tipo(resultados):
+    """Agrega páginas/s, pico de RSS e números encontrados por tipo e função"""
+    grupos = {}
+    for linha in resultados:
+        if 'erro' in linha:
+            continue
+        chave = (linha['tipo'], linha['funcao'])
+        grupo = grupos.setdefault(chave, {'paginas': 0, 'segundos': 0.0, 'pico_rss_mb': 0.0,
+                                          'encontrados': 0, 'corretos': 0, 'esperados': 0})
+        grupo['paginas'] += linha['paginas']
+        grupo['segundos'] += linha['segundos']
+        grupo['pico_rss_mb'] = max(grupo['pico_rss_mb'], linha['pico_rss_mb'])
+        grupo['encontrados'] += linha['encontrados']
+        grupo['corretos'] += linha['corretos']
+        grupo['esperados'] += linha['esperados']
+
+    resumo = []
+    for (tipo, funcao), grupo in sorted(grupos.items()):
+        resumo.append({
+            'tipo': tipo,
+            'funcao': funcao,
+            'paginas_por_s': round(grupo['paginas'] / grupo['segundos'], 2) if grupo['segundos'] else None,
+            'pico_rss_mb': grupo['pico_rss_mb'],
+            'encontrados': grupo['encontrados'],
+            'esperados': grupo['esperados'],
+            'recall': round(grupo['corretos'] / grupo['esperados'], 4) if grupo['esperados'] else None,
+        })
+    return resumo
+
+
+def comparar(atual, anterior, tolerancia=0.2):
+    """
+    Compara duas execuções e retorna a lista de regressões: queda de
+    páginas/s acima da tolerância ou qualquer queda de recall.
+    """
+    base = {(l['arquivo'], l['funcao']): l for l in anterior['resultados'] if 'erro' not in l}
+    regressoes = []
+    for linha in atual['resultados']:
+        chave = (linha['arquivo'], linha['funcao'])
+        if chave not in base:
+            continue
+        antes = base[chave]
+        if 'erro' in linha:
+            regressoes.append(f"{chave[0]} {chave[1]}: erro ({linha['erro']})")
+            continue
+        if antes['paginas_por_s'] and linha['paginas_por_s'] < antes['paginas_por_s'] * (1 - tolerancia):
+            regressoes.append(
+                f"{chave[0]} {chave[1]}: {antes['paginas_por_s']} → {linha['paginas_por_s']} pág/s"
+            )
+        if antes.get('recall') is not None and (linha.get('recall') or 0) < antes['recall']:
+            regressoes.append(
+                f"{chave[0]} {chave[1]}: recall {antes['recall']} → {linha['recall']}"
+            )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline de extração de tombamentos')
+    parser.add_argument('--corpus', default=os.path.join(tempfile.gettempdir(), 'tombamento_corpus'),
+                        help='Diretório do corpus sintético (gerado se não existir)')
+    parser.add_argument('--tipos', nargs='+', default=list(TIPOS), choices=TIPOS)
+    parser.add_argument('--paginas', nargs='+', type=int, default=[1, 10, 50],
+                        help='Quantidades de páginas por documento (ex.: 1 10 100 500)')
+    parser.add_argument('--densidades', nargs='+', default=['baixa', 'alta'], choices=list(DENSIDADES))
+    parser.add_argument('--funcoes', nargs='+', default=list(FUNCOES), choices=FUNCOES)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--saida', default='bench_extracao.json')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Queda relativa de páginas/s aceita antes de acusar regressão')
+    args = parser.parse_args()
+
+    documentos = gerar_corpus(args.corpus, args.tipos, args.paginas, args.densidades, args.semente)
+    resultados = executar(documentos, args.corpus, args.funcoes, args.repeticoes)
+
+    execucao = {
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'semente': args.semente,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+        'resumo': resumo_por_tipo(resultados),
+    }
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(execucao, f, indent=2, ensure_ascii=False)
+
+    print('\nResumo por tipo de documento:')
+    for linha in execucao['resumo']:
+        print(
+            f"{linha['tipo']:<14} {linha['funcao']:<28} {linha['paginas_por_s']:>9} pág/s "
+            f"{linha['pico_rss_mb']:>7} MB  {linha['encontrados']}/{linha['esperados']} números"
+        )
+    print(f'\nResultados gravados em {args.saida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+        regressoes = comparar(execucao, anterior, args.tolerancia)
+        if regressoes:
+            print(f"\n⚠️ Regressões em relação ao commit {anterior.get('commit')}:")
+            for regressao in regressoes:
+                print(f'  - {regressao}')
+            sys.exit(1)
+        print(f"\n✓ Sem regressões em relação ao commit {anterior.get('commit')}")
+
+
+if __name__ == '__main__':
+    main()
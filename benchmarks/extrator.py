@@ -0,0 +1,140 @@
+"""
+Benchmark de recall e vazão (MB/s) da extração de números de tombamento
+sobre saídas de OCR sintéticas e grandes.
+
+Uso:
+    python -m benchmarks.extrator
+    python -m benchmarks.extrator --paginas 5000 --ruido 0.3
+
+Compara a expressão regular original (`\\d{5}\\.\\d{3}\\.\\d{3}` sobre o texto
+todo) com o `ExtratorTombamento`, tanto de uma vez quanto página a página,
+como texto nativo (formato exato primeiro, tolerante só nas páginas sem
+números) e como texto de OCR (direto no padrão tolerante). A variante
+`sem_ponto` (grupos separados só por espaço) não é aceita de propósito.
+"""
+import argparse
+import random
+import re
+import time
+
+from benchmarks.corpus import DESCRICOES, gerar_numero
+from extrator import ExtratorTombamento, extrair_numeros
+
+PADRAO_ORIGINAL = r'\d{5}\.\d{3}\.\d{3}'
+
+# Variações que o OCR introduz em um número 00000.000.000
+VARIANTES = ('limpo', 'espacos', 'virgula', 'letra_o', 'letra_l', 'quebra_linha', 'sem_ponto')
+
+
+def aplicar_variante(numero, variante, rng):
+    if variante == 'espacos':
+        return numero.replace('.', ' . ', 1).replace('.', '. ', 2)
+    if variante == 'virgula':
+        return numero.replace('.', ',', 1)
+    if variante == 'letra_o':
+        posicoes = [i for i, c in enumerate(numero) if c == '0']
+        if posicoes:
+            i = rng.choice(posicoes)
+            return numero[:i] + 'O' + numero[i + 1:]
+    if variante == 'letra_l':
+        posicoes = [i for i, c in enumerate(numero) if c == '1']
+        if posicoes:
+            i = rng.choice(posicoes)
+            return numero[:i] + 'l' + numero[i + 1:]
+    if variante == 'quebra_linha':
+        i = rng.randint(1, len(numero) - 1)
+        return numero[:i] + '\n' + numero[i:]
+    if variante == 'sem_ponto':
+        return numero.replace('.', ' ')
+    return numero
+
+
+def gerar_texto_ocr(paginas, por_pagina, ruido, semente=42):
+    """
+    Gera páginas de texto parecidas com a saída do Tesseract para um termo
+    de movimentação. `ruido` é a fração de números que recebe alguma variante.
+    Retorna (páginas, gabarito, variante de cada número).
+    """
+    rng = random.Random(semente)
+    textos = []
+    gabarito = []
+    variantes = {}
+    for num_pagina in range(1, paginas + 1):
+        linhas = [f'TERMO DE MOVIMENTAÇÃO DE BENS — Página {num_pagina}',
+                  'Item Tombamento Descrição Valor (R$)']
+        for item in range(por_pagina):
+            numero = gerar_numero(rng)
+            variante = rng.choice(VARIANTES[1:]) if rng.random() < ruido else 'limpo'
+            gabarito.append(numero)
+            variantes[numero] = variante
+            valor = f'{rng.randint(100, 9999)},{rng.randint(0, 99):02d}'
+            linhas.append(
+                f'{item + 1} {aplicar_variante(numero, variante, rng)} {rng.choice(DESCRICOES)} {valor}'
+            )
+        linhas.append(f'Processo SEI {rng.randint(0, 99999):05d}-{rng.randint(0, 99999999):08d}/2024-{rng.randint(10, 99)}')
+        linhas.append('CPF 058.842.031-01 — Matrícula 123.456-7')
+        textos.append('\n'.join(linhas))
+    return textos, gabarito, variantes
+
+
+def medir(nome, funcao, textos, gabarito, variantes):
+    tamanho_mb = sum(len(t.encode('utf-8')) for t in textos) / (1024 * 1024)
+    inicio = time.perf_counter()
+    encontrados = funcao(textos)
+    segundos = time.perf_counter() - inicio
+
+    esperados = set(gabarito)
+    achados = set(encontrados)
+    corretos = achados & esperados
+
+    por_variante = {}
+    for numero in gabarito:
+        total, acertos = por_variante.get(variantes[numero], (0, 0))
+        por_variante[variantes[numero]] = (total + 1, acertos + (numero in achados))
+
+    print(f'\n{nome}')
+    print(f'  Vazão: {tamanho_mb / segundos:.1f} MB/s ({tamanho_mb:.1f} MB em {segundos:.2f} s)')
+    print(f'  Recall: {len(corretos) / len(esperados):.4f}  '
+          f'Precisão: {len(corretos) / len(achados) if achados else 0:.4f}')
+    for variante in VARIANTES:
+        if variante in por_variante:
+            total, acertos = por_variante[variante]
+            print(f'    {variante:<14} {acertos / total:.3f} ({acertos}/{total})')
+
+
+def original(textos):
+    return re.findall(PADRAO_ORIGINAL, '\n'.join(textos))
+
+
+def extrator_documento(textos):
+    return extrair_numeros(['\n'.join(textos)])
+
+
+def extrator_incremental(textos, ocr=False):
+    extrator = ExtratorTombamento()
+    for texto in textos:
+        extrator.alimentar(texto, ocr)
+    return extrator.numeros
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da extração de números de tombamento')
+    parser.add_argument('--paginas', type=int, default=2000)
+    parser.add_argument('--por-pagina', type=int, default=40)
+    parser.add_argument('--ruido', type=float, default=0.2,
+                        help='Fração dos números com alguma variação de OCR')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    textos, gabarito, variantes = gerar_texto_ocr(args.paginas, args.por_pagina, args.ruido, args.semente)
+    print(f'{len(textos)} páginas, {len(gabarito)} números, ruído {args.ruido:.0%}')
+
+    medir('Regex original (texto completo)', original, textos, gabarito, variantes)
+    medir('ExtratorTombamento (texto completo)', extrator_documento, textos, gabarito, variantes)
+    medir('ExtratorTombamento (página a página)', extrator_incremental, textos, gabarito, variantes)
+    medir('ExtratorTombamento (página a página, OCR)', lambda t: extrator_incremental(t, ocr=True),
+          textos, gabarito, variantes)
+
+
+if __name__ == '__main__':
+    main()
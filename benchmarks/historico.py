@@ -0,0 +1,159 @@
+"""
+Benchmark do arquivamento e dos relatórios do histórico (`historico.py`).
+
+Uso:
+    python -m benchmarks.historico
+    python -m benchmarks.historico --tombamentos 1000000 --meses 36 --retencao 180
+
+Gera um tombamento.db com `--tombamentos` resultados espalhados pelos
+últimos `--meses` meses e mede:
+
+- tamanho do banco e tempo das consultas da aba de status (últimos
+  processamentos, últimos sucessos e falhas) antes e depois de arquivar
+  o que é mais antigo que `--retencao` dias;
+- os relatórios (taxa de sucesso por mês e por usuário, motivos de falha)
+  em SQL sobre o banco inteiro, como seria sem o arquivo, e com
+  historico.py sobre arquivo em Parquet + banco (primeira leitura e com
+  o arquivo em cache).
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+MOTIVOS = [
+    'Timeout ao esperar o campo de tombamento',
+    'Número de tombamento não encontrado no SISGEPAT',
+    'Message: stale element reference: element is not attached to the page document',
+    'Sessão expirada',
+]
+
+RELATORIOS_SQL = {
+    'por mês': '''
+        SELECT strftime('%Y-%m', p.data_hora, 'unixepoch', 'localtime') as mes, COUNT(*),
+               SUM(t.status = 1), SUM(t.status = 2)
+        FROM tombamentos t JOIN processamentos p ON t.processamento_id = p.id
+        GROUP BY mes
+    ''',
+    'por usuário': '''
+        SELECT p.usuario, COUNT(*), SUM(t.status = 1), SUM(t.status = 2)
+        FROM tombamentos t JOIN processamentos p ON t.processamento_id = p.id
+        GROUP BY p.usuario
+    ''',
+    'motivos de falha': '''
+        SELECT substr(mensagem_erro, 1, 120) as motivo, COUNT(*)
+        FROM tombamentos WHERE status = 2
+        GROUP BY motivo ORDER BY COUNT(*) DESC LIMIT 20
+    ''',
+}
+
+
+def preencher(caminho, quantidade, meses, semente, por_processamento=50):
+    from database import STATUS, TombamentoDatabase
+
+    TombamentoDatabase(caminho)
+    rng = random.Random(semente)
+    conn = sqlite3.connect(caminho)
+    agora = int(time.time())
+    inicio = agora - meses * 30 * 86400
+    passo = (agora - inicio) / (quantidade / por_processamento)
+    usuarios = [f'{rng.randrange(10 ** 11):011d}' for _ in range(20)]
+
+    data = inicio
+    for _ in range(0, quantidade, por_processamento):
+        data += passo
+        linhas = []
+        for i in range(por_processamento):
+            sucesso = rng.random() < 0.9
+            linhas.append((rng.randrange(10 ** 11), STATUS['sucesso' if sucesso else 'falha'], int(data) + i * 10,
+                           None if sucesso else rng.choice(MOTIVOS)))
+        processamento_id = conn.execute(
+            'INSERT INTO processamentos (data_hora, usuario, tipo_arquivo, total_processado, sucessos, falhas, '
+            'data_fim) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (int(data), rng.choice(usuarios), 'PDF', len(linhas),
+             sum(linha[3] is None for linha in linhas), sum(linha[3] is not None for linha in linhas),
+             int(data) + len(linhas) * 10)
+        ).lastrowid
+        conn.executemany(
+            'INSERT INTO tombamentos (numero, processamento_id, status, data_processamento, mensagem_erro) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(numero, processamento_id, status, data_, erro) for numero, status, data_, erro in linhas]
+        )
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+
+
+def cronometrar(funcao, repeticoes=3):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def medir_status(db):
+    return {
+        'últimos processamentos': cronometrar(db.get_ultimos_processamentos),
+        'últimos sucessos': cronometrar(lambda: db.get_tombamentos_status('sucesso')),
+        'últimas falhas': cronometrar(lambda: db.get_tombamentos_status('falha')),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do arquivamento e dos relatórios')
+    parser.add_argument('--tombamentos', type=int, default=300000)
+    parser.add_argument('--meses', type=int, default=24)
+    parser.add_argument('--retencao', type=int, default=180, help='dias mantidos no banco')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    import historico
+    from database import TombamentoDatabase
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'tombamento.db')
+        arquivo = os.path.join(diretorio, 'arquivo')
+        preencher(caminho, args.tombamentos, args.meses, args.semente)
+        db = TombamentoDatabase(caminho)
+
+        tamanho_antes = os.path.getsize(caminho)
+        status_antes = medir_status(db)
+        conn = sqlite3.connect(caminho)
+        sql = {nome: cronometrar(lambda: conn.execute(consulta).fetchall())
+               for nome, consulta in RELATORIOS_SQL.items()}
+        conn.close()
+
+        resultado = historico.arquivar(db, dias=args.retencao, diretorio=arquivo)
+        tamanho_arquivo = sum(os.path.getsize(os.path.join(raiz, nome))
+                              for raiz, _, nomes in os.walk(arquivo) for nome in nomes)
+        print(f"{args.tombamentos} tombamentos em {args.meses} meses; arquivados {resultado['tombamentos']} "
+              f"em {resultado['segundos']:.2f} s ({len(resultado['arquivos'])} arquivos Parquet)\n")
+
+        print(f"{'':<26}{'antes':>12}{'depois':>12}")
+        print(f"{'tombamento.db':<26}{tamanho_antes / 2 ** 20:>9.1f} MB{os.path.getsize(caminho) / 2 ** 20:>9.1f} MB")
+        print(f"{'arquivo Parquet':<26}{'-':>12}{tamanho_arquivo / 2 ** 20:>9.1f} MB")
+        for nome, segundos in medir_status(db).items():
+            print(f'{nome:<26}{status_antes[nome] * 1000:>9.1f} ms{segundos * 1000:>9.1f} ms')
+
+        historico._cache.clear()
+        inicio = time.perf_counter()
+        tombamentos = historico.carregar_tombamentos(db, arquivo)
+        primeira = time.perf_counter() - inicio
+        em_cache = cronometrar(lambda: historico.carregar_tombamentos(db, arquivo))
+        funcoes = {
+            'por mês': historico.sucesso_por_mes,
+            'por usuário': historico.sucesso_por_usuario,
+            'motivos de falha': historico.motivos_falha,
+        }
+
+        print(f"\n{'relatório':<26}{'SQL, banco inteiro':>20}{'arquivo + banco':>18}")
+        print(f"{'carga (primeira/cache)':<26}{'-':>20}{primeira * 1000:>8.1f} / {em_cache * 1000:.1f} ms")
+        for nome, funcao in funcoes.items():
+            print(f'{nome:<26}{sql[nome] * 1000:>17.1f} ms{cronometrar(lambda: funcao(tombamentos)) * 1000:>15.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
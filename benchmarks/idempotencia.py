@@ -0,0 +1,105 @@
+"""
+Benchmark da guarda de idempotência (`idempotencia.py`).
+
+Uso:
+    python -m benchmarks.idempotencia
+    python -m benchmarks.idempotencia --processos 8 --numeros 2000 --enviados 100000
+
+Em um tombamento.db temporário com `--enviados` números já enviados, mede
+o tempo de carregar o conjunto em memória e de consultar um número nele.
+Depois, vários processos disputam a mesma lista de números (reservar,
+"preencher" e confirmar), como operadores enviando a mesma planilha ao
+mesmo tempo, e confere que nenhum número foi enviado por mais de um.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+
+def numeros_sinteticos(quantidade, semente):
+    rng = random.Random(semente)
+    numeros = set()
+    while len(numeros) < quantidade:
+        texto = f'{rng.randrange(10 ** 11):011d}'
+        numeros.add(f'{texto[:5]}.{texto[5:8]}.{texto[8:]}')
+    return sorted(numeros)
+
+
+def disputar(diretorio, numeros, semente, fila):
+    os.chdir(diretorio)
+    from database import TombamentoDatabase
+    from idempotencia import GuardaIdempotencia
+
+    guarda = GuardaIdempotencia(TombamentoDatabase())
+    numeros = list(numeros)
+    random.Random(semente).shuffle(numeros)
+
+    enviados = []
+    inicio = time.perf_counter()
+    for numero in numeros:
+        if guarda.reservar(numero) is None:
+            enviados.append(numero)
+            if len(enviados) % 50 == 0:
+                # Emitir a cada 50 números
+                guarda.confirmar(enviados[-50:])
+    guarda.confirmar(enviados[len(enviados) // 50 * 50:])
+    guarda.liberar()
+    fila.put((enviados, time.perf_counter() - inicio, len(numeros)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da guarda de idempotência')
+    parser.add_argument('--processos', type=int, default=4)
+    parser.add_argument('--numeros', type=int, default=2000)
+    parser.add_argument('--enviados', type=int, default=50000)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            from database import TombamentoDatabase
+            from idempotencia import GuardaIdempotencia
+
+            db = TombamentoDatabase()
+            historico = numeros_sinteticos(args.enviados + args.numeros, args.semente)
+            db.confirmar_envios(historico[:args.enviados], dono='historico')
+            lista = historico[args.enviados:]
+
+            inicio = time.perf_counter()
+            guarda = GuardaIdempotencia(db)
+            print(f'carregar {len(guarda.enviados)} enviados: {(time.perf_counter() - inicio) * 1000:.1f} ms')
+
+            consultas = historico[::7]
+            inicio = time.perf_counter()
+            achados = sum(guarda.ja_enviado(numero) for numero in consultas)
+            segundos = time.perf_counter() - inicio
+            print(f'consulta em memória: {segundos / len(consultas) * 1e9:.0f} ns/número ({achados} já enviados)')
+
+            fila = multiprocessing.Queue()
+            processos = [
+                multiprocessing.Process(target=disputar, args=(diretorio, lista, args.semente + i, fila))
+                for i in range(args.processos)
+            ]
+            for processo in processos:
+                processo.start()
+            resultados = [fila.get() for _ in processos]
+            for processo in processos:
+                processo.join()
+
+            todos = [numero for enviados, _, _ in resultados for numero in enviados]
+            for i, (enviados, segundos, tentativas) in enumerate(resultados, 1):
+                print(f'processo {i}: {len(enviados):>6} enviados   {tentativas / segundos:>8.0f} reservas/s')
+            print(f'{len(todos)} envios para {len(lista)} números, {len(todos) - len(set(todos))} duplicados, '
+                  f'{len(db.get_numeros_enviados()) - args.enviados} confirmados no banco')
+        finally:
+            os.chdir(diretorio_original)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark da leitura de planilhas de tombamento (`ingestao.py`) contra o
+`pd.read_excel` usado antes pela aba de Excel.
+
+Uso:
+    python -m benchmarks.ingestao
+    python -m benchmarks.ingestao --linhas 10000 100000 --formatos xlsx csv parquet
+
+Gera planilhas sintéticas parecidas com exportações de inventário (várias
+colunas, coluna de números com outro nome, duplicatas e células inválidas)
+e mede linhas/s de cada leitor.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.corpus import gerar_numero
+from ingestao import detectar_coluna, ingerir, normalizar_valor
+
+FORMATOS = ('xlsx', 'csv', 'parquet')
+
+# Valor da célula -> número normalizado; texto de CSV e número de xlsx
+# precisam dar o mesmo resultado
+CASOS_VALOR = [
+    ('12345.678.901', '12345.678.901'),
+    (12345678901, '12345.678.901'),
+    ('12345678901', '12345.678.901'),
+    (12345678, '00012.345.678'),
+    ('12345678', '00012.345.678'),
+    ('12345678901.0', '12345.678.901'),
+    (12345678.0, '00012.345.678'),
+    (5, None),
+    ('5', None),
+    (45000, None),
+    (float('inf'), None),
+    (float('nan'), None),
+    (-12345678, None),
+    ('1234.567', None),
+]
+
+# (cabeçalho, amostra) -> índice esperado da coluna de números
+CASOS_COLUNA = [
+    # O nome com "tomb" não ganha da coluna que tem os números
+    (('Item', 'Data_Tombamento', 'Patrimonio'),
+     [(1, '05/01/2024', '12345.678.901'), (2, '06/01/2024', '12345.678.902')], 2),
+    # Empate: o nome desempata
+    (('Anterior', 'Tombamento'), [('12345.678.901', '12345.678.902')], 1),
+    (('Tombamento', 'Numero_Tombamento'), [('12345.678.901', '12345.678.902')], 1),
+    # Sem cabeçalho
+    (('12345.678.900', 'x'), [('12345.678.901', 'y')], 0),
+]
+
+
+def gerar_planilha(caminho, linhas, semente=42):
+    """Grava uma exportação de inventário sintética e retorna os números únicos esperados"""
+    rng = random.Random(semente)
+    numeros = [gerar_numero(rng) for _ in range(linhas)]
+    # ~2% de duplicatas e ~1% de células inválidas
+    for indice in rng.sample(range(linhas), linhas // 50):
+        numeros[indice] = numeros[rng.randrange(linhas)]
+    for indice in rng.sample(range(linhas), linhas // 100):
+        numeros[indice] = rng.choice(['', 'N/D', '1234.567'])
+
+    df = pd.DataFrame({
+        'Item': range(1, linhas + 1),
+        'Descricao': [f'Bem patrimonial {i}' for i in range(linhas)],
+        'Tombamento': numeros,
+        'Valor': [round(rng.uniform(10, 10000), 2) for _ in range(linhas)],
+    })
+    extensao = os.path.splitext(caminho)[1]
+    if extensao == '.xlsx':
+        df.to_excel(caminho, index=False)
+    elif extensao == '.csv':
+        df.to_csv(caminho, index=False)
+    else:
+        df.to_parquet(caminho, index=False)
+    return {n for n in numeros if n and n.count('.') == 2 and len(n) == 13}
+
+
+def conferir_normalizacao():
+    for valor, esperado in CASOS_VALOR:
+        numero = normalizar_valor(valor)
+        assert numero == esperado, f'{valor!r}: esperado {esperado}, obtido {numero}'
+
+
+def conferir_deteccao_coluna():
+    for cabecalho, amostra, esperado in CASOS_COLUNA:
+        indice, _ = detectar_coluna(cabecalho, amostra)
+        assert indice == esperado, f'{cabecalho!r}: esperada a coluna {esperado}, escolhida {indice}'
+
+
+def medir(nome, funcao, linhas, esperados):
+    inicio = time.perf_counter()
+    numeros = funcao()
+    segundos = time.perf_counter() - inicio
+    corretos = len(set(numeros) & esperados)
+    print(f'{nome:<32} {linhas / segundos:>12,.0f} linhas/s   {segundos:>7.2f} s   '
+          f'{corretos}/{len(esperados)} números')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da leitura de planilhas de tombamento')
+    parser.add_argument('--linhas', nargs='+', type=int, default=[10000, 100000])
+    parser.add_argument('--formatos', nargs='+', default=list(FORMATOS), choices=FORMATOS)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    conferir_normalizacao()
+    conferir_deteccao_coluna()
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in args.linhas:
+            print(f'\n{linhas} linhas')
+            for formato in args.formatos:
+                caminho = os.path.join(diretorio, f'inventario_{linhas}.{formato}')
+                esperados = gerar_planilha(caminho, linhas, args.semente)
+
+                medir(f'ingestao ({formato})', lambda: ingerir(caminho).numeros, linhas, esperados)
+                if formato == 'xlsx':
+                    medir('pd.read_excel (anterior)',
+                          lambda: pd.read_excel(caminho)['Tombamento'].dropna().tolist(),
+                          linhas, esperados)
+
+
+if __name__ == '__main__':
+    main()
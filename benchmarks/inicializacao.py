@@ -0,0 +1,105 @@
+"""
+Benchmark da inicialização do app.py (Streamlit).
+
+Uso:
+    python -m benchmarks.inicializacao
+    python -m benchmarks.inicializacao --comparar HEAD~1 --repeticoes 5
+
+Em um processo Python novo para cada repetição, executa o app.py com o
+AppTest do Streamlit (sem navegador) e mede:
+
+- primeira execução: importações do app e primeira renderização da
+  página, como na primeira visita depois de iniciar o servidor;
+- reexecução: uma nova execução do script na mesma sessão, como a cada
+  interação do usuário;
+- os módulos pesados (Selenium, webdriver_manager, PyPDF2) carregados
+  depois da primeira execução.
+
+Com `--comparar <revisão>`, o mesmo é medido no app.py daquela revisão do
+git (extraída em um diretório temporário) para mostrar o ganho.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS_PESADOS = ('selenium', 'webdriver_manager', 'PyPDF2', 'tomb')
+
+MEDICAO = '''
+import json, sys, time
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+inicio = time.perf_counter()
+app.run()
+primeira = time.perf_counter() - inicio
+carregados = [m for m in sys.argv[2].split(',') if m in sys.modules]
+
+inicio = time.perf_counter()
+app.run()
+reexecucao = time.perf_counter() - inicio
+print(json.dumps({
+    'primeira': primeira,
+    'reexecucao': reexecucao,
+    'excecoes': len(app.exception),
+    'carregados': carregados,
+}))
+'''
+
+
+def medir(raiz, repeticoes):
+    resultados = []
+    for _ in range(repeticoes):
+        with tempfile.TemporaryDirectory() as diretorio:
+            ambiente = dict(
+                os.environ,
+                PYTHONPATH=raiz,
+                TOMBAMENTO_SPANS_FILE=os.path.join(diretorio, 'spans.jsonl'),
+            )
+            saida = subprocess.run(
+                [sys.executable, '-c', MEDICAO, os.path.join(raiz, 'app.py'), ','.join(MODULOS_PESADOS)],
+                cwd=diretorio, env=ambiente, capture_output=True, text=True, check=True,
+            )
+            resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {
+        'primeira': statistics.median(r['primeira'] for r in resultados),
+        'reexecucao': statistics.median(r['reexecucao'] for r in resultados),
+        'excecoes': max(r['excecoes'] for r in resultados),
+        'carregados': resultados[-1]['carregados'],
+    }
+
+
+def extrair_revisao(revisao, destino):
+    arquivo = subprocess.run(['git', 'archive', revisao], cwd=RAIZ, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', destino], input=arquivo, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da inicialização do app.py')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--comparar', help='revisão do git a comparar (ex.: HEAD~1)')
+    args = parser.parse_args()
+
+    versoes = [('atual', RAIZ)]
+    with tempfile.TemporaryDirectory() as anterior:
+        if args.comparar:
+            extrair_revisao(args.comparar, anterior)
+            versoes.insert(0, (args.comparar, anterior))
+
+        print(f"mediana de {args.repeticoes} processos\n")
+        print(f"{'versão':<12}{'primeira execução':>19}{'reexecução':>13}  módulos pesados carregados")
+        for nome, raiz in versoes:
+            r = medir(raiz, args.repeticoes)
+            aviso = f"  ({r['excecoes']} exceções)" if r['excecoes'] else ''
+            print(f"{nome:<12}{r['primeira'] * 1000:>16.0f} ms{r['reexecucao'] * 1000:>10.0f} ms  "
+                  f"{', '.join(r['carregados']) or '-'}{aviso}")
+
+
+if __name__ == '__main__':
+    main()
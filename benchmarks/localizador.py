@@ -0,0 +1,140 @@
+"""
+Benchmark do localizador de nomes (`localizador.py`) usado no
+monitoramento do DODF.
+
+Uso:
+    python -m benchmarks.localizador
+    python -m benchmarks.localizador --paginas 500 --nomes 1 10 100 1000
+
+Gera páginas sintéticas de atos do DODF com os nomes monitorados escritos
+de formas diferentes (original, sem acento, maiúsculo e quebrado entre
+linhas) e compara, para listas de nomes de vários tamanhos, o tempo e o
+recall da busca antiga (um `lower().find` por nome por página) com uma
+única passada do Localizador.
+
+Antes das medições confere os casos de CASOS_TOMBAMENTO (números no
+limite do formato, como um com dígitos a mais) e para se algum falhar.
+"""
+import argparse
+import random
+import time
+import unicodedata
+
+from benchmarks.mock_dodf import ATOS, NOMES_FIGURANTES
+from localizador import Localizador
+
+PRENOMES = ['Ana', 'João', 'Maria', 'José', 'Antônio', 'Luíza', 'Sérgio', 'Célia', 'Otávio', 'Mônica']
+SOBRENOMES = ['Conceição', 'Gonçalves', 'Brandão', 'Araújo', 'Simões', 'Magalhães', 'Assunção',
+              'Lima', 'Souza', 'Ribeiro', 'Falcão', 'Guimarães']
+VARIACOES = ('original', 'sem_acento', 'maiusculo', 'quebra_linha')
+
+# Texto -> números de tombamento que o Localizador deve encontrar nele
+CASOS_TOMBAMENTO = {
+    'Tombamento 12345.678.901 transferido': ['12345.678.901'],
+    'Tombamentos 12345.678.901.': ['12345.678.901'],
+    'Tombamentos 12345.678.901, 00001.758.880 e 00002.000.001': [
+        '12345.678.901', '00001.758.880', '00002.000.001'],
+    'Número longo 12345.678.9012': [],
+    'Número longo 12345.678.901.2': [],
+    'Número longo 112345.678.901': [],
+    'Número longo 1.12345.678.901': [],
+}
+
+
+def gerar_nomes(rng, quantidade):
+    nomes = set()
+    while len(nomes) < quantidade:
+        nomes.add(' '.join([rng.choice(PRENOMES), rng.choice(['da', 'de', 'dos']),
+                            rng.choice(SOBRENOMES), rng.choice(SOBRENOMES)]))
+    return sorted(nomes)
+
+
+def escrever_variacao(nome, variacao):
+    if variacao == 'sem_acento':
+        return ''.join(c for c in unicodedata.normalize('NFD', nome) if not unicodedata.combining(c))
+    if variacao == 'maiusculo':
+        return nome.upper()
+    if variacao == 'quebra_linha':
+        palavras = nome.split()
+        meio = len(palavras) // 2
+        return ' '.join(palavras[:meio]) + '\n' + ' '.join(palavras[meio:])
+    return nome
+
+
+def gerar_paginas(rng, paginas, monitorados, linhas_por_pagina=50, probabilidade=0.02):
+    """Páginas de texto e o gabarito {(pagina, nome, variacao)}"""
+    textos = []
+    gabarito = set()
+    for num_pagina in range(1, paginas + 1):
+        linhas = []
+        for _ in range(linhas_por_pagina):
+            ato = rng.choice([a for a in ATOS if '{nome}' in a])
+            if rng.random() < probabilidade:
+                nome = rng.choice(monitorados)
+                variacao = rng.choice(VARIACOES)
+                gabarito.add((num_pagina, nome, variacao))
+                linhas.append(ato.format(nome=escrever_variacao(nome, variacao), numero=''))
+            else:
+                linhas.append(ato.format(nome=rng.choice(NOMES_FIGURANTES), numero=''))
+        textos.append('\n'.join(linhas))
+    return textos, gabarito
+
+
+def busca_antiga(textos, nomes):
+    """Como o pesquisar_nome_pdf original: um find por nome, por página"""
+    encontrados = set()
+    for nome in nomes:
+        nome_lower = nome.lower()
+        for num_pagina, texto in enumerate(textos, 1):
+            if nome_lower in texto.lower():
+                encontrados.add((num_pagina, nome))
+    return encontrados
+
+
+def conferir_tombamentos():
+    localizador = Localizador(tombamentos=True)
+    for texto, esperados in CASOS_TOMBAMENTO.items():
+        achados = [ocorrencia['termos'][0] for ocorrencia in localizador.procurar(texto)]
+        assert achados == esperados, f'{texto!r}: esperado {esperados}, encontrado {achados}'
+
+
+def busca_localizador(textos, nomes):
+    localizador = Localizador(nomes)
+    encontrados = set()
+    for num_pagina, ocorrencia in localizador.procurar_paginas(textos):
+        for nome in ocorrencia['termos']:
+            encontrados.add((num_pagina, nome))
+    return encontrados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do localizador de nomes do DODF')
+    parser.add_argument('--paginas', type=int, default=200)
+    parser.add_argument('--nomes', nargs='+', type=int, default=[1, 10, 100, 1000])
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    conferir_tombamentos()
+    rng = random.Random(args.semente)
+    for quantidade in args.nomes:
+        nomes = gerar_nomes(rng, quantidade)
+        textos, gabarito = gerar_paginas(rng, args.paginas, nomes[:20])
+        megabytes = sum(len(t.encode('utf-8')) for t in textos) / (1024 * 1024)
+        print(f'\n{quantidade} nome(s), {args.paginas} páginas ({megabytes:.1f} MB)')
+
+        for descricao, funcao in (('busca antiga', busca_antiga), ('localizador', busca_localizador)):
+            inicio = time.perf_counter()
+            encontrados = funcao(textos, nomes)
+            segundos = time.perf_counter() - inicio
+
+            recall = []
+            for variacao in VARIACOES:
+                esperados = {(p, n) for p, n, v in gabarito if v == variacao}
+                if esperados:
+                    recall.append(f'{variacao} {len(esperados & encontrados) / len(esperados):.2f}')
+            print(f'{descricao:<14} {megabytes / segundos:>9.2f} MB/s   {segundos:>8.3f} s   '
+                  f'recall: {", ".join(recall)}')
+
+
+if __name__ == '__main__':
+    main()
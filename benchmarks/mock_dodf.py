@@ -0,0 +1,273 @@
+"""
+Servidor DODF simulado para medir o monitoramento sem acessar o portal do
+Diário Oficial.
+
+Reproduz as URLs usadas por `dodf.DODFMonitor`:
+    /dodf/jornal/pastas?pasta=AAAA/MM_Mes/DD MM AAAA
+                           pasta do dia com os links `a.link-materia > p`
+    /dodf/jornal/visualizar-pdf?pasta=...&arquivo=...
+                           PDF da edição
+
+As edições são PDFs sintéticos com texto de atos oficiais; os nomes
+monitorados aparecem em páginas sorteadas (gabarito em `catalogo`). Cada
+requisição pode sofrer latência fixa e limite de banda.
+
+Uso:
+    python -m benchmarks.mock_dodf --porta 8766 --inicio 01/08/2023 --dias 30
+    DODF_URL=http://127.0.0.1:8766/ python -c "..."
+"""
+import argparse
+import html
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+from benchmarks.corpus import escrever_pdf_texto, gerar_numero
+
+MESES = {
+    1: 'Janeiro', 2: 'Fevereiro', 3: 'Marco', 4: 'Abril',
+    5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
+    9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
+}
+
+NOMES_MONITORADOS = [
+    'Henrique do Vale Rocha Filho',
+    'Maria José da Conceição',
+    'João Antônio Gonçalves',
+    'Ana Luíza Brandão',
+]
+
+NOMES_FIGURANTES = [
+    'Carlos Alberto Souza', 'Fernanda Lima Rocha', 'Paulo Sérgio Martins', 'Luciana Alves Pereira',
+    'Roberto Carlos Dias', 'Patrícia Gomes Ribeiro', 'Marcos Vinícius Teixeira', 'Juliana Castro Melo',
+]
+
+ATOS = [
+    'O SECRETARIO DE ESTADO DE ECONOMIA DO DISTRITO FEDERAL, no uso das atribuicoes,',
+    'RESOLVE: NOMEAR {nome}, para exercer o cargo em comissao de Assessor,',
+    'EXONERAR, a pedido, {nome}, do cargo de Assessor Especial, Simbolo DFA-12,',
+    'CONCEDER aposentadoria voluntaria a {nome}, matricula 123.456-7, Analista,',
+    'DESIGNAR {nome} para compor a Comissao de Inventario de Bens Patrimoniais,',
+    'Processo SEI 00040-00012345/2023-11. Bem tombado sob o numero {numero}.',
+    'Ficam transferidos os bens de tombamento {numero} para a Gerencia de Patrimonio.',
+]
+
+
+def _pasta(data):
+    return f"{data.year}/{data.month:02d}_{MESES[data.month]}/{data.strftime('%d %m %Y')}"
+
+
+def montar_edicao(rng, paginas, linhas_por_pagina=50, probabilidade_nome=0.05):
+    """Conteúdo das páginas de uma edição e o gabarito de nomes e números citados"""
+    conteudo = []
+    citados = {}
+    numeros = set()
+    for num_pagina in range(1, paginas + 1):
+        linhas = []
+        for _ in range(linhas_por_pagina):
+            numero = gerar_numero(rng)
+            ato = rng.choice(ATOS)
+            if rng.random() < probabilidade_nome:
+                nome = rng.choice(NOMES_MONITORADOS)
+                if '{nome}' in ato:
+                    citados.setdefault(nome, set()).add(num_pagina)
+            else:
+                nome = rng.choice(NOMES_FIGURANTES)
+            if '{numero}' in ato:
+                numeros.add(numero)
+            linhas.append(ato.format(nome=nome, numero=numero))
+        conteudo.append(linhas)
+    return conteudo, {nome: sorted(p) for nome, p in citados.items()}, sorted(numeros)
+
+
+def gerar_catalogo(diretorio, inicio, dias, edicoes_por_dia=2, paginas=20, semente=42):
+    """
+    Gera as edições de `dias` dias a partir de `inicio` (dd/mm/aaaa), sem
+    fins de semana, e retorna {pasta: [edição, ...]}.
+    """
+    rng = random.Random(semente)
+    data = datetime.strptime(inicio, '%d/%m/%Y')
+    numero_edicao = 100
+    catalogo = {}
+    for _ in range(dias):
+        if data.weekday() < 5:
+            edicoes = []
+            for indice in range(edicoes_por_dia):
+                numero_edicao += 1
+                sufixo = 'INTEGRA' if indice == 0 else f'SUPLEMENTO {indice}'
+                arquivo = f"DODF {numero_edicao} {data.strftime('%d-%m-%Y')} {sufixo}.pdf"
+                caminho = os.path.join(diretorio, arquivo)
+                conteudo, citados, numeros = montar_edicao(rng, paginas)
+                escrever_pdf_texto(caminho, conteudo)
+                edicoes.append({
+                    'numero': str(numero_edicao),
+                    'arquivo': arquivo,
+                    'caminho': caminho,
+                    'data': data.strftime('%d/%m/%Y'),
+                    'citados': citados,
+                    'numeros': numeros,
+                })
+            catalogo[_pasta(data)] = edicoes
+        data += timedelta(days=1)
+    return catalogo
+
+
+class EstadoMock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requisicoes = 0
+        self.listagens = 0
+        self.downloads = 0
+        self.bytes_enviados = 0
+
+    def resumo(self):
+        with self.lock:
+            return {
+                'requisicoes': self.requisicoes,
+                'listagens': self.listagens,
+                'downloads': self.downloads,
+                'bytes_enviados': self.bytes_enviados,
+            }
+
+
+def pagina_pasta(pasta, edicoes):
+    itens = []
+    for edicao in edicoes:
+        link = (f"/dodf/jornal/visualizar-pdf?pasta={quote(pasta.replace('/', '|'))}"
+                f"&arquivo={quote(edicao['arquivo'])}")
+        itens.append(
+            f'<li><a class="link-materia" href="{html.escape(link)}" target="_blank">'
+            f'<p>{html.escape(edicao["arquivo"])}</p></a></li>'
+        )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>DODF - {html.escape(pasta)}</title></head>
+<body><h1>Pasta {html.escape(pasta)}</h1><ul class="lista-pastas">{''.join(itens)}</ul></body></html>"""
+
+
+def criar_handler(catalogo, estado, latencia, banda_kbps):
+    arquivos = {e['arquivo']: e['caminho'] for edicoes in catalogo.values() for e in edicoes}
+
+    class DODFHandler(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, dados, tipo, status=200):
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            if banda_kbps:
+                # Limita a banda enviando em blocos
+                bloco = max(1024, int(banda_kbps * 1024 / 20))
+                for inicio in range(0, len(dados), bloco):
+                    self.wfile.write(dados[inicio:inicio + bloco])
+                    time.sleep(len(dados[inicio:inicio + bloco]) / (banda_kbps * 1024))
+            else:
+                self.wfile.write(dados)
+            with estado.lock:
+                estado.bytes_enviados += len(dados)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parametros = {k: v[0] for k, v in parse_qs(url.query).items()}
+            with estado.lock:
+                estado.requisicoes += 1
+            if latencia:
+                time.sleep(latencia)
+
+            if url.path == '/dodf/jornal/pastas':
+                pasta = parametros.get('pasta', '')
+                with estado.lock:
+                    estado.listagens += 1
+                corpo = pagina_pasta(pasta, catalogo.get(pasta, []))
+                self._responder(corpo.encode('utf-8'), 'text/html; charset=utf-8')
+            elif url.path == '/dodf/jornal/visualizar-pdf' and parametros.get('arquivo') in arquivos:
+                with open(arquivos[parametros['arquivo']], 'rb') as f:
+                    dados = f.read()
+                with estado.lock:
+                    estado.downloads += 1
+                self._responder(dados, 'application/pdf')
+            else:
+                self._responder(b'<h1>Nao encontrado</h1>', 'text/html; charset=utf-8', status=404)
+
+    return DODFHandler
+
+
+class MockDODF:
+    def __init__(self, catalogo, porta=0, latencia=0.0, banda_kbps=None):
+        """
+        Servidor simulado em uma thread. Com porta 0 o sistema escolhe uma
+        porta livre; a URL final fica em `base_url`.
+        """
+        self.catalogo = catalogo
+        self.estado = EstadoMock()
+        self.servidor = ThreadingHTTPServer(
+            ('127.0.0.1', porta), criar_handler(catalogo, self.estado, latencia, banda_kbps)
+        )
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, porta = self.servidor.server_address[:2]
+        return f'http://{host}:{porta}/'
+
+    def edicoes(self):
+        """Edições no formato de obter_edicoes_do_dia, com o gabarito junto"""
+        lista = []
+        for pasta, edicoes in self.catalogo.items():
+            for edicao in edicoes:
+                link = (f"{self.base_url}dodf/jornal/visualizar-pdf?pasta={quote(pasta.replace('/', '|'))}"
+                        f"&arquivo={quote(edicao['arquivo'])}")
+                lista.append(dict(edicao, nome=edicao['arquivo'], link=link))
+        return lista
+
+    def iniciar(self):
+        self.thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor DODF simulado')
+    parser.add_argument('--porta', type=int, default=8766)
+    parser.add_argument('--diretorio', default=os.path.join(tempfile.gettempdir(), 'dodf_mock'))
+    parser.add_argument('--inicio', default='01/08/2023')
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--edicoes-por-dia', type=int, default=2)
+    parser.add_argument('--paginas', type=int, default=20)
+    parser.add_argument('--latencia', type=float, default=0.0)
+    parser.add_argument('--banda-kbps', type=float)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    os.makedirs(args.diretorio, exist_ok=True)
+    catalogo = gerar_catalogo(args.diretorio, args.inicio, args.dias, args.edicoes_por_dia,
+                              args.paginas, args.semente)
+    mock = MockDODF(catalogo, porta=args.porta, latencia=args.latencia, banda_kbps=args.banda_kbps)
+    print(f'DODF simulado em {mock.base_url} com {sum(len(e) for e in catalogo.values())} edições '
+          f'(Ctrl+C para encerrar)')
+    try:
+        mock.servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+"""
+Servidor SISGEPAT simulado para medir o fluxo de submissão sem acessar o
+sistema de produção.
+
+Reproduz as páginas e IDs usados por `SisgepatAutomation`:
+    /                      login (TxtLogin, TxtSenha, BtnEnviar)
+    /SIGGO/Principal.aspx  lista de módulos com o link PAT
+    /SIGGO/SISGEPAT/Paginas/070_Dados_Gerais/FrmDGComplementar.aspx
+                           Adicionar, TxtTombamento, BtnFRecursoAdd (>>),
+                           BtnSalvar (Emitir) e o modal btnModalOk
+
+Os botões fazem postback completo (como no ASP.NET original), e cada
+requisição pode sofrer latência e falhas injetadas.
+
+Uso:
+    python -m benchmarks.mock_sisgepat --porta 8765 --latencia 0.3 --taxa-rejeicao 0.05
+    python -m benchmarks.mock_sisgepat --taxa-erro 0.02 --duracao-sessao 60
+    SISGEPAT_URL=http://127.0.0.1:8765/ streamlit run app.py
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PREFIXO = 'ctl00_ctl00_ctl00_CphBody_CphFormulario_'
+PREFIXO_INCLUSAO = PREFIXO + 'CphFormularioInclusaoAlteracao_'
+CAMINHO_DADOS_GERAIS = '/SIGGO/SISGEPAT/Paginas/070_Dados_Gerais/FrmDGComplementar.aspx'
+
+
+class ConfiguracaoMock:
+    def __init__(self, latencia=0.0, jitter=0.0, taxa_erro=0.0, taxa_rejeicao=0.0, semente=None,
+                 duracao_sessao=None):
+        """
+        latencia       - atraso fixo (s) aplicado a toda requisição
+        jitter         - atraso aleatório adicional (s), uniforme entre 0 e jitter
+        taxa_erro      - probabilidade de um postback responder HTTP 500
+        taxa_rejeicao  - probabilidade de o SISGEPAT recusar um tombamento
+        duracao_sessao - segundos até a sessão expirar e voltar para o login
+        """
+        self.duracao_sessao = duracao_sessao
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_erro = taxa_erro
+        self.taxa_rejeicao = taxa_rejeicao
+        self.rng = random.Random(semente)
+
+
+class EstadoMock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessoes = {}
+        self.requisicoes = 0
+        self.erros_injetados = 0
+        self.sessoes_expiradas = 0
+        self.adicionados = []
+        self.rejeitados = []
+        self.emissoes = []
+
+    def resumo(self):
+        with self.lock:
+            return {
+                'requisicoes': self.requisicoes,
+                'erros_injetados': self.erros_injetados,
+                'sessoes_expiradas': self.sessoes_expiradas,
+                'adicionados': len(self.adicionados),
+                'rejeitados': len(self.rejeitados),
+                'emissoes': len(self.emissoes),
+                'itens_emitidos': sum(len(e) for e in self.emissoes),
+            }
+
+
+def _pagina(titulo, corpo):
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{titulo}</title>
+<style>
+.modal {{ display: none; position: fixed; top: 30%; left: 30%; padding: 2em; background: #fff; border: 1px solid #333; }}
+.erro {{ color: #b00; }}
+</style></head>
+<body>{corpo}</body></html>"""
+
+
+def pagina_login():
+    return _pagina('SIGGO - Login', """
+<form method="post" action="/" id="aspnetForm">
+  <input type="hidden" name="__VIEWSTATE" value="mock">
+  <input type="text" id="TxtLogin" name="TxtLogin">
+  <input type="password" name="TxtSenha" class="grid_100">
+  <input type="submit" id="BtnEnviar" name="BtnEnviar" value="Entrar">
+</form>""")
+
+
+def pagina_modulos():
+    return _pagina('SIGGO - Módulos', """
+<a id="ct100_CphBody_RptModulos_ct100_RptSistemas_ct100_lnkModulo" href="/SIGGO/SISGEPAT/Default.aspx">
+  <span class="mouseHover text spanText">PAT</span>
+</a>""")
+
+
+def pagina_dados_gerais(sessao, mensagem=None, emitido=False):
+    itens = ''.join(f'<li>{html.escape(n)}</li>' for n in sessao['itens'])
+    aviso = f'<span id="{PREFIXO}LblMensagem" class="erro">{html.escape(mensagem)}</span>' if mensagem else ''
+    confirmacao = f'<span id="{PREFIXO}LblSucesso">Documento emitido</span>' if emitido else ''
+
+    inclusao = ''
+    if sessao['modo'] == 'inclusao':
+        inclusao = f"""
+  <fieldset>
+    <input type="text" id="{PREFIXO_INCLUSAO}TxtTombamento" name="TxtTombamento">
+    <input type="submit" id="{PREFIXO_INCLUSAO}BtnFRecursoAdd" name="BtnFRecursoAdd" value="&gt;&gt;">
+    <ul id="{PREFIXO_INCLUSAO}LstRecursos">{itens}</ul>
+  </fieldset>
+  <input type="button" id="{PREFIXO}BtnSalvar" value="Emitir"
+         onclick="document.getElementById('modalConfirmacao').style.display='block';">
+  <div id="modalConfirmacao" class="modal">
+    Confirma a emissão?
+    <input type="submit" id="btnModalOk" name="btnModalOk" value="Sim">
+  </div>"""
+
+    return _pagina('DGCD - Dados Gerais', f"""
+<form method="post" action="{CAMINHO_DADOS_GERAIS}" id="aspnetForm">
+  <input type="hidden" name="__VIEWSTATE" value="mock">
+  {aviso}{confirmacao}
+  <input type="submit" id="{PREFIXO}BtnAdicionar" name="BtnAdicionar" value="Adicionar">
+  {inclusao}
+</form>""")
+
+
+def criar_handler(configuracao, estado):
+    class SisgepatHandler(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            pass
+
+        def _sessao(self):
+            cookies = self.headers.get('Cookie', '')
+            for parte in cookies.split(';'):
+                nome, _, valor = parte.strip().partition('=')
+                if nome == 'ASP.NET_SessionId' and valor in estado.sessoes:
+                    sessao = estado.sessoes[valor]
+                    duracao = configuracao.duracao_sessao
+                    if duracao and time.monotonic() - sessao['criada_em'] > duracao:
+                        with estado.lock:
+                            estado.sessoes.pop(valor, None)
+                            estado.sessoes_expiradas += 1
+                        return None, None
+                    return valor, sessao
+            return None, None
+
+        def _atrasar(self):
+            with estado.lock:
+                estado.requisicoes += 1
+                atraso = configuracao.latencia + configuracao.rng.uniform(0, configuracao.jitter)
+            if atraso > 0:
+                time.sleep(atraso)
+
+        def _responder(self, corpo, status=200, cabecalhos=None, tipo='text/html; charset=utf-8'):
+            dados = corpo.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(dados)))
+            for nome, valor in (cabecalhos or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _redirecionar(self, destino, cabecalhos=None):
+            cabecalhos = dict(cabecalhos or {})
+            cabecalhos['Location'] = destino
+            self._responder('', status=302, cabecalhos=cabecalhos)
+
+        def _erro_injetado(self):
+            with estado.lock:
+                falhou = configuracao.rng.random() < configuracao.taxa_erro
+                if falhou:
+                    estado.erros_injetados += 1
+            if falhou:
+                self._responder(_pagina('Erro', '<h1>Erro no servidor</h1>'), status=500)
+            return falhou
+
+        def do_GET(self):
+            caminho = urlparse(self.path).path
+
+            if caminho == '/__mock/estado':
+                self._responder(json.dumps(estado.resumo()), tipo='application/json')
+                return
+
+            self._atrasar()
+            _, sessao = self._sessao()
+
+            if caminho in ('/', '/Default.aspx'):
+                self._responder(pagina_login())
+            elif sessao is None:
+                self._redirecionar('/')
+            elif caminho == '/SIGGO/Principal.aspx':
+                self._responder(pagina_modulos())
+            elif caminho == CAMINHO_DADOS_GERAIS:
+                sessao['modo'] = 'consulta'
+                sessao['itens'] = []
+                self._responder(pagina_dados_gerais(sessao))
+            elif caminho.startswith('/SIGGO/SISGEPAT/'):
+                self._responder(_pagina('SISGEPAT', '<h1>SISGEPAT</h1>'))
+            else:
+                self._responder(_pagina('Não encontrado', ''), status=404)
+
+        def do_POST(self):
+            caminho = urlparse(self.path).path
+            tamanho = int(self.headers.get('Content-Length', 0))
+            campos = {k: v[0] for k, v in parse_qs(self.rfile.read(tamanho).decode('utf-8')).items()}
+
+            self._atrasar()
+
+            if caminho in ('/', '/Default.aspx'):
+                if not campos.get('TxtLogin') or not campos.get('TxtSenha'):
+                    self._responder(pagina_login())
+                    return
+                sessao_id = uuid.uuid4().hex
+                with estado.lock:
+                    estado.sessoes[sessao_id] = {'modo': 'consulta', 'itens': [], 'criada_em': time.monotonic()}
+                self._redirecionar(
+                    '/SIGGO/Principal.aspx',
+                    {'Set-Cookie': f'ASP.NET_SessionId={sessao_id}; Path=/'}
+                )
+                return
+
+            _, sessao = self._sessao()
+            if sessao is None:
+                self._redirecionar('/')
+                return
+            if caminho != CAMINHO_DADOS_GERAIS:
+                self._responder(_pagina('Não encontrado', ''), status=404)
+                return
+            if self._erro_injetado():
+                return
+
+            mensagem = None
+            emitido = False
+            if 'BtnAdicionar' in campos:
+                sessao['modo'] = 'inclusao'
+                sessao['itens'] = []
+            elif 'BtnFRecursoAdd' in campos:
+                numero = campos.get('TxtTombamento', '').strip()
+                with estado.lock:
+                    rejeitado = configuracao.rng.random() < configuracao.taxa_rejeicao
+                    if rejeitado or not numero:
+                        estado.rejeitados.append(numero)
+                    else:
+                        estado.adicionados.append(numero)
+                if rejeitado or not numero:
+                    mensagem = f'Tombamento {numero} não encontrado ou indisponível.'
+                else:
+                    sessao['itens'].append(numero)
+            elif 'btnModalOk' in campos:
+                with estado.lock:
+                    estado.emissoes.append(list(sessao['itens']))
+                sessao['modo'] = 'consulta'
+                sessao['itens'] = []
+                emitido = True
+
+            self._responder(pagina_dados_gerais(sessao, mensagem, emitido))
+
+    return SisgepatHandler
+
+
+class MockSisgepat:
+    def __init__(self, porta=0, **opcoes):
+        """
+        Servidor simulado em uma thread. Com porta 0 o sistema escolhe uma
+        porta livre; a URL final fica em `base_url` após `iniciar()`.
+        """
+        self.configuracao = ConfiguracaoMock(**opcoes)
+        self.estado = EstadoMock()
+        self.servidor = ThreadingHTTPServer(
+            ('127.0.0.1', porta), criar_handler(self.configuracao, self.estado)
+        )
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, porta = self.servidor.server_address[:2]
+        return f'http://{host}:{porta}/'
+
+    def iniciar(self):
+        self.thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor SISGEPAT simulado')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0)
+    parser.add_argument('--taxa-rejeicao', type=float, default=0.0)
+    parser.add_argument('--duracao-sessao', type=float, help='Segundos até a sessão expirar')
+    parser.add_argument('--semente', type=int)
+    args = parser.parse_args()
+
+    mock = MockSisgepat(
+        porta=args.porta,
+        latencia=args.latencia,
+        jitter=args.jitter,
+        taxa_erro=args.taxa_erro,
+        taxa_rejeicao=args.taxa_rejeicao,
+        duracao_sessao=args.duracao_sessao,
+        semente=args.semente,
+    )
+    print(f'SISGEPAT simulado em {mock.base_url} (Ctrl+C para encerrar)')
+    try:
+        mock.servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
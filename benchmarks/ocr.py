@@ -0,0 +1,107 @@
+"""
+Benchmark do OCR com e sem o pré-processamento de imagem.
+
+Uso:
+    python -m benchmarks.ocr
+    python -m benchmarks.ocr --paginas 10 --dpi 150 200 300
+
+Converte os PDFs digitalizados do corpus sintético em imagens e mede, por
+página, o tempo de pré-processamento, o tempo do Tesseract e o recall de
+números de tombamento para a configuração original e para as configurações
+com pré-processamento nos DPIs pedidos. Com `--regiao` também mede o
+recorte da tabela, o único caso em que a whitelist de dígitos é aplicada.
+Com `--motores` também compara o motor por subprocesso (pytesseract) com o
+motor persistente (tesserocr).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import gerar_corpus
+from extrator import extrair_numeros
+from ocr import ConfiguracaoOCR, MotorPytesseract, criar_motor, preprocessar_imagem
+
+
+def medir_configuracao(nome, config, documentos, diretorio, preprocessar=True, motor=None):
+    from pdf2image import convert_from_path
+
+    motor = motor or MotorPytesseract()
+    paginas = 0
+    tempo_preprocessamento = 0.0
+    tempo_tesseract = 0.0
+    esperados = set()
+    encontrados = set()
+
+    for doc in documentos:
+        imagens = convert_from_path(os.path.join(diretorio, doc['arquivo']), dpi=config.dpi, grayscale=True)
+        textos = []
+        for imagem in imagens:
+            inicio = time.perf_counter()
+            if preprocessar:
+                imagem = preprocessar_imagem(imagem, config)
+            tempo_preprocessamento += time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            textos.append(motor.reconhecer(imagem, config))
+            tempo_tesseract += time.perf_counter() - inicio
+            paginas += 1
+
+        esperados.update(doc['numeros'])
+        encontrados.update(extrair_numeros(textos, ocr=True))
+
+    corretos = encontrados & esperados
+    resultado = {
+        'configuracao': nome,
+        'paginas': paginas,
+        'preprocessamento_ms_pagina': round(tempo_preprocessamento / paginas * 1000, 1),
+        'tesseract_ms_pagina': round(tempo_tesseract / paginas * 1000, 1),
+        'recall': round(len(corretos) / len(esperados), 4) if esperados else None,
+        'falsos_positivos': len(encontrados - esperados),
+    }
+    print(
+        f"{nome:<28} pré: {resultado['preprocessamento_ms_pagina']:>7} ms/pág  "
+        f"tesseract: {resultado['tesseract_ms_pagina']:>8} ms/pág  "
+        f"recall: {resultado['recall']}  falsos positivos: {resultado['falsos_positivos']}"
+    )
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pré-processamento de OCR')
+    parser.add_argument('--corpus', default=os.path.join(tempfile.gettempdir(), 'tombamento_corpus'))
+    parser.add_argument('--paginas', nargs='+', type=int, default=[10])
+    parser.add_argument('--densidades', nargs='+', default=['baixa', 'alta'])
+    parser.add_argument('--dpi', nargs='+', type=int, default=[200, 300])
+    parser.add_argument('--psm', type=int, default=6)
+    parser.add_argument('--regiao', nargs=4, type=float, metavar=('ESQUERDA', 'TOPO', 'DIREITA', 'BASE'),
+                        help='Recorte da tabela em frações da página (aplica a whitelist)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--motores', action='store_true',
+                        help='Compara pytesseract (subprocesso por página) e tesserocr (modelo carregado)')
+    args = parser.parse_args()
+
+    documentos = gerar_corpus(args.corpus, ('digitalizado',), args.paginas, args.densidades, args.semente)
+
+    medir_configuracao('original (sem pré-proc.)', ConfiguracaoOCR.original(), documentos, args.corpus,
+                       preprocessar=False)
+    for dpi in args.dpi:
+        medir_configuracao(f'pré-processado {dpi} DPI', ConfiguracaoOCR(dpi=dpi, psm=args.psm),
+                           documentos, args.corpus)
+        if args.regiao:
+            medir_configuracao(f'pré-proc. {dpi} DPI + região',
+                               ConfiguracaoOCR(dpi=dpi, psm=args.psm, regiao=tuple(args.regiao)),
+                               documentos, args.corpus)
+
+    if args.motores:
+        config = ConfiguracaoOCR(dpi=args.dpi[0], psm=args.psm)
+        for nome in ('pytesseract', 'tesserocr'):
+            motor = criar_motor(nome)
+            if motor.nome != nome:
+                continue
+            medir_configuracao(f'motor {nome}', config, documentos, args.corpus, motor=motor)
+            motor.encerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark dos backends de extração de texto de `pdf_texto.py`.
+
+Uso:
+    python -m benchmarks.pdf_texto
+    python -m benchmarks.pdf_texto --paginas 10 100 500 --repeticoes 3
+
+Mede páginas/s e recall de números de tombamento de cada backend instalado
+sobre os documentos com camada de texto do corpus sintético.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import gerar_corpus
+from extrator import extrair_numeros
+from pdf_texto import backends_disponiveis
+
+
+def medir_backend(backend, documentos, diretorio, repeticoes):
+    paginas = sum(doc['paginas'] for doc in documentos)
+    melhor = None
+    encontrados = set()
+    for _ in range(repeticoes):
+        encontrados = set()
+        inicio = time.perf_counter()
+        for doc in documentos:
+            textos = list(backend.paginas(os.path.join(diretorio, doc['arquivo'])))
+            encontrados.update(extrair_numeros(textos))
+        segundos = time.perf_counter() - inicio
+        melhor = segundos if melhor is None else min(melhor, segundos)
+
+    esperados = {numero for doc in documentos for numero in doc['numeros']}
+    recall = len(encontrados & esperados) / len(esperados) if esperados else 0
+    print(f'{backend.nome:<12} {paginas / melhor:>10.1f} pág/s   recall: {recall:.4f}   ({paginas} páginas em {melhor:.2f} s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos backends de extração de texto')
+    parser.add_argument('--corpus', default=os.path.join(tempfile.gettempdir(), 'tombamento_corpus'))
+    parser.add_argument('--paginas', nargs='+', type=int, default=[10, 50])
+    parser.add_argument('--densidades', nargs='+', default=['baixa', 'alta'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    documentos = gerar_corpus(args.corpus, ('digital',), args.paginas, args.densidades, args.semente)
+    for backend in backends_disponiveis():
+        medir_backend(backend, documentos, args.corpus, args.repeticoes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark do painel de progresso (`progresso.py`).
+
+Uso:
+    python -m benchmarks.progresso
+    python -m benchmarks.progresso --eventos 20000 --taxa-falhas 0.1
+
+Simula os eventos de um processamento longo e compara a atualização
+anterior da tela (barra, texto e quatro métricas a cada evento, mais um
+st.warning por falha) com o PainelProgresso, que redesenha no máximo
+QUADROS_POR_SEGUNDO vezes por segundo e mantém as falhas em um log de
+altura fixa. Mede eventos/s e quantas mensagens de elementos seriam
+enviadas ao navegador. Roda o Streamlit sem servidor (os elementos são
+montados, mas não transmitidos), então o ganho real no navegador é maior.
+"""
+import argparse
+import logging
+import random
+import time
+import warnings
+
+
+def eventos_sinteticos(quantidade, taxa_falhas, semente):
+    rng = random.Random(semente)
+    for index in range(1, quantidade + 1):
+        sucesso = rng.random() >= taxa_falhas
+        yield {
+            'numero': f'{rng.randrange(10 ** 5):05d}.{rng.randrange(1000):03d}.{rng.randrange(1000):03d}',
+            'index': index,
+            'total': quantidade,
+            'progresso': index / quantidade,
+            'sucesso': sucesso,
+            'mensagem_erro': None if sucesso else 'rejeitado: Tombamento não encontrado',
+        }
+
+
+def atualizacao_anterior(eventos):
+    import streamlit as st
+
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    colunas = [coluna.empty() for coluna in st.columns(4)]
+    mensagens = 4
+    sucessos = falhas = 0
+    for info in eventos:
+        progress_bar.progress(info['progresso'])
+        status_text.text(f"Processando {info['index']}/{info['total']}: {info['numero']}")
+        colunas[0].metric("Tempo Restante", f"{info['total'] - info['index']} seg")
+        colunas[1].metric("Progresso", f"{info['progresso']*100:.1f}%")
+        if info['sucesso']:
+            sucessos += 1
+        else:
+            falhas += 1
+            st.warning(f"Falha ao processar tombamento {info['numero']}")
+            mensagens += 1
+        colunas[2].metric("Sucessos", str(sucessos))
+        colunas[3].metric("Falhas", str(falhas))
+        mensagens += 6
+    return mensagens, None
+
+
+def painel_progresso(eventos, fps):
+    from progresso import PainelProgresso
+
+    painel = PainelProgresso(["Tempo Restante", "Progresso", "Sucessos", "Falhas"], fps=fps)
+    sucessos = falhas = 0
+    for info in eventos:
+        if info['sucesso']:
+            sucessos += 1
+        else:
+            falhas += 1
+            painel.registrar('falha', info['numero'], info['mensagem_erro'])
+        painel.metrica(0, f"{info['total'] - info['index']} seg")
+        painel.metrica(1, f"{info['progresso']*100:.1f}%")
+        painel.metrica(2, sucessos)
+        painel.metrica(3, falhas)
+        painel.atualizar(info['progresso'], f"Processando {info['index']}/{info['total']}: {info['numero']}")
+    painel.renderizar()
+    return painel.mensagens, painel.quadros
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do painel de progresso')
+    parser.add_argument('--eventos', type=int, default=5000)
+    parser.add_argument('--taxa-falhas', type=float, default=0.05)
+    parser.add_argument('--fps', type=float, default=None)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    # Sem servidor o Streamlit avisa a cada elemento que não há sessão
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings('ignore')
+    from progresso import QUADROS_POR_SEGUNDO
+    fps = args.fps or QUADROS_POR_SEGUNDO
+
+    print(f"{args.eventos} eventos, {args.taxa_falhas:.0%} de falhas, painel a {fps:g} quadros/s\n")
+    print(f"{'modo':<22}{'eventos/s':>12}{'mensagens':>12}{'quadros':>10}")
+    for nome, executar in (
+        ('anterior', atualizacao_anterior),
+        ('PainelProgresso', lambda eventos: painel_progresso(eventos, fps)),
+    ):
+        eventos = list(eventos_sinteticos(args.eventos, args.taxa_falhas, args.semente))
+        inicio = time.perf_counter()
+        mensagens, quadros = executar(eventos)
+        segundos = time.perf_counter() - inicio
+        print(f"{nome:<22}{args.eventos / segundos:>12.0f}{mensagens:>12}{quadros if quadros is not None else '-':>10}")
+
+
+if __name__ == '__main__':
+    main()
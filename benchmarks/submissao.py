@@ -0,0 +1,138 @@
+"""
+Benchmark ponta a ponta do fluxo de submissão (`processar_tombamentos`)
+contra o SISGEPAT simulado.
+
+Uso:
+    python -m benchmarks.submissao --quantidade 50 --latencia 0.2
+    python -m benchmarks.submissao --quantidade 200 --taxa-rejeicao 0.05 --taxa-erro 0.01
+    python -m benchmarks.submissao --quantidade 100 --taxa-erro 0.05 --duracao-sessao 60
+
+Requer Chrome instalado (o navegador roda em modo headless). Reporta o
+tempo de login, navegação e submissão, a vazão em tombamentos por minuto
+e, com falhas injetadas, quantas foram recuperadas por novas tentativas.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.corpus import gerar_numero
+from benchmarks.mock_sisgepat import MockSisgepat
+
+
+def gerar_planilha(caminho, quantidade, semente=42):
+    import pandas as pd
+
+    rng = random.Random(semente)
+    numeros = list(dict.fromkeys(gerar_numero(rng) for _ in range(quantidade)))
+    pd.DataFrame(numeros, columns=['Numero_Tombamento']).to_excel(caminho, index=False)
+    return numeros
+
+
+def executar(quantidade, headless=True, semente=42, **opcoes_mock):
+    os.environ.setdefault('TOMBAMENTO_SPANS_FILE', os.devnull)
+    from tomb import SisgepatAutomation
+
+    with tempfile.TemporaryDirectory() as temp_dir, MockSisgepat(semente=semente, **opcoes_mock) as mock:
+        planilha = os.path.join(temp_dir, 'numeros.xlsx')
+        numeros = gerar_planilha(planilha, quantidade, semente)
+
+        inicio = time.perf_counter()
+        bot = SisgepatAutomation(base_url=mock.base_url, headless=headless)
+        tempo_driver = time.perf_counter() - inicio
+        try:
+            inicio_login = time.perf_counter()
+            if not bot.login_with_javascript('000.000.000-00', 'senha'):
+                raise RuntimeError('Falha no login do SISGEPAT simulado')
+            tempo_login = time.perf_counter() - inicio_login
+
+            inicio_fluxo = time.perf_counter()
+            primeiro_item = None
+            sucessos = 0
+            eventos = []
+            falhas = {}
+            recuperados = 0
+            for info in bot.processar_tombamentos(planilha):
+                if info['status'] == 'processando':
+                    if primeiro_item is None:
+                        primeiro_item = time.perf_counter() - inicio_fluxo
+                    sucessos = info['sucessos']
+                    if info['sucesso'] and info['tentativas'] > 1:
+                        recuperados += 1
+                    if not info['sucesso']:
+                        falhas[info['tipo_falha']] = falhas.get(info['tipo_falha'], 0) + 1
+                eventos.append(info['status'])
+                if info['status'] == 'erro':
+                    print(f"Erro no processamento: {info['mensagem']}")
+                    break
+            tempo_fluxo = time.perf_counter() - inicio_fluxo
+        finally:
+            bot.close()
+
+        tempo_total = time.perf_counter() - inicio
+        tempo_submissao = tempo_fluxo - (primeiro_item or 0)
+        estado = mock.estado.resumo()
+
+    return {
+        'quantidade': len(numeros),
+        'sucessos_reportados': sucessos,
+        'recuperados_com_nova_tentativa': recuperados,
+        'falhas_por_tipo': falhas,
+        'concluido': 'concluido' in eventos,
+        'mock': estado,
+        'configuracao_mock': opcoes_mock,
+        'tempo_driver_s': round(tempo_driver, 2),
+        'tempo_login_s': round(tempo_login, 2),
+        'tempo_ate_primeiro_item_s': round(primeiro_item or 0, 2),
+        'tempo_fluxo_s': round(tempo_fluxo, 2),
+        'tempo_total_s': round(tempo_total, 2),
+        'tombamentos_por_minuto': round(len(numeros) / tempo_fluxo * 60, 2) if tempo_fluxo else None,
+        'tombamentos_por_minuto_submissao': round(len(numeros) / tempo_submissao * 60, 2) if tempo_submissao else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de submissão contra o SISGEPAT simulado')
+    parser.add_argument('--quantidade', type=int, default=20)
+    parser.add_argument('--latencia', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0)
+    parser.add_argument('--taxa-rejeicao', type=float, default=0.0)
+    parser.add_argument('--duracao-sessao', type=float, help='Segundos até a sessão do mock expirar')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--com-janela', action='store_true', help='Mostra o navegador (desliga o headless)')
+    parser.add_argument('--saida', default='bench_submissao.json')
+    args = parser.parse_args()
+
+    resultado = executar(
+        args.quantidade,
+        headless=not args.com_janela,
+        semente=args.semente,
+        latencia=args.latencia,
+        jitter=args.jitter,
+        taxa_erro=args.taxa_erro,
+        taxa_rejeicao=args.taxa_rejeicao,
+        duracao_sessao=args.duracao_sessao,
+    )
+
+    print(f"\nTombamentos: {resultado['quantidade']} (aceitos pelo mock: {resultado['mock']['adicionados']}, "
+          f"rejeitados: {resultado['mock']['rejeitados']}, emitidos: {resultado['mock']['itens_emitidos']})")
+    print(f"Recuperados com nova tentativa: {resultado['recuperados_com_nova_tentativa']}, "
+          f"falhas definitivas: {resultado['falhas_por_tipo'] or 0}, "
+          f"sessões expiradas: {resultado['mock']['sessoes_expiradas']}")
+    print(f"Inicialização do Chrome: {resultado['tempo_driver_s']} s")
+    print(f"Login: {resultado['tempo_login_s']} s")
+    print(f"Navegação até o primeiro item: {resultado['tempo_ate_primeiro_item_s']} s")
+    print(f"Fluxo processar_tombamentos: {resultado['tempo_fluxo_s']} s")
+    print(f"Vazão: {resultado['tombamentos_por_minuto']} tombamentos/min "
+          f"({resultado['tombamentos_por_minuto_submissao']} /min desconsiderando a navegação)")
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f'\nResultados gravados em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import time
+
+from extrator import PADRAO_VALIDO
+from rastreamento import span
+
+
+def conciliar_com_dodf(numeros=None, processamento_id=None, db=None, indice=None,
+                       data_inicio=None, data_fim=None, monitor=None):
+    """
+    Confere de uma vez uma lista de números de tombamento (ou os números de
+    um processamento) contra o índice local das edições do DODF e registra
+    em tombamento.db as publicações encontradas para cada número.
+
+    Com `monitor` e um período, as edições do período que ainda não estão
+    no índice são baixadas antes da conferência.
+
+    Retorna um dicionário com o total de números conferidos, os números
+    publicados, os não encontrados, as publicações e o tempo gasto.
+    """
+    from database import TombamentoDatabase
+    from indice_dodf import IndiceDODF
+
+    db = db or TombamentoDatabase()
+    indice = indice or IndiceDODF()
+
+    if numeros is None:
+        if processamento_id is None:
+            raise ValueError("Informe os números ou o processamento_id")
+        numeros = db.get_numeros_processamento(processamento_id)
+    numeros = list(dict.fromkeys(str(n).strip() for n in numeros))
+    validos = [numero for numero in numeros if PADRAO_VALIDO.fullmatch(numero)]
+
+    inicio = time.perf_counter()
+    if monitor is not None and data_inicio and data_fim:
+        monitor.indexar_periodo(data_inicio, data_fim, indice)
+
+    with span('conciliacao_dodf', numeros=len(validos)):
+        publicacoes = indice.buscar_tombamentos(validos, data_inicio, data_fim)
+        db.registrar_publicacoes(publicacoes, processamento_id)
+
+    publicados = sorted({p['numero'] for p in publicacoes})
+    encontrados = set(publicados)
+    return {
+        'total': len(validos),
+        'invalidos': len(numeros) - len(validos),
+        'publicados': publicados,
+        'nao_encontrados': [numero for numero in validos if numero not in encontrados],
+        'publicacoes': publicacoes,
+        'segundos': time.perf_counter() - inicio,
+    }
@@ -0,0 +1,174 @@
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: os limites valem só para o processo
+    fcntl = None
+
+# Navegadores (Chrome) abertos ao mesmo tempo na máquina
+MAX_NAVEGADORES = int(os.environ.get('TOMBAMENTO_MAX_NAVEGADORES', 2))
+
+# Extrações de PDF (OCR) ao mesmo tempo na máquina
+MAX_OCR = int(os.environ.get('TOMBAMENTO_MAX_OCR', 1))
+
+# Diretório dos arquivos de vaga, compartilhado pelos processos da máquina
+DIRETORIO_VAGAS = os.environ.get(
+    'TOMBAMENTO_VAGAS', os.path.join(tempfile.gettempdir(), 'tombamento_vagas')
+)
+
+# Diretório base dos espaços de trabalho de cada processamento
+DIRETORIO_TRABALHO = os.environ.get('TOMBAMENTO_TRABALHO') or None
+
+# Intervalo entre tentativas quando as vagas estão com outros processos
+INTERVALO_ESPERA = 0.5
+
+
+@contextmanager
+def espaco_trabalho(prefixo='tombamento_'):
+    """
+    Diretório temporário exclusivo de um processamento (PDFs enviados e
+    arquivos gerados), removido ao final. Evita que sessões simultâneas
+    sobrescrevam os arquivos umas das outras.
+    """
+    if DIRETORIO_TRABALHO:
+        os.makedirs(DIRETORIO_TRABALHO, exist_ok=True)
+    caminho = tempfile.mkdtemp(prefix=prefixo, dir=DIRETORIO_TRABALHO)
+    try:
+        yield caminho
+    finally:
+        shutil.rmtree(caminho, ignore_errors=True)
+
+
+class ControleAdmissao:
+    def __init__(self, recurso, limite, diretorio=None):
+        """
+        Limita quantos usos de um recurso (navegador, OCR) acontecem ao mesmo
+        tempo na máquina e distribui as vagas de forma justa entre usuários.
+
+        Cada vaga é um arquivo com trava exclusiva (flock): vale para todos os
+        processos da máquina e é liberada pelo sistema se o processo morrer.
+        Dentro do processo, quem espera entra em uma fila; quando uma vaga
+        abre, ela vai para o usuário com menos usos em andamento, depois para
+        o que recebeu menos vagas desde que começou a esperar e, por fim,
+        para quem chegou primeiro (rodízio entre usuários). Assim um usuário
+        com vários processamentos não ocupa todas as vagas enquanto outros
+        esperam.
+
+        O rodízio vale só dentro de um processo (um servidor Streamlit).
+        Entre processos o limite de vagas é respeitado, mas a vaga que abre
+        fica com o primeiro processo que tentar travá-la (a cada
+        INTERVALO_ESPERA), sem ordem entre usuários de processos diferentes.
+        """
+        self.recurso = recurso
+        self.limite = max(1, limite)
+        self.diretorio = diretorio or DIRETORIO_VAGAS
+        self._condicao = threading.Condition()
+        self._senhas = itertools.count()
+        self._esperando = {}
+        self._ativos = {}
+        self._atendidos = {}
+        self._vagas_livres = list(range(self.limite))
+
+    def _ocupar_vaga(self):
+        """Tenta travar um arquivo de vaga livre; retorna (vaga, arquivo) ou None"""
+        for vaga in list(self._vagas_livres):
+            if fcntl is None:
+                self._vagas_livres.remove(vaga)
+                return vaga, None
+            os.makedirs(self.diretorio, exist_ok=True)
+            arquivo = open(os.path.join(self.diretorio, f'{self.recurso}_{vaga}.lock'), 'w')
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Ocupada por outro processo
+                arquivo.close()
+                continue
+            self._vagas_livres.remove(vaga)
+            return vaga, arquivo
+        return None
+
+    def _liberar_vaga(self, vaga, arquivo):
+        if arquivo is not None:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+            arquivo.close()
+        self._vagas_livres.append(vaga)
+
+    def _fila(self):
+        """Senhas em espera na ordem em que receberão as vagas"""
+        return sorted(
+            self._esperando,
+            key=lambda senha: (
+                self._ativos.get(self._esperando[senha], 0),
+                self._atendidos.get(self._esperando[senha], 0),
+                senha
+            )
+        )
+
+    def em_uso(self):
+        with self._condicao:
+            return sum(self._ativos.values())
+
+    @contextmanager
+    def admitir(self, usuario, ao_esperar=None):
+        """
+        Espera uma vaga do recurso para `usuario` e a mantém durante o
+        bloco. `ao_esperar(posicao)` é chamado enquanto a vez não chega.
+        """
+        usuario = usuario or 'anônimo'
+        with self._condicao:
+            senha = next(self._senhas)
+            self._esperando[senha] = usuario
+            try:
+                while True:
+                    posicao = self._fila().index(senha) + 1
+                    ocupada = posicao == 1 and self._ocupar_vaga()
+                    if ocupada:
+                        break
+                    if ao_esperar is not None:
+                        self._condicao.release()
+                        try:
+                            ao_esperar(posicao)
+                        finally:
+                            self._condicao.acquire()
+                    self._condicao.wait(INTERVALO_ESPERA)
+            finally:
+                del self._esperando[senha]
+                self._condicao.notify_all()
+            self._ativos[usuario] = self._ativos.get(usuario, 0) + 1
+            self._atendidos[usuario] = self._atendidos.get(usuario, 0) + 1
+
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._liberar_vaga(*ocupada)
+                self._ativos[usuario] -= 1
+                if not self._ativos[usuario]:
+                    del self._ativos[usuario]
+                    # Sem nada em andamento nem na fila, o rodízio recomeça
+                    if usuario not in self._esperando.values():
+                        del self._atendidos[usuario]
+                self._condicao.notify_all()
+
+
+_controles = {}
+_controles_lock = threading.Lock()
+
+
+def obter_controle(recurso):
+    """Retorna o controle de admissão do recurso ('navegador' ou 'ocr'), criando-o no primeiro uso"""
+    with _controles_lock:
+        if recurso not in _controles:
+            limite = MAX_NAVEGADORES if recurso == 'navegador' else MAX_OCR
+            _controles[recurso] = ControleAdmissao(recurso, limite)
+        return _controles[recurso]
+
+
+def admitir(recurso, usuario, ao_esperar=None):
+    """Atalho para obter_controle(recurso).admitir(usuario, ao_esperar)"""
+    return obter_controle(recurso).admitir(usuario, ao_esperar)
@@ -1,56 +1,261 @@
+import os
 import sqlite3
+import time
 from datetime import datetime
 import pandas as pd
 
+from extrator import numero_para_inteiro, inteiro_para_numero
+
+TOMBAMENTO_DB = os.environ.get('TOMBAMENTO_DB', 'tombamento.db')
+
+# Segundos que uma conexão espera por outra que está gravando
+ESPERA_BLOQUEIO = 30
+
+# Versão do esquema (PRAGMA user_version). 0 = esquema antigo, com números,
+# status e datas em texto; 1 = esquema compacto, com inteiros
+VERSAO_ESQUEMA = 1
+
+# Códigos do status dos tombamentos
+STATUS = {'sucesso': 1, 'falha': 2}
+STATUS_NOMES = {codigo: nome for nome, codigo in STATUS.items()}
+
+# Números de tombamento são guardados como o inteiro dos 11 dígitos
+# (00001.758.880 -> 1758880); estas expressões os formatam de volta no SQL
+_NUMERO = "printf('%05d.%03d.%03d', {0} / 1000000, {0} / 1000 % 1000, {0} % 1000)"
+_STATUS = "CASE {0} " + ' '.join(f"WHEN {codigo} THEN '{nome}'" for nome, codigo in STATUS.items()) + " END"
+_DATA = "datetime({0}, 'unixepoch', 'localtime')"
+
+# Conversões usadas na migração do esquema antigo
+_NUMERO_TEXTO_VALIDO = "{0} GLOB '[0-9][0-9][0-9][0-9][0-9].[0-9][0-9][0-9].[0-9][0-9][0-9]'"
+_NUMERO_TEXTO = "CAST(replace({0}, '.', '') AS INTEGER)"
+_STATUS_TEXTO = "CASE {0} " + ' '.join(f"WHEN '{nome}' THEN {codigo}" for nome, codigo in STATUS.items()) + " END"
+_DATA_TEXTO = "CAST(strftime('%s', {0}, 'utc') AS INTEGER)"
+
+
+def _epoca(data=None):
+    """Segundos desde a época (inteiro) de um datetime, de um número ou de agora"""
+    if data is None:
+        return int(time.time())
+    if isinstance(data, datetime):
+        return int(data.timestamp())
+    return int(data)
+
+
 class TombamentoDatabase:
-    def __init__(self):
-        self.db_path = 'tombamento.db'
+    def __init__(self, db_path=None):
+        self.db_path = db_path or TOMBAMENTO_DB
         self.init_database()
-    
+
+    def _conectar(self):
+        # Várias sessões gravam ao mesmo tempo: espera a vez em vez de falhar
+        return sqlite3.connect(self.db_path, timeout=ESPERA_BLOQUEIO)
+
+    def _tabelas(self, cursor):
+        return {linha[0] for linha in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
     def init_database(self):
-        """Inicializa o banco de dados com as tabelas necessárias"""
-        conn = sqlite3.connect(self.db_path)
+        """
+        Inicializa o banco de dados com as tabelas necessárias. Um banco no
+        esquema antigo (versão 0) é migrado para o compacto: uma cópia é
+        guardada em <banco>.v0.bak antes da migração.
+        """
+        conn = self._conectar()
+        conn.isolation_level = None
         cursor = conn.cursor()
-        
-        # Tabela de processamentos
+        # WAL: leituras não bloqueiam a gravação de outros processamentos
+        cursor.execute('PRAGMA journal_mode=WAL')
+
+        if cursor.execute('PRAGMA user_version').fetchone()[0] < VERSAO_ESQUEMA and \
+                'tombamentos' in self._tabelas(cursor):
+            self._copia_seguranca(conn)
+
+        # Uma sessão por vez cria ou migra as tabelas
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            versao = cursor.execute('PRAGMA user_version').fetchone()[0]
+            migrar = versao < VERSAO_ESQUEMA and 'tombamentos' in self._tabelas(cursor)
+            if migrar:
+                antigas = self._renomear_antigas(cursor)
+            self._criar_tabelas(cursor)
+            if migrar:
+                self._migrar_antigas(cursor, antigas)
+            cursor.execute(f'PRAGMA user_version = {VERSAO_ESQUEMA}')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            conn.close()
+            raise
+
+        if migrar:
+            # Devolve ao disco o espaço das tabelas antigas
+            cursor.execute('VACUUM')
+        conn.close()
+
+    def _copia_seguranca(self, conn):
+        destino = f'{self.db_path}.v0.bak'
+        if os.path.exists(destino):
+            return
+        copia = sqlite3.connect(destino)
+        conn.backup(copia)
+        copia.close()
+
+    def _criar_tabelas(self, cursor):
+        # Tabela de processamentos (datas em segundos desde a época; data_fim
+        # é preenchida quando os totais finais são gravados)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS processamentos (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                data_hora TIMESTAMP,
+                data_hora INTEGER,
                 usuario TEXT,
                 tipo_arquivo TEXT,
                 total_processado INTEGER,
                 sucessos INTEGER,
-                falhas INTEGER
+                falhas INTEGER,
+                data_fim INTEGER
             )
         ''')
-        
-        # Tabela de tombamentos
+
+        # Tabela de tombamentos (número como inteiro, status pelo código de STATUS)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS tombamentos (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                numero TEXT,
+                numero INTEGER NOT NULL,
                 processamento_id INTEGER,
-                status TEXT,
-                data_processamento TIMESTAMP,
+                status INTEGER NOT NULL,
+                data_processamento INTEGER,
                 mensagem_erro TEXT,
                 FOREIGN KEY (processamento_id) REFERENCES processamentos(id)
             )
         ''')
-        
-        conn.commit()
-        conn.close()
-    
+
+        # Publicações no DODF encontradas para cada número (conciliação)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS publicacoes_dodf (
+                numero INTEGER,
+                link TEXT,
+                pagina INTEGER,
+                edicao TEXT,
+                numero_edicao TEXT,
+                data_publicacao TEXT,
+                processamento_id INTEGER,
+                data_conciliacao INTEGER,
+                PRIMARY KEY (numero, link, pagina)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tombamentos_processamento ON tombamentos (processamento_id)')
+
+        # Números já enviados ao SISGEPAT: no máximo uma linha por número
+        # (a chave inteira é o próprio rowid da tabela)
+        novo = 'tombamentos_enviados' not in self._tabelas(cursor)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tombamentos_enviados (
+                numero INTEGER PRIMARY KEY,
+                processamento_id INTEGER,
+                data_envio INTEGER
+            )
+        ''')
+        if novo:
+            # Primeira vez: considera enviados os sucessos já registrados
+            cursor.execute('''
+                INSERT OR IGNORE INTO tombamentos_enviados (numero, processamento_id, data_envio)
+                SELECT numero, processamento_id, data_processamento
+                FROM tombamentos
+                WHERE status = ?
+                ORDER BY data_processamento
+            ''', (STATUS['sucesso'],))
+
+        # Reservas de números em processamento (expira_em em segundos desde a época)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reservas (
+                numero INTEGER PRIMARY KEY,
+                dono TEXT,
+                expira_em REAL,
+                processamento_id INTEGER
+            )
+        ''')
+
+    def _renomear_antigas(self, cursor):
+        """Renomeia as tabelas do esquema antigo para <tabela>_v0"""
+        antigas = []
+        cursor.execute('DROP INDEX IF EXISTS idx_tombamentos_processamento')
+        for tabela in ('processamentos', 'tombamentos', 'publicacoes_dodf', 'tombamentos_enviados', 'reservas'):
+            if tabela in self._tabelas(cursor):
+                cursor.execute(f'ALTER TABLE {tabela} RENAME TO {tabela}_v0')
+                antigas.append(tabela)
+        return antigas
+
+    def _migrar_antigas(self, cursor, antigas):
+        """
+        Copia os dados das tabelas _v0 para o esquema compacto e as remove.
+        Tombamentos com número ou status que não podem ser convertidos ficam
+        em tombamentos_nao_migrados, como estavam.
+        """
+        if 'processamentos' in antigas:
+            cursor.execute(f'''
+                INSERT INTO processamentos
+                (id, data_hora, usuario, tipo_arquivo, total_processado, sucessos, falhas, data_fim)
+                SELECT id, {_DATA_TEXTO.format('data_hora')}, usuario, tipo_arquivo,
+                       total_processado, sucessos, falhas, {_DATA_TEXTO.format('data_hora')}
+                FROM processamentos_v0
+            ''')
+
+        valido = f"{_NUMERO_TEXTO_VALIDO.format('numero')} AND {_STATUS_TEXTO.format('status')} IS NOT NULL"
+        cursor.execute(f'''
+            INSERT INTO tombamentos
+            (id, numero, processamento_id, status, data_processamento, mensagem_erro)
+            SELECT id, {_NUMERO_TEXTO.format('numero')}, processamento_id, {_STATUS_TEXTO.format('status')},
+                   {_DATA_TEXTO.format('data_processamento')}, mensagem_erro
+            FROM tombamentos_v0
+            WHERE {valido}
+        ''')
+        if cursor.execute(f'SELECT 1 FROM tombamentos_v0 WHERE NOT ({valido}) LIMIT 1').fetchone():
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS tombamentos_nao_migrados AS
+                SELECT * FROM tombamentos_v0 WHERE NOT ({valido})
+            ''')
+
+        if 'tombamentos_enviados' in antigas:
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO tombamentos_enviados (numero, processamento_id, data_envio)
+                SELECT {_NUMERO_TEXTO.format('numero')}, processamento_id, {_DATA_TEXTO.format('data_envio')}
+                FROM tombamentos_enviados_v0
+                WHERE {_NUMERO_TEXTO_VALIDO.format('numero')}
+            ''')
+
+        # Sucessos anteriores à tabela de enviados também contam como enviados
+        cursor.execute('''
+            INSERT OR IGNORE INTO tombamentos_enviados (numero, processamento_id, data_envio)
+            SELECT numero, processamento_id, data_processamento
+            FROM tombamentos
+            WHERE status = ?
+            ORDER BY data_processamento
+        ''', (STATUS['sucesso'],))
+
+        if 'publicacoes_dodf' in antigas:
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO publicacoes_dodf
+                (numero, link, pagina, edicao, numero_edicao, data_publicacao, processamento_id, data_conciliacao)
+                SELECT {_NUMERO_TEXTO.format('numero')}, link, pagina, edicao, numero_edicao, data_publicacao,
+                       processamento_id, {_DATA_TEXTO.format('data_conciliacao')}
+                FROM publicacoes_dodf_v0
+                WHERE {_NUMERO_TEXTO_VALIDO.format('numero')}
+            ''')
+
+        # Reservas não são migradas: as de um processamento em andamento
+        # durante a atualização apenas deixam de valer
+        for tabela in antigas:
+            cursor.execute(f'DROP TABLE {tabela}_v0')
+
     def registrar_processamento(self, usuario, tipo_arquivo, total, sucessos=0, falhas=0):
         """Registra um novo processamento"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conectar()
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO processamentos 
             (data_hora, usuario, tipo_arquivo, total_processado, sucessos, falhas)
             VALUES (?, ?, ?, ?, ?, ?)
-        ''', (datetime.now(), usuario, tipo_arquivo, total, sucessos, falhas))
+        ''', (_epoca(), usuario, tipo_arquivo, total, sucessos, falhas))
         
         processamento_id = cursor.lastrowid
         conn.commit()
@@ -60,21 +265,41 @@ class TombamentoDatabase:
     
     def registrar_tombamento(self, numero, processamento_id, status, mensagem_erro=None):
         """Registra um tombamento individual"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conectar()
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO tombamentos 
             (numero, processamento_id, status, data_processamento, mensagem_erro)
             VALUES (?, ?, ?, ?, ?)
-        ''', (numero, processamento_id, status, datetime.now(), mensagem_erro))
+        ''', (numero_para_inteiro(numero), processamento_id, STATUS[status], _epoca(), mensagem_erro))
         
         conn.commit()
         conn.close()
-    
+
+    def registrar_tombamentos(self, processamento_id, resultados):
+        """
+        Registra vários tombamentos em uma única transação.
+        `resultados` - lista de (numero, status, data_processamento, mensagem_erro);
+        data_processamento pode ser datetime ou segundos desde a época
+        """
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        cursor.executemany('''
+            INSERT INTO tombamentos
+            (numero, processamento_id, status, data_processamento, mensagem_erro)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(numero_para_inteiro(numero), processamento_id, STATUS[status], _epoca(data_processamento),
+               mensagem_erro)
+              for numero, status, data_processamento, mensagem_erro in resultados])
+
+        conn.commit()
+        conn.close()
+
     def get_estatisticas_gerais(self):
         """Retorna estatísticas gerais do sistema"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conectar()
         
         stats = pd.read_sql('''
             SELECT 
@@ -93,11 +318,11 @@ class TombamentoDatabase:
     
     def get_ultimos_processamentos(self, limit=10):
         """Retorna os últimos processamentos"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conectar()
         
         df = pd.read_sql(f'''
             SELECT 
-                data_hora,
+                {_DATA.format('data_hora')} as data_hora,
                 usuario,
                 tipo_arquivo,
                 total_processado,
@@ -107,47 +332,314 @@ class TombamentoDatabase:
                     CASE WHEN total_processado = 0 THEN 1 
                     ELSE total_processado END * 100, 2) as taxa_sucesso
             FROM processamentos
-            ORDER BY data_hora DESC
-            LIMIT {limit}
-        ''', conn)
+            ORDER BY processamentos.data_hora DESC, id DESC
+            LIMIT ?
+        ''', conn, params=(limit,))
         
         conn.close()
         return df
     
     def get_tombamentos_status(self, status=None, limit=100):
         """Retorna os últimos tombamentos por status"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conectar()
         
         query = '''
-            SELECT 
-                t.numero,
-                t.status,
-                t.data_processamento,
-                t.mensagem_erro,
-                p.usuario
+            SELECT t.id, t.numero, t.status, t.data_processamento, t.mensagem_erro, p.usuario
             FROM tombamentos t
             JOIN processamentos p ON t.processamento_id = p.id
         '''
+        parametros = []
         
         if status:
-            query += f" WHERE t.status = '{status}'"
+            query += " WHERE t.status = ?"
+            parametros.append(STATUS.get(status))
         
-        query += f" ORDER BY t.data_processamento DESC LIMIT {limit}"
+        query += " ORDER BY t.data_processamento DESC, t.id DESC LIMIT ?"
+        parametros.append(limit)
+
+        # Formata só as linhas selecionadas, não todas as que são ordenadas
+        query = f'''
+            SELECT
+                {_NUMERO.format('numero')} as numero,
+                {_STATUS.format('status')} as status,
+                {_DATA.format('data_processamento')} as data_processamento,
+                mensagem_erro,
+                usuario
+            FROM ({query})
+            ORDER BY data_processamento DESC, id DESC
+        '''
         
-        df = pd.read_sql(query, conn)
+        df = pd.read_sql(query, conn, params=parametros)
         conn.close()
         return df 
     
-    def atualizar_processamento(self, processamento_id, sucessos, falhas):
-        """Atualiza os resultados de um processamento"""
-        conn = sqlite3.connect(self.db_path)
+    def atualizar_processamento(self, processamento_id, sucessos, falhas, total=None):
+        """
+        Atualiza os resultados finais de um processamento e marca o fim dele
+        (data_fim). `total` permite corrigir o total quando ele só é
+        conhecido no fim.
+        """
+        conn = self._conectar()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            UPDATE processamentos 
-            SET sucessos = ?, falhas = ?
-            WHERE id = ?
-        ''', (sucessos, falhas, processamento_id))
+        if total is None:
+            cursor.execute('''
+                UPDATE processamentos 
+                SET sucessos = ?, falhas = ?, data_fim = ?
+                WHERE id = ?
+            ''', (sucessos, falhas, _epoca(), processamento_id))
+        else:
+            cursor.execute('''
+                UPDATE processamentos 
+                SET sucessos = ?, falhas = ?, total_processado = ?, data_fim = ?
+                WHERE id = ?
+            ''', (sucessos, falhas, total, _epoca(), processamento_id))
         
         conn.commit()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+    def get_processamentos_arquivaveis(self, ate):
+        """
+        Processamentos iniciados antes de `ate` (segundos desde a época) e os
+        tombamentos deles, nas colunas do banco (números, status e datas
+        inteiros), com o mês do processamento ('AAAA-MM') em `mes`. Ficam de
+        fora os processamentos que não terminaram (sem data_fim) e os que
+        ainda têm reservas valendo, cujos tombamentos podem estar sendo
+        gravados. Retorna (processamentos, tombamentos).
+        """
+        encerrado = '''
+            {0}.data_hora < ? AND {0}.data_fim IS NOT NULL
+            AND {0}.id NOT IN (
+                SELECT processamento_id FROM reservas
+                WHERE processamento_id IS NOT NULL AND expira_em >= ?
+            )
+        '''
+        parametros = (ate, time.time())
+        conn = self._conectar()
+
+        processamentos = pd.read_sql(f'''
+            SELECT p.*, strftime('%Y-%m', p.data_hora, 'unixepoch', 'localtime') as mes
+            FROM processamentos p
+            WHERE {encerrado.format('p')}
+            ORDER BY p.id
+        ''', conn, params=parametros)
+        tombamentos = pd.read_sql(f'''
+            SELECT t.*, strftime('%Y-%m', p.data_hora, 'unixepoch', 'localtime') as mes
+            FROM tombamentos t
+            JOIN processamentos p ON t.processamento_id = p.id
+            WHERE {encerrado.format('p')}
+            ORDER BY t.id
+        ''', conn, params=parametros)
+
+        conn.close()
+        return processamentos, tombamentos
+
+    def remover_processamentos(self, ids):
+        """Remove os processamentos e os tombamentos deles em uma única transação"""
+        ids = [(int(processamento_id),) for processamento_id in ids]
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        cursor.executemany('DELETE FROM tombamentos WHERE processamento_id = ?', ids)
+        removidos = cursor.rowcount
+        cursor.executemany('DELETE FROM processamentos WHERE id = ?', ids)
+
+        conn.commit()
+        conn.close()
+        return removidos
+
+    def compactar(self):
+        """Devolve ao disco o espaço de linhas removidas (VACUUM)"""
+        conn = self._conectar()
+        try:
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+    def get_tombamentos_relatorio(self, desde=None):
+        """
+        Tombamentos para os relatórios, nas colunas do banco, com o usuário e
+        o mês ('AAAA-MM') do processamento; `desde` filtra a partir de um mês.
+        """
+        conn = self._conectar()
+
+        # Tombamentos antigos, sem processamento, usam o próprio mês
+        query = '''
+            SELECT * FROM (
+                SELECT t.id, t.processamento_id, t.status, t.mensagem_erro, p.usuario,
+                       strftime('%Y-%m', COALESCE(p.data_hora, t.data_processamento), 'unixepoch', 'localtime') as mes
+                FROM tombamentos t
+                LEFT JOIN processamentos p ON t.processamento_id = p.id
+            )
+        '''
+        parametros = []
+        if desde:
+            query += ' WHERE mes >= ?'
+            parametros.append(desde)
+
+        df = pd.read_sql(query, conn, params=parametros)
+        conn.close()
+        return df
+
+    def get_processamentos_relatorio(self, desde=None):
+        """Processamentos para os relatórios, com o mês ('AAAA-MM') de cada um"""
+        conn = self._conectar()
+
+        query = '''
+            SELECT * FROM (
+                SELECT id, usuario, total_processado, sucessos, falhas,
+                       strftime('%Y-%m', data_hora, 'unixepoch', 'localtime') as mes
+                FROM processamentos
+            )
+        '''
+        parametros = []
+        if desde:
+            query += ' WHERE mes >= ?'
+            parametros.append(desde)
+
+        df = pd.read_sql(query, conn, params=parametros)
+        conn.close()
+        return df
+
+    def get_numeros_processamento(self, processamento_id):
+        """Números de tombamento registrados em um processamento"""
+        conn = self._conectar()
+        numeros = [
+            inteiro_para_numero(linha[0]) for linha in conn.execute(
+                'SELECT DISTINCT numero FROM tombamentos WHERE processamento_id = ?', (processamento_id,)
+            )
+        ]
+        conn.close()
+        return numeros
+
+    def registrar_publicacoes(self, publicacoes, processamento_id=None):
+        """
+        Registra em lote as publicações no DODF encontradas na conciliação.
+        Uma publicação já registrada para o número não é duplicada.
+        """
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        agora = _epoca()
+        cursor.executemany('''
+            INSERT OR IGNORE INTO publicacoes_dodf
+            (numero, link, pagina, edicao, numero_edicao, data_publicacao, processamento_id, data_conciliacao)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(numero_para_inteiro(p['numero']), p['link'], p['pagina'], p['edicao'], p['numero_edicao'],
+               p['data'], processamento_id, agora) for p in publicacoes])
+        inseridas = conn.total_changes
+
+        conn.commit()
+        conn.close()
+        return inseridas
+
+    def get_publicacoes_dodf(self, processamento_id=None, limit=1000):
+        """Retorna as publicações no DODF registradas (de um processamento, se informado)"""
+        conn = self._conectar()
+
+        query = f'''
+            SELECT
+                {_NUMERO.format('p.numero')} as numero,
+                p.edicao,
+                p.data_publicacao,
+                p.pagina,
+                p.link,
+                {_DATA.format('p.data_conciliacao')} as data_conciliacao
+            FROM publicacoes_dodf p
+        '''
+        parametros = []
+        if processamento_id is not None:
+            query += ' WHERE p.numero IN (SELECT numero FROM tombamentos WHERE processamento_id = ?)'
+            parametros.append(processamento_id)
+        query += ' ORDER BY p.data_conciliacao DESC, p.numero LIMIT ?'
+        parametros.append(limit)
+
+        df = pd.read_sql(query, conn, params=parametros)
+        conn.close()
+        return df
+
+
+    def get_numeros_enviados(self):
+        """Conjunto dos números já enviados com sucesso ao SISGEPAT"""
+        conn = self._conectar()
+        numeros = {
+            linha[0] for linha in conn.execute(f"SELECT {_NUMERO.format('numero')} FROM tombamentos_enviados")
+        }
+        conn.close()
+        return numeros
+
+    def get_chaves_enviadas(self):
+        """Os números já enviados como chaves inteiras (sem formatar, carga mais rápida)"""
+        conn = self._conectar()
+        chaves = {linha[0] for linha in conn.execute('SELECT numero FROM tombamentos_enviados')}
+        conn.close()
+        return chaves
+
+    def numero_enviado(self, numero):
+        conn = self._conectar()
+        enviado = conn.execute(
+            'SELECT 1 FROM tombamentos_enviados WHERE numero = ?', (numero_para_inteiro(numero),)
+        ).fetchone()
+        conn.close()
+        return enviado is not None
+
+    def reservar_numero(self, numero, dono, duracao, processamento_id=None):
+        """
+        Reserva um número para `dono` por `duracao` segundos, em um único
+        comando (atômico mesmo com vários processos usando o banco). Falha se
+        o número já foi enviado ou está reservado por outro dono e a reserva
+        ainda não expirou. Retorna True se a reserva foi feita.
+        `processamento_id` impede que o processamento seja arquivado
+        enquanto a reserva estiver valendo.
+        """
+        agora = time.time()
+        chave = numero_para_inteiro(numero)
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT INTO reservas (numero, dono, expira_em, processamento_id)
+            SELECT ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM tombamentos_enviados WHERE numero = ?)
+            ON CONFLICT (numero) DO UPDATE SET dono = excluded.dono, expira_em = excluded.expira_em,
+                processamento_id = excluded.processamento_id
+            WHERE reservas.dono = excluded.dono OR reservas.expira_em < ?
+        ''', (chave, dono, agora + duracao, processamento_id, chave, agora))
+        reservado = cursor.rowcount == 1
+
+        conn.commit()
+        conn.close()
+        return reservado
+
+    def renovar_reservas(self, dono, duracao):
+        """Estende as reservas de `dono` por mais `duracao` segundos"""
+        conn = self._conectar()
+        conn.execute('UPDATE reservas SET expira_em = ? WHERE dono = ?', (time.time() + duracao, dono))
+        conn.commit()
+        conn.close()
+
+    def confirmar_envios(self, numeros, dono, processamento_id=None):
+        """Registra os números como enviados e encerra as reservas deles"""
+        chaves = [numero_para_inteiro(numero) for numero in numeros]
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        agora = _epoca()
+        cursor.executemany('''
+            INSERT OR IGNORE INTO tombamentos_enviados (numero, processamento_id, data_envio)
+            VALUES (?, ?, ?)
+        ''', [(chave, processamento_id, agora) for chave in chaves])
+        cursor.executemany(
+            'DELETE FROM reservas WHERE numero = ? AND dono = ?',
+            [(chave, dono) for chave in chaves]
+        )
+
+        conn.commit()
+        conn.close()
+
+    def liberar_reservas(self, dono):
+        """Libera todas as reservas de `dono` (fim ou interrupção do processamento)"""
+        conn = self._conectar()
+        conn.execute('DELETE FROM reservas WHERE dono = ?', (dono,))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,633 @@
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from localizador import Localizador
+from rastreamento import pausa, span
+
+DODF_URL = os.environ.get('DODF_URL', 'https://dodf.df.gov.br/')
+
+# Edições do DODF passam de 10 MB com frequência; acima disso provavelmente
+# não é um PDF de edição (ou o download está corrompido)
+TAMANHO_MAXIMO_PDF = int(os.environ.get('DODF_TAMANHO_MAXIMO_MB', '100')) * 1024 * 1024
+
+# Downloads simultâneos (e conexões mantidas abertas com o servidor)
+WORKERS_DOWNLOAD = int(os.environ.get('DODF_WORKERS', '6'))
+
+TAMANHO_BLOCO = 64 * 1024
+
+# Listagens lidas depois que o dia terminou não mudam e ficam em disco; as
+# lidas durante o próprio dia podem ganhar edições extras, só são
+# reaproveitadas por alguns minutos e são lidas de novo depois da meia-noite
+DIRETORIO_CACHE = os.environ.get('DODF_CACHE', 'dodf_cache')
+VALIDADE_LISTAGEM_HOJE = 15 * 60
+
+MESES = {
+    1: 'Janeiro', 2: 'Fevereiro', 3: 'Marco', 4: 'Abril',
+    5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
+    9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
+}
+
+CABECALHOS_HTML = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+CABECALHOS_PDF = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0',
+    'Accept': 'application/pdf,application/x-pdf',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+
+class PDFMuitoGrande(Exception):
+    pass
+
+
+class EdicaoIndisponivel(Exception):
+    pass
+
+
+class LeitorPasta(HTMLParser):
+    """Coleta (nome, href) dos links `a.link-materia` da página da pasta do dia"""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self._link = None
+        self._no_p = False
+        self._texto = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'a' and 'link-materia' in (attrs.get('class') or '').split():
+            self._link = attrs.get('href')
+            self._texto = []
+        elif tag == 'p' and self._link is not None:
+            self._no_p = True
+
+    def handle_endtag(self, tag):
+        if tag == 'p':
+            self._no_p = False
+        elif tag == 'a' and self._link is not None:
+            self.links.append((' '.join(''.join(self._texto).split()), self._link))
+            self._link = None
+
+    def handle_data(self, data):
+        if self._no_p:
+            self._texto.append(data)
+
+
+def montar_edicoes(links, data):
+    """Converte os links (nome, href) da pasta em edições, como no notebook"""
+    edicoes = []
+    for nome_arquivo, link in links:
+        # Extrai o número da edição do nome do arquivo
+        # Formato esperado: "DODF XXX DD-MM-AAAA ..."
+        match = re.search(r'DODF (\d+)', nome_arquivo)
+        if match:
+            edicoes.append({
+                'numero': match.group(1),
+                'nome': nome_arquivo,
+                'link': link,
+                'data': data
+            })
+    return edicoes
+
+
+def datas_do_periodo(data_inicio, data_fim):
+    """Lista as datas (dd/mm/aaaa) de data_inicio a data_fim, inclusive"""
+    inicio = datetime.strptime(data_inicio, '%d/%m/%Y')
+    fim = datetime.strptime(data_fim, '%d/%m/%Y')
+    return [(inicio + timedelta(days=d)).strftime('%d/%m/%Y') for d in range((fim - inicio).days + 1)]
+
+
+class DODFMonitor:
+    def __init__(self, email_remetente="", senha_email="", email_destinatario="",
+                 base_url=None, workers=WORKERS_DOWNLOAD, tamanho_maximo=TAMANHO_MAXIMO_PDF,
+                 diretorio_cache=None):
+        """
+        Pesquisa nomes nas edições do Diário Oficial do DF.
+
+        Os PDFs são baixados em paralelo (`workers` downloads simultâneos) por
+        uma única sessão HTTP, que reaproveita as conexões com o servidor do
+        DODF entre uma edição e outra. As listagens das pastas de cada dia
+        são lidas por HTTP e guardadas em `diretorio_cache` (DODF_CACHE; use
+        '' para não gravar em disco).
+        """
+        self.email_remetente = email_remetente
+        self.senha_email = senha_email
+        self.email_destinatario = email_destinatario
+        self.base_url = (base_url or DODF_URL).rstrip('/') + '/'
+        self.workers = workers
+        self.tamanho_maximo = tamanho_maximo
+        self.temp_dir = tempfile.mkdtemp()
+
+        # Sessão HTTP com retry e um pool de conexões do tamanho dos workers
+        self.session = requests.Session()
+        # (404 não entra na lista: uma edição inexistente não vai aparecer
+        # tentando de novo, e cada nova tentativa segurava um worker)
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["HEAD", "GET", "OPTIONS"]
+        )
+        adapter = HTTPAdapter(max_retries=retries, pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'Referer': self.base_url})
+
+        self.diretorio_cache = DIRETORIO_CACHE if diretorio_cache is None else diretorio_cache
+        self._listagens = {}
+        self._lock_listagens = threading.Lock()
+        # Depois que uma pasta vem com links pelo HTTP, sabemos que a página
+        # não depende de JavaScript e uma pasta vazia é só um dia sem edição
+        self._http_confiavel = False
+
+    def _chrome_options(self):
+        from selenium.webdriver.chrome.options import Options
+
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument(f'--user-data-dir={self.temp_dir}')
+        return chrome_options
+
+    def _baixar(self, url, destino=None):
+        """
+        Faz o download em blocos, sem carregar a resposta inteira de uma vez,
+        e interrompe se passar do tamanho máximo. Grava em `destino` (caminho)
+        ou em memória.
+        """
+        with self.session.get(url, headers=CABECALHOS_PDF, timeout=(10, 60), stream=True) as response:
+            if 400 <= response.status_code < 500:
+                raise EdicaoIndisponivel(f"Status code: {response.status_code}")
+            if response.status_code != 200:
+                raise requests.HTTPError(f"Status code: {response.status_code}")
+            if 'application/pdf' not in response.headers.get('content-type', '').lower():
+                raise ValueError("O conteúdo retornado não é um PDF")
+
+            tamanho = int(response.headers.get('content-length') or 0)
+            if tamanho > self.tamanho_maximo:
+                raise PDFMuitoGrande(f"PDF com {tamanho / 1024 / 1024:.1f} MB excede o limite")
+
+            saida = open(destino, 'wb') if destino else io.BytesIO()
+            try:
+                baixados = 0
+                for bloco in response.iter_content(TAMANHO_BLOCO):
+                    baixados += len(bloco)
+                    if baixados > self.tamanho_maximo:
+                        raise PDFMuitoGrande(f"PDF excede o limite de {self.tamanho_maximo / 1024 / 1024:.0f} MB")
+                    saida.write(bloco)
+            except Exception:
+                saida.close()
+                if destino and os.path.exists(destino):
+                    os.remove(destino)
+                raise
+
+        if destino:
+            saida.close()
+            return destino
+        saida.seek(0)
+        return saida
+
+    def baixar_pdf_com_retry(self, url, max_tentativas=3, destino=None):
+        """
+        Tenta baixar o PDF com múltiplas tentativas. Retorna um BytesIO (ou o
+        caminho `destino`, se informado) ou None.
+        """
+        for tentativa in range(max_tentativas):
+            try:
+                with span('dodf_download', tentativa=tentativa + 1):
+                    return self._baixar(url, destino)
+            except (PDFMuitoGrande, EdicaoIndisponivel) as e:
+                # Tentar de novo não muda o resultado
+                print(f"Download abortado: {str(e)}")
+                return None
+            except Exception as e:
+                print(f"Erro na tentativa {tentativa + 1} de {max_tentativas}: {str(e)}")
+                if tentativa < max_tentativas - 1:
+                    # Espera exponencial com jitter, para os workers não
+                    # voltarem todos ao mesmo tempo
+                    pausa(2 ** tentativa + random.uniform(0, 1))
+
+        return None
+
+    def baixar_edicoes(self, edicoes, diretorio=None):
+        """
+        Baixa as edições em paralelo e gera (edicao, pdf) à medida que cada
+        download termina; pdf é None se falhou. Com `diretorio`, os PDFs são
+        gravados em disco em vez de ficarem em memória.
+        """
+        def baixar(edicao):
+            destino = None
+            if diretorio:
+                destino = os.path.join(diretorio, f"DODF_{edicao['numero']}_{edicao.get('data', '').replace('/', '-')}.pdf")
+            return self.baixar_pdf_com_retry(edicao['link'], destino=destino)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futuros = {executor.submit(baixar, edicao): edicao for edicao in edicoes}
+            for futuro in as_completed(futuros):
+                yield futuros[futuro], futuro.result()
+
+    def gerar_link_pasta_dodf(self, data):
+        """Gera o link da pasta do DODF para uma data específica"""
+        data_obj = datetime.strptime(data, '%d/%m/%Y')
+
+        ano = data_obj.strftime('%Y')
+        mes_numero = data_obj.month
+        mes_nome = MESES[mes_numero]
+        data_formatada = f"{data_obj.strftime('%d')} {data_obj.strftime('%m')} {data_obj.strftime('%Y')}"
+
+        return f"{self.base_url}dodf/jornal/pastas?pasta={ano}/{mes_numero:02d}_{mes_nome}/{data_formatada}".replace(" ", "%20")
+
+    def _caminho_cache(self, data):
+        if not self.diretorio_cache:
+            return None
+        return os.path.join(self.diretorio_cache, 'listagens', data.replace('/', '-') + '.json')
+
+    def _listagem_em_cache(self, data):
+        with self._lock_listagens:
+            if data in self._listagens:
+                edicoes, momento, definitiva = self._listagens[data]
+                if definitiva or (self._eh_hoje(data) and time.time() - momento < VALIDADE_LISTAGEM_HOJE):
+                    return edicoes
+
+        caminho = self._caminho_cache(data)
+        if caminho and not self._eh_hoje(data) and os.path.exists(caminho):
+            try:
+                with open(caminho, encoding='utf-8') as f:
+                    edicoes = json.load(f)
+                with self._lock_listagens:
+                    self._listagens[data] = (edicoes, time.time(), True)
+                return edicoes
+            except (OSError, ValueError):
+                return None
+        return None
+
+    def _guardar_listagem(self, data, edicoes):
+        # Só a listagem lida depois do fim do dia é definitiva
+        definitiva = self._dia_encerrado(data)
+        with self._lock_listagens:
+            self._listagens[data] = (edicoes, time.time(), definitiva)
+
+        caminho = self._caminho_cache(data)
+        if caminho and definitiva:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            temporario = f'{caminho}.{threading.get_ident()}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(edicoes, f, ensure_ascii=False)
+            os.replace(temporario, caminho)
+
+    @staticmethod
+    def _eh_hoje(data):
+        return data == datetime.now().strftime('%d/%m/%Y')
+
+    @staticmethod
+    def _dia_encerrado(data):
+        return datetime.strptime(data, '%d/%m/%Y').date() < datetime.now().date()
+
+    def listagem_definitiva(self, data):
+        """
+        True se a listagem guardada da data foi lida depois que o dia
+        terminou (não pode mais ganhar edições)
+        """
+        with self._lock_listagens:
+            return data in self._listagens and self._listagens[data][2]
+
+    def listar_pasta_http(self, data):
+        """
+        Lê a pasta do dia com uma requisição HTTP simples, sem navegador.
+        Retorna a lista de edições ou None se a página não pôde ser lida.
+        """
+        url = self.gerar_link_pasta_dodf(data)
+        try:
+            with span('dodf_listagem_http', data=data):
+                response = self.session.get(url, headers=CABECALHOS_HTML, timeout=(10, 30))
+            if response.status_code != 200:
+                print(f"Pasta do dia {data}: status code {response.status_code}")
+                return None
+            leitor = LeitorPasta()
+            leitor.feed(response.text)
+            links = [(nome, urljoin(response.url, href)) for nome, href in leitor.links if href]
+            return montar_edicoes(links, data)
+        except Exception as e:
+            print(f"Erro ao acessar pasta por HTTP: {e}")
+            return None
+
+    def obter_edicoes_do_dia(self, data, usar_cache=True):
+        """
+        Obtém informações sobre as edições disponíveis para uma data.
+        Usa o cache e a listagem por HTTP; o navegador só é aberto se a
+        página não puder ser lida sem JavaScript.
+        """
+        if usar_cache:
+            edicoes = self._listagem_em_cache(data)
+            if edicoes is not None:
+                return edicoes
+
+        edicoes = self.listar_pasta_http(data)
+        if edicoes:
+            self._http_confiavel = True
+        return self._completar_listagem(data, edicoes)
+
+    def _completar_listagem(self, data, edicoes):
+        """
+        Recorre ao navegador quando a listagem HTTP falhou ou não é
+        confiável. Uma pasta vazia que o navegador não conseguiu confirmar
+        não é guardada: volta None (pasta ilegível) e é lida de novo depois.
+        """
+        if edicoes is None or (not edicoes and not self._http_confiavel):
+            edicoes_navegador = self.obter_edicoes_navegador(data)
+            if edicoes_navegador is None:
+                return None
+            edicoes = edicoes_navegador
+
+        self._guardar_listagem(data, edicoes)
+        return edicoes
+
+    def listar_periodo(self, datas):
+        """
+        Lista as pastas de várias datas: {data: edições ou None se a pasta
+        não pôde ser lida}. As pastas fora do cache são lidas por HTTP em
+        paralelo; o navegador só é usado para as que falharem (ou para
+        todas, se nenhuma trouxer links pelo HTTP).
+        """
+        listagens = {data: self._listagem_em_cache(data) for data in datas}
+        pendentes = [data for data, edicoes in listagens.items() if edicoes is None]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            via_http = dict(zip(pendentes, executor.map(self.listar_pasta_http, pendentes)))
+        if any(via_http.values()):
+            self._http_confiavel = True
+
+        for data in pendentes:
+            listagens[data] = self._completar_listagem(data, via_http[data])
+        return listagens
+
+    def obter_edicoes_periodo(self, datas):
+        """Edições de várias datas, na ordem das datas (veja listar_periodo)"""
+        listagens = self.listar_periodo(datas)
+        return [edicao for data in datas for edicao in (listagens[data] or [])]
+
+    def obter_edicoes_navegador(self, data):
+        """Lê a pasta do dia com o Chrome headless (página dependente de JavaScript)"""
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        url = self.gerar_link_pasta_dodf(data)
+        driver = None
+
+        try:
+            with span('dodf_listagem_navegador', data=data):
+                driver = webdriver.Chrome(options=self._chrome_options())
+                print(f"Acessando pasta do dia {data}...")
+                driver.get(url)
+
+                wait = WebDriverWait(driver, 20)
+                elementos = wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, "link-materia")))
+
+                links = [
+                    (elemento.find_element(By.TAG_NAME, "p").text.strip(), elemento.get_attribute("href"))
+                    for elemento in elementos
+                ]
+            return montar_edicoes(links, data)
+
+        except Exception as e:
+            print(f"Erro ao acessar pasta: {e}")
+            return None
+        finally:
+            if driver:
+                driver.quit()
+
+    def baixar_e_pesquisar_pdf(self, url, nome_busca):
+        """Baixa e pesquisa um nome no PDF"""
+        print(f"Baixando PDF: {url}")
+        pdf_buffer = self.baixar_pdf_com_retry(url)
+        if pdf_buffer is None:
+            return None
+        return self.pesquisar_nome_pdf(pdf_buffer, nome_busca)
+
+    def pesquisar_localizador_pdf(self, pdf_buffer, localizador):
+        """
+        Lê o PDF uma vez e procura todos os termos do localizador em cada
+        página. Retorna uma entrada por ocorrência (pagina, tipo, termos,
+        trecho e contexto) ou None se o PDF não pôde ser lido.
+        """
+        from pdf_texto import obter_backend
+
+        try:
+            return [
+                dict(ocorrencia, pagina=num_pagina)
+                for num_pagina, ocorrencia in localizador.procurar_paginas(obter_backend().paginas(pdf_buffer))
+            ]
+        except Exception as e:
+            print(f"Erro ao processar PDF: {e}")
+            return None
+
+    def pesquisar_nome_pdf(self, pdf_buffer, nome):
+        """Pesquisa um nome no PDF e retorna os contextos encontrados"""
+        ocorrencias = self.pesquisar_localizador_pdf(pdf_buffer, Localizador([nome]))
+        if ocorrencias is None:
+            return None
+        return [{'pagina': o['pagina'], 'contexto': o['contexto']} for o in ocorrencias]
+
+    def pesquisar_edicoes(self, edicoes, localizador):
+        """
+        Baixa e pesquisa as edições em paralelo, gerando (edicao, ocorrencias)
+        à medida que cada uma termina. ocorrencias é None quando o PDF não
+        pôde ser baixado ou lido.
+        """
+        def pesquisar(edicao):
+            pdf_buffer = self.baixar_pdf_com_retry(edicao['link'])
+            if pdf_buffer is None:
+                print(f"Não foi possível baixar o PDF da edição {edicao['numero']}")
+                return None
+            with span('dodf_pesquisa', edicao=edicao['numero']):
+                return self.pesquisar_localizador_pdf(pdf_buffer, localizador)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futuros = {executor.submit(pesquisar, edicao): edicao for edicao in edicoes}
+            for futuro in as_completed(futuros):
+                try:
+                    ocorrencias = futuro.result()
+                except Exception as e:
+                    print(f"Erro ao pesquisar a edição {futuros[futuro]['numero']}: {str(e)}")
+                    ocorrencias = None
+                yield futuros[futuro], ocorrencias
+
+    def pesquisar_nomes_edicoes(self, nomes, edicoes, tombamentos=None):
+        """
+        Baixa e pesquisa as edições em paralelo, procurando todos os nomes
+        (e números de tombamento, se pedidos) em uma única leitura de cada
+        página. A leitura de um PDF acontece enquanto os próximos ainda estão
+        sendo baixados. Retorna {termo: [resultado por edição]}, com as
+        edições na ordem recebida.
+        """
+        ocorrencias_por_link = {
+            edicao['link']: ocorrencias
+            for edicao, ocorrencias in self.pesquisar_edicoes(edicoes, Localizador(nomes, tombamentos))
+        }
+
+        resultados = {}
+        for edicao in edicoes:
+            ocorrencias = ocorrencias_por_link.get(edicao['link'])
+            por_termo = {}
+            for ocorrencia in ocorrencias or []:
+                for termo in ocorrencia['termos']:
+                    por_termo.setdefault(termo, []).append({
+                        'pagina': ocorrencia['pagina'],
+                        'contexto': ocorrencia['contexto']
+                    })
+            for termo, mencoes in por_termo.items():
+                resultados.setdefault(termo, []).append({
+                    'edicao': edicao['nome'],
+                    'data': edicao.get('data'),
+                    'link': edicao['link'],
+                    'mencoes': mencoes
+                })
+        return resultados
+
+    def pesquisar_nome_edicoes(self, nome, edicoes):
+        """Pesquisa um nome nas edições (veja pesquisar_nomes_edicoes)"""
+        return self.pesquisar_nomes_edicoes([nome], edicoes).get(nome, [])
+
+    def indexar_edicoes(self, edicoes, indice):
+        """
+        Baixa em paralelo as edições que ainda não estão no índice e grava o
+        texto de cada página. Retorna quantas edições foram indexadas.
+        """
+        from pdf_texto import obter_backend
+
+        indexados = indice.links_indexados()
+        novas = [edicao for edicao in edicoes if edicao['link'] not in indexados]
+        backend = obter_backend()
+
+        def extrair(edicao):
+            pdf_buffer = self.baixar_pdf_com_retry(edicao['link'])
+            if pdf_buffer is None:
+                print(f"Não foi possível baixar o PDF da edição {edicao['numero']}")
+                return None
+            with span('dodf_extracao_texto', edicao=edicao['numero']):
+                return list(backend.paginas(pdf_buffer))
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futuros = {executor.submit(extrair, edicao): edicao for edicao in novas}
+            for futuro in as_completed(futuros):
+                try:
+                    textos = futuro.result()
+                except Exception as e:
+                    print(f"Erro ao ler a edição {futuros[futuro]['numero']}: {str(e)}")
+                    continue
+                if textos is not None:
+                    # O SQLite aceita um escritor por vez: grava nesta thread
+                    indice.indexar_edicao(futuros[futuro], textos)
+                    total += 1
+        return total
+
+    def indexar_periodo(self, data_inicio, data_fim, indice):
+        """Garante que todas as edições do período estejam no índice"""
+        edicoes = self.obter_edicoes_periodo(datas_do_periodo(data_inicio, data_fim))
+        return self.indexar_edicoes(edicoes, indice)
+
+    def pesquisar_nome_indexado(self, nome, data_inicio, data_fim, indice=None):
+        """
+        Pesquisa um nome pelo índice local: só as edições do período que
+        ainda não foram indexadas são baixadas. Retorna os resultados no
+        formato de pesquisar_nome_edicoes, com todas as ocorrências.
+        """
+        from indice_dodf import IndiceDODF
+
+        indice = indice or IndiceDODF()
+        self.indexar_periodo(data_inicio, data_fim, indice)
+
+        por_edicao = {}
+        for ocorrencia in indice.buscar(nome, data_inicio, data_fim):
+            resultado = por_edicao.setdefault(ocorrencia['link'], {
+                'edicao': ocorrencia['edicao'],
+                'data': ocorrencia['data'],
+                'link': ocorrencia['link'],
+                'mencoes': []
+            })
+            resultado['mencoes'].append({'pagina': ocorrencia['pagina'], 'contexto': ocorrencia['contexto']})
+        return list(por_edicao.values())
+
+    def pesquisar_nome_por_data(self, nome, data):
+        """Pesquisa um nome em todas as edições de uma data específica"""
+        print(f"\nPesquisando '{nome}' na data {data}")
+
+        try:
+            # Primeiro obtém as edições do dia
+            edicoes = self.obter_edicoes_do_dia(data)
+
+            if not edicoes:
+                print("Nenhuma edição encontrada para esta data")
+                return
+
+            return self.pesquisar_nome_edicoes(nome, edicoes)
+
+        except Exception as e:
+            print(f"Erro durante a pesquisa: {str(e)}")
+            return None
+
+    def monitorar_nome(self, nomes, data=None, tombamentos=None):
+        """
+        Verifica as edições de uma data (hoje, por padrão) procurando um nome
+        ou uma lista de nomes de uma vez; cada página é lida uma única vez,
+        qualquer que seja o tamanho da lista. Retorna {nome: resultados} só
+        com os nomes encontrados.
+        """
+        if isinstance(nomes, str):
+            nomes = [nomes]
+        data = data or datetime.now().strftime('%d/%m/%Y')
+        print(f"\nMonitorando {len(nomes)} nome(s) nas edições de {data}")
+
+        edicoes = self.obter_edicoes_do_dia(data)
+        if not edicoes:
+            print("Nenhuma edição encontrada para esta data")
+            return {}
+
+        resultados = self.pesquisar_nomes_edicoes(nomes, edicoes, tombamentos)
+        for termo, edicoes_encontradas in resultados.items():
+            total = sum(len(r['mencoes']) for r in edicoes_encontradas)
+            print(f"'{termo}': {total} menção(ões) em {len(edicoes_encontradas)} edição(ões)")
+        return resultados
+
+    def pesquisar_nome_por_periodo(self, nome, data_inicio, data_fim):
+        """
+        Pesquisa um nome em todas as edições entre duas datas (dd/mm/aaaa).
+        As edições de todos os dias entram no mesmo pool de downloads.
+        """
+        print(f"\nPesquisando '{nome}' de {data_inicio} a {data_fim}")
+
+        try:
+            edicoes = self.obter_edicoes_periodo(datas_do_periodo(data_inicio, data_fim))
+
+            if not edicoes:
+                print("Nenhuma edição encontrada no período")
+                return []
+
+            return self.pesquisar_nome_edicoes(nome, edicoes)
+
+        except Exception as e:
+            print(f"Erro durante a pesquisa: {str(e)}")
+            return None
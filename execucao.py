@@ -0,0 +1,181 @@
+import time
+
+from concorrencia import admitir
+from idempotencia import GuardaIdempotencia
+
+# Resultados acumulados antes de gravar no banco (uma transação por lote)
+TAMANHO_LOTE_REGISTRO = 25
+
+# Estimativa usada até o primeiro número ser processado
+SEGUNDOS_POR_NUMERO = 10
+
+
+class ExecucaoTombamento:
+    def __init__(self, cpf, senha, tipo_arquivo, numeros=None, pdf_paths=None, db=None,
+                 tamanho_lote=TAMANHO_LOTE_REGISTRO, base_url=None, headless=False):
+        """
+        Um processamento de tombamentos, o mesmo para as abas de PDF e de
+        Excel: login, guarda de idempotência, envio, registro dos resultados
+        em tombamento.db e contadores de progresso.
+
+        Com `numeros` (planilha ou PDFs já extraídos) o envio é feito por
+        SisgepatAutomation.processar_tombamentos; com `pdf_paths` os PDFs são
+        extraídos durante o envio pelo PipelineTombamento (processamento
+        contínuo). Os resultados são gravados a cada `tamanho_lote` números.
+        """
+        if (numeros is None) == (pdf_paths is None):
+            raise ValueError("Informe os números ou os PDFs")
+        if db is None:
+            from database import TombamentoDatabase
+            db = TombamentoDatabase()
+        self.cpf = cpf
+        self.senha = senha
+        self.tipo_arquivo = tipo_arquivo
+        self.numeros = list(numeros) if numeros is not None else None
+        self.pdf_paths = list(pdf_paths) if pdf_paths is not None else None
+        self.db = db
+        self.tamanho_lote = tamanho_lote
+        self.base_url = base_url
+        self.headless = headless
+
+        self.continuo = pdf_paths is not None
+        self.processamento_id = None
+        self.sucessos = 0
+        self.falhas = 0
+        self.ignorados = 0
+        self._pendentes = []
+        self._inicio = None
+
+    @property
+    def total(self):
+        """Números conhecidos até agora (no contínuo, cresce com a extração)"""
+        return len(self.numeros) if self.numeros is not None else None
+
+    @property
+    def processados(self):
+        return self.sucessos + self.falhas
+
+    @property
+    def tempo_decorrido(self):
+        return time.time() - self._inicio if self._inicio else 0
+
+    def tempo_estimado(self):
+        """Segundos estimados para enviar todos os números"""
+        return (self.total or 0) * SEGUNDOS_POR_NUMERO
+
+    def tempo_restante(self, index, total):
+        """Segundos restantes pela média dos números já percorridos"""
+        if not total:
+            return None
+        if index <= 1:
+            return max(0, (total - index) * SEGUNDOS_POR_NUMERO)
+        return self.tempo_decorrido / index * (total - index)
+
+    def _registrar(self, info):
+        self._pendentes.append((
+            info['numero'],
+            'sucesso' if info['sucesso'] else 'falha',
+            time.time(),
+            info.get('mensagem_erro')
+        ))
+        if len(self._pendentes) >= self.tamanho_lote:
+            return self._gravar_pendentes()
+
+    def _gravar_pendentes(self):
+        """Grava os resultados acumulados; retorna um evento 'aviso' se falhar"""
+        if not self._pendentes:
+            return None
+        try:
+            self.db.registrar_tombamentos(self.processamento_id, self._pendentes)
+            self._pendentes = []
+        except Exception as e:
+            print(f"Erro ao registrar tombamentos: {str(e)}")
+            return {'status': 'aviso', 'mensagem': f"Erro ao registrar tombamentos: {str(e)}"}
+        return None
+
+    def _eventos_lote(self, guarda, ao_esperar):
+        from tomb import SisgepatAutomation
+
+        # Só abre o navegador quando houver vaga na máquina
+        with admitir('navegador', self.cpf, ao_esperar and (lambda posicao: ao_esperar('navegador', posicao))):
+            bot = SisgepatAutomation(base_url=self.base_url, headless=self.headless)
+            try:
+                if not bot.login_with_javascript(self.cpf, self.senha):
+                    yield {'status': 'erro', 'mensagem': 'Falha no login!'}
+                    return
+                yield {'status': 'pronto'}
+                yield from bot.processar_tombamentos(self.numeros, guarda=guarda)
+            finally:
+                bot.close()
+
+    def _eventos_continuo(self, guarda):
+        from pipeline import PipelineTombamento
+
+        pipeline = PipelineTombamento(self.pdf_paths, self.cpf, self.senha, base_url=self.base_url,
+                                      headless=self.headless, guarda=guarda)
+        yield from pipeline.executar()
+
+    def executar(self, ao_esperar=None):
+        """
+        Executa o processamento gerando os eventos do envio, acrescidos dos
+        contadores da execução: 'processando' e 'ignorado' trazem sucessos,
+        falhas, ignorados e tempo_restante; 'concluido' traz tempo_total.
+        O processamento é registrado no banco e atualizado ao final, mesmo
+        se for interrompido.
+
+        Enquanto o navegador ou a extração esperam vaga no controle de
+        admissão, `ao_esperar(recurso, posicao)` é chamado com a posição na
+        fila.
+        """
+        self._inicio = time.time()
+        self.processamento_id = self.db.registrar_processamento(
+            usuario=self.cpf,
+            tipo_arquivo=self.tipo_arquivo,
+            total=self.total or 0,
+            sucessos=0,
+            falhas=0
+        )
+        guarda = GuardaIdempotencia(self.db, self.processamento_id)
+        eventos = self._eventos_continuo(guarda) if self.continuo else self._eventos_lote(guarda, ao_esperar)
+
+        try:
+            for info in eventos:
+                if info['status'] == 'aguardando':
+                    if ao_esperar is not None:
+                        ao_esperar(info['recurso'], info['posicao'])
+                    continue
+
+                if info['status'] == 'processando':
+                    if info['sucesso']:
+                        self.sucessos += 1
+                    else:
+                        self.falhas += 1
+                    aviso = self._registrar(info)
+                    if aviso:
+                        yield aviso
+                elif info['status'] == 'ignorado':
+                    self.ignorados += 1
+                elif info['status'] == 'concluido':
+                    aviso = self._gravar_pendentes()
+                    if aviso:
+                        yield aviso
+                    info['tempo_total'] = self.tempo_decorrido
+
+                if info['status'] in ('processando', 'ignorado'):
+                    info.update(
+                        sucessos=self.sucessos,
+                        falhas=self.falhas,
+                        ignorados=self.ignorados,
+                        tempo_restante=self.tempo_restante(info['index'], info['total'])
+                    )
+                yield info
+                if info['status'] in ('concluido', 'erro'):
+                    break
+        finally:
+            eventos.close()
+            self._gravar_pendentes()
+            try:
+                self.db.atualizar_processamento(self.processamento_id, sucessos=self.sucessos,
+                                                falhas=self.falhas, total=self.processados)
+            except Exception as e:
+                print(f"Erro ao atualizar processamento: {str(e)}")
@@ -0,0 +1,278 @@
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+
+import pandas as pd
+
+from database import STATUS, TOMBAMENTO_DB
+
+# Diretório do arquivo em Parquet dos processamentos antigos
+DIRETORIO_ARQUIVO = os.environ.get('TOMBAMENTO_ARQUIVO', 'tombamento_arquivo')
+
+# Processamentos mais antigos que isto (em dias) saem de tombamento.db
+DIAS_RETENCAO = int(os.environ.get('TOMBAMENTO_RETENCAO_DIAS', 180))
+
+# Caracteres da mensagem de erro usados para agrupar os motivos de falha
+TAMANHO_MOTIVO = 120
+
+_esquemas = {}
+_cache = {}
+
+
+def _esquema(tabela):
+    """Esquema Arrow de cada tabela arquivada (as mesmas colunas do banco)"""
+    import pyarrow as pa
+
+    if not _esquemas:
+        _esquemas['processamentos'] = pa.schema([
+            ('id', pa.int64()),
+            ('data_hora', pa.int64()),
+            ('usuario', pa.string()),
+            ('tipo_arquivo', pa.string()),
+            ('total_processado', pa.int64()),
+            ('sucessos', pa.int64()),
+            ('falhas', pa.int64()),
+            ('data_fim', pa.int64()),
+        ])
+        _esquemas['tombamentos'] = pa.schema([
+            ('id', pa.int64()),
+            ('numero', pa.int64()),
+            ('processamento_id', pa.int64()),
+            ('status', pa.int8()),
+            ('data_processamento', pa.int64()),
+            ('mensagem_erro', pa.string()),
+        ])
+    return _esquemas[tabela]
+
+
+def _gravar(df, diretorio, tabela, lote):
+    """
+    Grava as linhas em <diretorio>/<tabela>/mes=AAAA-MM/<lote>-N.parquet.
+    Os arquivos são escritos em um diretório temporário e só então movidos
+    para o lugar, para que uma leitura nunca encontre um arquivo incompleto.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema(tabela).append(pa.field('mes', pa.string()))
+    temporario = os.path.join(diretorio, f'_{lote}', tabela)
+    pq.write_to_dataset(
+        pa.Table.from_pandas(df[esquema.names], schema=esquema, preserve_index=False),
+        temporario,
+        partition_cols=['mes'],
+        basename_template=f'{lote}-{{i}}.parquet'
+    )
+
+    arquivos = []
+    for raiz, _, nomes in os.walk(temporario):
+        for nome in nomes:
+            destino = os.path.join(diretorio, tabela, os.path.relpath(os.path.join(raiz, nome), temporario))
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(os.path.join(raiz, nome), destino)
+            arquivos.append(destino)
+    return arquivos
+
+
+def arquivar(db=None, dias=DIAS_RETENCAO, diretorio=None, compactar=True):
+    """
+    Move para o arquivo em Parquet (particionado por mês) os processamentos
+    iniciados há mais de `dias` dias, com os tombamentos deles, e os remove
+    de tombamento.db. Os números enviados continuam em tombamentos_enviados,
+    então a guarda de idempotência não é afetada. Processamentos ainda em
+    andamento (sem os totais finais ou com reservas valendo) ficam no banco
+    até terminarem.
+
+    Os arquivos são gravados antes da remoção: se o arquivamento for
+    interrompido, os relatórios ignoram as cópias arquivadas de
+    processamentos que ainda estão no banco, e a próxima execução termina
+    o trabalho. Retorna um dicionário com processamentos, tombamentos,
+    arquivos gravados, segundos e compactado (False se o VACUUM não pôde ser
+    feito porque outro processamento estava gravando no banco).
+    """
+    if dias < 1:
+        raise ValueError("A retenção deve ser de pelo menos um dia")
+    if db is None:
+        from database import TombamentoDatabase
+        db = TombamentoDatabase()
+    diretorio = diretorio or DIRETORIO_ARQUIVO
+
+    inicio = time.perf_counter()
+    processamentos, tombamentos = db.get_processamentos_arquivaveis(time.time() - dias * 86400)
+    resultado = {'processamentos': len(processamentos), 'tombamentos': 0, 'arquivos': [], 'segundos': 0,
+                 'compactado': False}
+    if processamentos.empty:
+        return resultado
+
+    lote = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    try:
+        resultado['arquivos'] += _gravar(processamentos, diretorio, 'processamentos', lote)
+        if not tombamentos.empty:
+            resultado['arquivos'] += _gravar(tombamentos, diretorio, 'tombamentos', lote)
+    finally:
+        shutil.rmtree(os.path.join(diretorio, f'_{lote}'), ignore_errors=True)
+
+    resultado['tombamentos'] = db.remover_processamentos(processamentos['id'])
+    if compactar:
+        # O VACUUM precisa do banco só para si; com um processamento gravando,
+        # o espaço é devolvido no próximo arquivamento
+        try:
+            db.compactar()
+            resultado['compactado'] = True
+        except sqlite3.OperationalError as e:
+            print(f"Erro ao compactar o banco: {str(e)}")
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+def _assinatura(caminho):
+    """Identifica o conteúdo do diretório (arquivos e datas de modificação)"""
+    return tuple(sorted(
+        (os.path.join(raiz, nome), os.stat(os.path.join(raiz, nome)).st_mtime_ns)
+        for raiz, _, nomes in os.walk(caminho)
+        for nome in nomes
+    ))
+
+
+def _ler_arquivo(diretorio, tabela, colunas, desde=None):
+    """
+    Lê as colunas de uma tabela arquivada, só dos meses a partir de `desde`
+    (as outras partições nem são abertas). O resultado fica em cache até
+    os arquivos mudarem.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    caminho = os.path.join(diretorio, tabela)
+    if not os.path.isdir(caminho):
+        return pd.DataFrame(columns=colunas + ['mes'])
+
+    chave = (caminho, tuple(colunas), desde)
+    assinatura = _assinatura(caminho)
+    if chave in _cache and _cache[chave][0] == assinatura:
+        return _cache[chave][1]
+
+    particao = pa.schema([('mes', pa.string())])
+    dataset = ds.dataset(
+        caminho,
+        schema=_esquema(tabela).append(particao.field('mes')),
+        format='parquet',
+        partitioning=ds.partitioning(particao, flavor='hive')
+    )
+    filtro = ds.field('mes') >= desde if desde else None
+    df = dataset.to_table(columns=colunas + ['mes'], filter=filtro).to_pandas()
+    # Um arquivamento interrompido e repetido pode ter gravado a mesma linha duas vezes
+    df = df.drop_duplicates('id')
+
+    _cache[chave] = (assinatura, df)
+    return df
+
+
+def assinatura(db=None, diretorio=None):
+    """
+    Muda sempre que o banco (inclusive o WAL) ou o arquivo mudam; serve de
+    chave para guardar os relatórios em cache
+    """
+    db_path = db.db_path if db is not None else TOMBAMENTO_DB
+    banco = tuple(
+        (caminho, os.stat(caminho).st_mtime_ns, os.stat(caminho).st_size)
+        for caminho in (db_path, f'{db_path}-wal') if os.path.exists(caminho)
+    )
+    arquivo = diretorio or DIRETORIO_ARQUIVO
+    return banco + _assinatura(arquivo) if os.path.isdir(arquivo) else banco
+
+
+def carregar_tombamentos(db=None, diretorio=None, desde=None):
+    """
+    Tombamentos do arquivo e do banco juntos, com processamento_id, status
+    (código), mensagem_erro, usuario e mes ('AAAA-MM' do processamento);
+    `desde` limita a partir de um mês.
+    """
+    if db is None:
+        from database import TombamentoDatabase
+        db = TombamentoDatabase()
+
+    atuais = db.get_tombamentos_relatorio(desde)
+    arquivados = _ler_arquivo(diretorio or DIRETORIO_ARQUIVO, 'tombamentos',
+                              ['id', 'processamento_id', 'status', 'mensagem_erro'], desde)
+    if not arquivados.empty:
+        usuarios = _ler_arquivo(diretorio or DIRETORIO_ARQUIVO, 'processamentos', ['id', 'usuario'], desde)
+        # Cópias de um arquivamento interrompido: vale o que está no banco
+        # (processamento e tombamentos saem do banco na mesma transação)
+        no_banco = atuais['processamento_id'].dropna().unique()
+        arquivados = arquivados[~arquivados['processamento_id'].isin(no_banco)].merge(
+            usuarios[['id', 'usuario']].rename(columns={'id': 'processamento_id'}),
+            on='processamento_id', how='left'
+        )
+        atuais = pd.concat([arquivados[atuais.columns], atuais], ignore_index=True)
+    return atuais
+
+
+def carregar_processamentos(db=None, diretorio=None, desde=None):
+    """Processamentos do arquivo e do banco juntos, com o mês de cada um"""
+    if db is None:
+        from database import TombamentoDatabase
+        db = TombamentoDatabase()
+
+    atuais = db.get_processamentos_relatorio(desde)
+    arquivados = _ler_arquivo(diretorio or DIRETORIO_ARQUIVO, 'processamentos',
+                              ['id', 'usuario', 'total_processado', 'sucessos', 'falhas'], desde)
+    if not arquivados.empty:
+        arquivados = arquivados[~arquivados['id'].isin(atuais['id'])]
+        atuais = pd.concat([arquivados[atuais.columns], atuais], ignore_index=True)
+    return atuais
+
+
+def estatisticas_gerais(db=None, diretorio=None):
+    """As estatísticas de TombamentoDatabase.get_estatisticas_gerais, somando o arquivo"""
+    df = carregar_processamentos(db, diretorio)
+    total = df['total_processado'].sum()
+    sucessos = df['sucessos'].sum()
+    return pd.Series({
+        'total_processamentos': len(df),
+        'total_tombamentos': total,
+        'total_sucessos': sucessos,
+        'total_falhas': df['falhas'].sum(),
+        'taxa_sucesso': round(sucessos / (total or 1) * 100, 2),
+    })
+
+
+def _taxas(grupos):
+    resumo = pd.DataFrame({
+        'tombamentos': grupos.size(),
+        'sucessos': grupos['sucesso'].sum(),
+    })
+    resumo['falhas'] = resumo['tombamentos'] - resumo['sucessos']
+    resumo['taxa_sucesso'] = (resumo['sucessos'] / resumo['tombamentos'] * 100).round(2)
+    return resumo.reset_index()
+
+
+def sucesso_por_mes(tombamentos):
+    """Tombamentos, sucessos, falhas e taxa de sucesso por mês"""
+    df = tombamentos.assign(sucesso=tombamentos['status'] == STATUS['sucesso'])
+    return _taxas(df.groupby('mes')).sort_values('mes')
+
+
+def sucesso_por_usuario(tombamentos):
+    """Tombamentos, sucessos, falhas e taxa de sucesso por usuário"""
+    df = tombamentos.assign(
+        sucesso=tombamentos['status'] == STATUS['sucesso'],
+        usuario=tombamentos['usuario'].fillna('(sem processamento)')
+    )
+    return _taxas(df.groupby('usuario')).sort_values('tombamentos', ascending=False)
+
+
+def motivos_falha(tombamentos, limite=20):
+    """
+    Os motivos de falha mais frequentes: a primeira linha da mensagem de
+    erro, cortada em TAMANHO_MOTIVO caracteres, com a quantidade e o último
+    mês em que ocorreu.
+    """
+    falhas = tombamentos[tombamentos['status'] == STATUS['falha']]
+    # Agrupa primeiro pela mensagem inteira e só corta as mensagens distintas
+    grupos = falhas.groupby(falhas['mensagem_erro'].fillna('(sem mensagem)'))
+    por_mensagem = pd.DataFrame({'falhas': grupos.size(), 'ultimo_mes': grupos['mes'].max()})
+    motivos = por_mensagem.index.str.split('\n').str[0].str.slice(0, TAMANHO_MOTIVO).rename('motivo')
+    resumo = por_mensagem.groupby(motivos).agg({'falhas': 'sum', 'ultimo_mes': 'max'}).reset_index()
+    return resumo.sort_values('falhas', ascending=False).head(limite)
@@ -0,0 +1,109 @@
+import os
+import socket
+import threading
+import time
+import uuid
+
+from extrator import numero_para_inteiro
+
+# Validade de uma reserva; renovada enquanto o processamento continua
+DURACAO_RESERVA = 15 * 60
+
+
+def _chave(numero):
+    """Chave inteira do número, como no banco, ou None se ele for inválido"""
+    try:
+        return numero_para_inteiro(numero)
+    except ValueError:
+        return None
+
+
+class GuardaIdempotencia:
+    def __init__(self, db=None, processamento_id=None, duracao_reserva=DURACAO_RESERVA):
+        """
+        Impede que um número de tombamento seja enviado duas vezes ao
+        SISGEPAT, inclusive por processamentos simultâneos.
+
+        Os números já enviados são carregados uma vez em um conjunto em
+        memória, pelas chaves inteiras do banco (consulta em tempo constante). Antes de preencher um número,
+        reservar() o reserva no banco de forma atômica; só quem tem a reserva
+        envia. Depois do Emitir, confirmar() grava os números como enviados
+        e encerra as reservas. Enquanto o processamento continua, renovar()
+        estende as reservas; as de um processamento interrompido expiram
+        sozinhas depois de `duracao_reserva` segundos.
+        """
+        if db is None:
+            from database import TombamentoDatabase
+            db = TombamentoDatabase()
+        self.db = db
+        self.processamento_id = processamento_id
+        self.duracao_reserva = duracao_reserva
+        self.dono = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.enviados = db.get_chaves_enviadas()
+        self.reservados = set()
+        self._ultima_renovacao = time.monotonic()
+        self._lock = threading.Lock()
+
+    def ja_enviado(self, numero):
+        return _chave(numero) in self.enviados
+
+    def pendentes(self, numeros):
+        """Os números que ainda não foram enviados, na ordem recebida"""
+        return [numero for numero in numeros if _chave(numero) not in self.enviados]
+
+    def reservar(self, numero):
+        """
+        Tenta reservar o número para este processamento. Retorna None se
+        conseguiu ou o motivo ('enviado', 'reservado' ou 'invalido') se o
+        número deve ser ignorado.
+        """
+        chave = _chave(numero)
+        if chave is None:
+            # Fora do formato 00000.000.000 não há chave no banco
+            return 'invalido'
+        if chave in self.enviados:
+            return 'enviado'
+
+        self.renovar()
+        if not self.db.reservar_numero(numero, self.dono, self.duracao_reserva, self.processamento_id):
+            # Outro processamento enviou ou está enviando o número
+            if self.db.numero_enviado(numero):
+                self.enviados.add(chave)
+                return 'enviado'
+            return 'reservado'
+
+        with self._lock:
+            self.reservados.add(numero)
+        return None
+
+    def renovar(self, forcar=False):
+        """
+        Estende todas as reservas deste processamento. Sem `forcar`, só vai
+        ao banco se já passou um terço da validade desde a última renovação,
+        então pode ser chamada a cada número, tentativa ou espera.
+        """
+        with self._lock:
+            if not self.reservados:
+                return
+            if not forcar and time.monotonic() - self._ultima_renovacao <= self.duracao_reserva / 3:
+                return
+            self.db.renovar_reservas(self.dono, self.duracao_reserva)
+            self._ultima_renovacao = time.monotonic()
+
+    def confirmar(self, numeros):
+        """Marca os números como enviados (chamar depois do Emitir)"""
+        numeros = list(numeros)
+        if not numeros:
+            return
+        self.db.confirmar_envios(numeros, self.dono, self.processamento_id)
+        with self._lock:
+            self.enviados.update(numero_para_inteiro(numero) for numero in numeros)
+            self.reservados.difference_update(numeros)
+
+    def liberar(self):
+        """Libera as reservas restantes deste processamento"""
+        with self._lock:
+            if not self.reservados:
+                return
+            self.reservados.clear()
+        self.db.liberar_reservas(self.dono)
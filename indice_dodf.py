@@ -0,0 +1,264 @@
+import os
+import sqlite3
+from datetime import datetime
+
+from extrator import extrair_numeros
+
+INDICE_DB = os.environ.get('DODF_INDICE', 'dodf_indice.db')
+
+# Caracteres de contexto antes e depois de cada ocorrência
+TAMANHO_CONTEXTO = 200
+
+# Marcadores usados no highlight() do FTS5 (não aparecem no texto dos PDFs)
+INICIO_DESTAQUE = '\x02'
+FIM_DESTAQUE = '\x03'
+
+
+def _data_iso(data):
+    return datetime.strptime(data, '%d/%m/%Y').strftime('%Y-%m-%d')
+
+
+def _data_br(data):
+    return datetime.strptime(data, '%Y-%m-%d').strftime('%d/%m/%Y')
+
+
+def _agora():
+    """
+    Data e hora atuais em texto, no formato que o adaptador padrão do
+    sqlite3 (obsoleto desde o Python 3.12) gravava nas colunas TIMESTAMP
+    """
+    return datetime.now().isoformat(sep=' ')
+
+
+def ocorrencias_destacadas(destacado, tamanho_contexto=TAMANHO_CONTEXTO):
+    """
+    Separa o texto devolvido pelo highlight() do FTS5 em uma entrada por
+    ocorrência, com o contexto ao redor (já sem os marcadores).
+    """
+    texto = destacado.replace(INICIO_DESTAQUE, '').replace(FIM_DESTAQUE, '')
+    resultados = []
+    removidos = 0
+    inicio_marcador = destacado.find(INICIO_DESTAQUE)
+    while inicio_marcador >= 0:
+        fim_marcador = destacado.find(FIM_DESTAQUE, inicio_marcador)
+        # Posições no texto original: desconta os marcadores anteriores
+        inicio = inicio_marcador - removidos
+        fim = fim_marcador - removidos - 1
+        resultados.append({
+            'posicao': inicio,
+            'trecho': texto[inicio:fim],
+            'contexto': texto[max(0, inicio - tamanho_contexto):fim + tamanho_contexto].strip(),
+        })
+        removidos += 2
+        inicio_marcador = destacado.find(INICIO_DESTAQUE, fim_marcador)
+    return resultados
+
+
+class IndiceDODF:
+    def __init__(self, db_path=None):
+        """
+        Índice de texto completo (SQLite FTS5) das páginas das edições do
+        DODF. Cada edição é baixada e lida uma única vez; as pesquisas de
+        nomes e de números de tombamento passam a consultar só o índice.
+        """
+        self.db_path = db_path or INDICE_DB
+        self.init_database()
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def init_database(self):
+        """Inicializa o banco de dados com as tabelas necessárias"""
+        conn = self._conectar()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS edicoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                numero TEXT,
+                data TEXT,
+                nome TEXT,
+                link TEXT UNIQUE,
+                total_paginas INTEGER,
+                indexado_em TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_edicoes_data ON edicoes (data)')
+
+        # remove_diacritics faz "Conceição" casar com "conceicao"
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS paginas USING fts5(
+                texto,
+                edicao_id UNINDEXED,
+                pagina UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        ''')
+
+        # Números de tombamento citados, extraídos na indexação
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tombamentos_dodf (
+                numero TEXT,
+                edicao_id INTEGER,
+                pagina INTEGER,
+                PRIMARY KEY (numero, edicao_id, pagina),
+                FOREIGN KEY (edicao_id) REFERENCES edicoes(id)
+            ) WITHOUT ROWID
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def links_indexados(self):
+        """Links das edições que já estão no índice"""
+        conn = self._conectar()
+        links = {linha[0] for linha in conn.execute('SELECT link FROM edicoes')}
+        conn.close()
+        return links
+
+    def indexar_edicao(self, edicao, textos_paginas):
+        """
+        Grava as páginas de uma edição no índice, em uma única transação.
+        Retorna o id da edição (ou o id existente, se já estava indexada).
+        """
+        conn = self._conectar()
+        try:
+            cursor = conn.cursor()
+            existente = cursor.execute('SELECT id FROM edicoes WHERE link = ?', (edicao['link'],)).fetchone()
+            if existente:
+                return existente[0]
+
+            cursor.execute('''
+                INSERT INTO edicoes (numero, data, nome, link, total_paginas, indexado_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (edicao['numero'], _data_iso(edicao['data']), edicao['nome'], edicao['link'],
+                  len(textos_paginas), _agora()))
+            edicao_id = cursor.lastrowid
+
+            cursor.executemany(
+                'INSERT INTO paginas (texto, edicao_id, pagina) VALUES (?, ?, ?)',
+                [(texto, edicao_id, num_pagina) for num_pagina, texto in enumerate(textos_paginas, 1)]
+            )
+            cursor.executemany(
+                'INSERT OR IGNORE INTO tombamentos_dodf (numero, edicao_id, pagina) VALUES (?, ?, ?)',
+                [(numero, edicao_id, num_pagina)
+                 for num_pagina, texto in enumerate(textos_paginas, 1)
+                 for numero in extrair_numeros([texto])]
+            )
+            conn.commit()
+            return edicao_id
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _filtro_datas(data_inicio, data_fim):
+        condicoes, parametros = [], []
+        if data_inicio:
+            condicoes.append('e.data >= ?')
+            parametros.append(_data_iso(data_inicio))
+        if data_fim:
+            condicoes.append('e.data <= ?')
+            parametros.append(_data_iso(data_fim))
+        return ''.join(f' AND {c}' for c in condicoes), parametros
+
+    def buscar(self, termo, data_inicio=None, data_fim=None, limite=1000):
+        """
+        Pesquisa um nome (ou qualquer expressão) no índice, sem diferenciar
+        acentos e maiúsculas. Retorna uma entrada por ocorrência, com edição,
+        página e contexto, da edição mais recente para a mais antiga.
+        """
+        # Consulta de frase: as palavras precisam aparecer juntas e em ordem
+        frase = '"' + termo.replace('"', '""') + '"'
+        filtro, parametros = self._filtro_datas(data_inicio, data_fim)
+
+        conn = self._conectar()
+        linhas = conn.execute(f'''
+            SELECT e.nome, e.numero, e.data, e.link, p.pagina,
+                   highlight(paginas, 0, ?, ?)
+            FROM paginas p
+            JOIN edicoes e ON e.id = p.edicao_id
+            WHERE p.texto MATCH ?{filtro}
+            ORDER BY e.data DESC, e.numero, p.pagina
+            LIMIT ?
+        ''', [INICIO_DESTAQUE, FIM_DESTAQUE, frase] + parametros + [limite]).fetchall()
+        conn.close()
+
+        resultados = []
+        for nome, numero, data, link, pagina, destacado in linhas:
+            for ocorrencia in ocorrencias_destacadas(destacado):
+                resultados.append({
+                    'edicao': nome,
+                    'numero_edicao': numero,
+                    'data': _data_br(data),
+                    'link': link,
+                    'pagina': pagina,
+                    'trecho': ocorrencia['trecho'],
+                    'contexto': ocorrencia['contexto'],
+                })
+        return resultados
+
+    def buscar_tombamento(self, numero, data_inicio=None, data_fim=None):
+        """Edições e páginas em que um número de tombamento foi citado"""
+        filtro, parametros = self._filtro_datas(data_inicio, data_fim)
+
+        conn = self._conectar()
+        linhas = conn.execute(f'''
+            SELECT e.nome, e.numero, e.data, e.link, t.pagina
+            FROM tombamentos_dodf t
+            JOIN edicoes e ON e.id = t.edicao_id
+            WHERE t.numero = ?{filtro}
+            ORDER BY e.data DESC, t.pagina
+        ''', [numero] + parametros).fetchall()
+        conn.close()
+
+        return [
+            {'edicao': nome, 'numero_edicao': num, 'data': _data_br(data), 'link': link, 'pagina': pagina}
+            for nome, num, data, link, pagina in linhas
+        ]
+
+    def buscar_tombamentos(self, numeros, data_inicio=None, data_fim=None):
+        """
+        Confere uma lista inteira de números de tombamento em uma única
+        consulta: os números vão para uma tabela temporária, cruzada com o
+        índice pela chave primária. Retorna uma entrada por (número, edição,
+        página) em que o número foi citado.
+        """
+        filtro, parametros = self._filtro_datas(data_inicio, data_fim)
+
+        conn = self._conectar()
+        try:
+            conn.execute('CREATE TEMP TABLE numeros_consulta (numero TEXT PRIMARY KEY) WITHOUT ROWID')
+            conn.executemany('INSERT OR IGNORE INTO numeros_consulta (numero) VALUES (?)',
+                             ((numero,) for numero in numeros))
+            linhas = conn.execute(f'''
+                SELECT t.numero, e.nome, e.numero, e.data, e.link, t.pagina
+                FROM numeros_consulta n
+                JOIN tombamentos_dodf t ON t.numero = n.numero
+                JOIN edicoes e ON e.id = t.edicao_id
+                WHERE 1 = 1{filtro}
+                ORDER BY t.numero, e.data, t.pagina
+            ''', parametros).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            {'numero': numero, 'edicao': nome, 'numero_edicao': num, 'data': _data_br(data),
+             'link': link, 'pagina': pagina}
+            for numero, nome, num, data, link, pagina in linhas
+        ]
+
+    def estatisticas(self):
+        """Quantidade de edições, páginas e período cobertos pelo índice"""
+        conn = self._conectar()
+        edicoes, paginas, inicio, fim = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(total_paginas), 0), MIN(data), MAX(data) FROM edicoes'
+        ).fetchone()
+        conn.close()
+        return {
+            'edicoes': edicoes,
+            'paginas': paginas,
+            'inicio': _data_br(inicio) if inicio else None,
+            'fim': _data_br(fim) if fim else None,
+        }
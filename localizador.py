@@ -0,0 +1,165 @@
+import re
+import unicodedata
+
+# Caracteres de contexto antes e depois de cada ocorrência
+TAMANHO_CONTEXTO = 200
+
+_NAO_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def _caractere_base(caractere):
+    # 'É' -> 'e'; sempre um caractere, para as posições continuarem batendo
+    return unicodedata.normalize('NFD', caractere)[0].lower()[0]
+
+
+class _TabelaSemAcento(dict):
+    """Tabela para str.translate preenchida sob demanda"""
+
+    def __missing__(self, codigo):
+        self[codigo] = ord(_caractere_base(chr(codigo)))
+        return self[codigo]
+
+
+_TABELA_SEM_ACENTO = _TabelaSemAcento()
+
+
+def _sem_acento(achado):
+    return chr(_TABELA_SEM_ACENTO[ord(achado.group())])
+
+
+def normalizar_texto(texto):
+    """
+    Remove acentos e caixa sem mudar o tamanho do texto: uma posição no
+    texto normalizado é a mesma posição no original.
+    """
+    minusculo = texto.lower()
+    if len(minusculo) != len(texto):
+        # Raro ('İ' vira dois caracteres): caractere a caractere
+        return texto.translate(_TABELA_SEM_ACENTO)
+    if minusculo.isascii():
+        return minusculo
+    return _NAO_ASCII.sub(_sem_acento, minusculo)
+
+
+def normalizar_nome(nome):
+    """Forma canônica de um nome: sem acento, minúsculo e espaços simples"""
+    return ' '.join(normalizar_texto(nome).split())
+
+
+def _regex_trie(nomes):
+    """
+    Monta uma expressão regular com os nomes fatorados por prefixo
+    ('ana (?:luiza|maria)' em vez de 'ana luiza|ana maria'), para que a
+    lista inteira seja testada em uma única passada, sem retrocesso entre
+    nomes com o mesmo começo. Espaços viram \\s+ (aceita quebra de linha).
+    """
+    trie = {}
+    for nome in nomes:
+        no = trie
+        for caractere in nome:
+            no = no.setdefault(caractere, {})
+        no[''] = {}
+
+    def montar(no, raiz=False):
+        fim = '' in no
+        ramos = []
+        for caractere in sorted(c for c in no if c):
+            prefixo = r'\s+' if caractere == ' ' else re.escape(caractere)
+            if raiz:
+                # Início de palavra. O lookbehind vem depois do primeiro
+                # caractere para o motor de regex pular direto para as
+                # posições que começam com a inicial de algum nome
+                prefixo += r'(?<!\w.)'
+            ramos.append(prefixo + montar(no[caractere]))
+        if not ramos:
+            return ''
+        corpo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        if fim:
+            # Quantificador guloso: prefere o nome mais longo
+            return '(?:' + corpo + ')?'
+        return corpo
+
+    return montar(trie, raiz=True)
+
+
+class Localizador:
+    def __init__(self, nomes=(), tombamentos=None, tamanho_contexto=TAMANHO_CONTEXTO):
+        """
+        Procura uma lista inteira de nomes (e, opcionalmente, números de
+        tombamento) em uma única passada por texto.
+
+        nomes       - nomes monitorados; a busca ignora acentos, maiúsculas e
+                      quebras de linha entre as palavras
+        tombamentos - None (não procura), True (qualquer número no formato
+                      00000.000.000) ou uma coleção de números específicos
+        """
+        if isinstance(nomes, str):
+            nomes = [nomes]
+        self.tamanho_contexto = tamanho_contexto
+
+        # Nome canônico -> nomes como foram informados
+        self.nomes = {}
+        for nome in nomes:
+            canonico = normalizar_nome(nome)
+            if canonico:
+                self.nomes.setdefault(canonico, []).append(nome)
+
+        if tombamentos is None or tombamentos is False:
+            self.tombamentos = None
+        elif tombamentos is True:
+            self.tombamentos = True
+        else:
+            self.tombamentos = set(tombamentos)
+
+        alternativas = []
+        if self.nomes:
+            # O fim de palavra evita casar "Ana Luiza" dentro de "Ana Luizana"
+            alternativas.append(r'(?P<nome>' + _regex_trie(self.nomes) + r')(?!\w)')
+        if self.tombamentos is not None:
+            # Sem dígito ou ponto antes e sem dígito ou ".dígito" depois (o
+            # ponto final da frase é aceito): 12345.678.9012 não é um número
+            alternativas.append(r'(?<![\d.])(?P<tombamento>\d{5}\.\d{3}\.\d{3})(?!\d|\.\d)')
+        self._padrao = re.compile('|'.join(alternativas)) if alternativas else None
+
+    def __bool__(self):
+        return self._padrao is not None
+
+    def procurar(self, texto):
+        """
+        Retorna todas as ocorrências no texto, na ordem em que aparecem:
+        dicionários com tipo ('nome' ou 'tombamento'), termos (os nomes
+        monitorados ou o número), posição, trecho encontrado e contexto.
+        """
+        if not texto or self._padrao is None:
+            return []
+
+        normalizado = normalizar_texto(texto)
+        resultados = []
+        for achado in self._padrao.finditer(normalizado):
+            if achado.lastgroup == 'nome':
+                tipo = 'nome'
+                termos = self.nomes[' '.join(achado.group('nome').split())]
+            else:
+                numero = achado.group('tombamento')
+                if numero == '00000.000.000':
+                    continue
+                if self.tombamentos is not True and numero not in self.tombamentos:
+                    continue
+                tipo = 'tombamento'
+                termos = [numero]
+
+            inicio, fim = achado.span()
+            resultados.append({
+                'tipo': tipo,
+                'termos': termos,
+                'posicao': inicio,
+                'trecho': texto[inicio:fim],
+                'contexto': texto[max(0, inicio - self.tamanho_contexto):fim + self.tamanho_contexto].strip(),
+            })
+        return resultados
+
+    def procurar_paginas(self, paginas):
+        """Gera (numero_pagina, ocorrencia) para cada ocorrência nas páginas"""
+        for num_pagina, texto in enumerate(paginas, 1):
+            for ocorrencia in self.procurar(texto):
+                yield num_pagina, ocorrencia
@@ -0,0 +1,362 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rastreamento import span
+
+
+class ConfiguracaoOCR:
+    def __init__(self, dpi=200, binarizar=True, corrigir_inclinacao=True, recortar_conteudo=True,
+                 regiao=None, psm=6, whitelist='0123456789.', lang='por'):
+        """
+        Parâmetros do pré-processamento e do Tesseract.
+
+        dpi                 - resolução usada para converter o PDF em imagens
+        binarizar           - aplica limiar de Otsu (preto e branco)
+        corrigir_inclinacao - estima e desfaz a rotação de páginas digitalizadas tortas
+        recortar_conteudo   - remove as margens em branco ao redor do conteúdo
+        regiao              - recorte fixo (esquerda, topo, direita, base) em frações
+                              da página, ex.: (0, 0.1, 0.6, 0.9) para a coluna da tabela
+        psm                 - modo de segmentação de página do Tesseract
+        whitelist           - caracteres aceitos pelo Tesseract dentro da `regiao`
+                              (None desliga). Sem região a página inteira tem
+                              texto além dos números e é lida sem restrição.
+        """
+        self.dpi = dpi
+        self.binarizar = binarizar
+        self.corrigir_inclinacao = corrigir_inclinacao
+        self.recortar_conteudo = recortar_conteudo
+        self.regiao = regiao
+        self.psm = psm
+        self.whitelist = whitelist
+        self.lang = lang
+
+    @property
+    def caracteres_aceitos(self):
+        """A whitelist efetiva: só vale para o recorte da tabela"""
+        return self.whitelist if self.regiao else None
+
+    def config_tesseract(self):
+        """Monta a string de configuração passada ao Tesseract"""
+        partes = []
+        if self.psm is not None:
+            partes.append(f'--psm {self.psm}')
+        if self.caracteres_aceitos:
+            partes.append(f'-c tessedit_char_whitelist={self.caracteres_aceitos}')
+        return ' '.join(partes)
+
+    @classmethod
+    def original(cls):
+        """Configuração equivalente ao OCR sem pré-processamento"""
+        return cls(dpi=200, binarizar=False, corrigir_inclinacao=False, recortar_conteudo=False,
+                   psm=None, whitelist=None)
+
+
+def _regiao(valor):
+    """'esquerda,topo,direita,base' em frações da página, ou None"""
+    return tuple(float(parte) for parte in valor.split(',')) if valor else None
+
+
+# A região da tabela depende do modelo do documento: sem TOMBAMENTO_OCR_REGIAO
+# a página inteira é lida, sem whitelist
+CONFIGURACAO_PADRAO = ConfiguracaoOCR(
+    dpi=int(os.environ.get('TOMBAMENTO_OCR_DPI', 200)),
+    regiao=_regiao(os.environ.get('TOMBAMENTO_OCR_REGIAO')),
+)
+
+# Páginas convertidas em imagem por chamada ao poppler (e reconhecidas em
+# paralelo pelo pool) quando o PDF é lido página a página
+PAGINAS_POR_CONVERSAO = int(os.environ.get('TOMBAMENTO_OCR_LOTE', 4))
+
+# Faixa (em graus) e passo da busca de inclinação
+ANGULO_MAXIMO = 3.0
+PASSO_ANGULO = 0.25
+# Largura da miniatura usada para estimar a inclinação
+LARGURA_ESTIMATIVA = 600
+
+
+def limiar_otsu(pixels):
+    """Calcula o limiar de Otsu para um array de tons de cinza (0-255)"""
+    import numpy as np
+
+    histograma = np.bincount(pixels.ravel(), minlength=256).astype(float)
+    total = pixels.size
+    soma_total = np.dot(np.arange(256), histograma)
+
+    peso_fundo = np.cumsum(histograma)
+    peso_frente = total - peso_fundo
+    soma_fundo = np.cumsum(np.arange(256) * histograma)
+
+    valido = (peso_fundo > 0) & (peso_frente > 0)
+    media_fundo = np.where(valido, soma_fundo / np.maximum(peso_fundo, 1), 0)
+    media_frente = np.where(valido, (soma_total - soma_fundo) / np.maximum(peso_frente, 1), 0)
+    variancia = peso_fundo * peso_frente * (media_fundo - media_frente) ** 2
+    return int(np.argmax(np.where(valido, variancia, 0)))
+
+
+def estimar_inclinacao(imagem):
+    """
+    Estima o ângulo (em graus) que endireita o texto, pelo perfil de projeção
+    horizontal: a rotação que deixa as linhas de texto alinhadas maximiza a
+    variância das somas por linha.
+    """
+    import numpy as np
+    from PIL import Image
+
+    escala = LARGURA_ESTIMATIVA / imagem.width
+    miniatura = imagem.resize((LARGURA_ESTIMATIVA, max(1, int(imagem.height * escala))))
+    pixels = np.asarray(miniatura)
+    tinta = (pixels < limiar_otsu(pixels)).astype(np.uint8) * 255
+    base = Image.fromarray(tinta)
+
+    melhor_angulo, melhor_score = 0.0, -1.0
+    passos = int(ANGULO_MAXIMO / PASSO_ANGULO)
+    for i in range(-passos, passos + 1):
+        angulo = i * PASSO_ANGULO
+        perfil = np.asarray(base.rotate(angulo, fillcolor=0)).sum(axis=1, dtype=np.int64)
+        score = float(np.var(perfil))
+        if score > melhor_score:
+            melhor_angulo, melhor_score = angulo, score
+    return melhor_angulo
+
+
+def recortar_area_util(imagem, margem=20, minimo_tinta=3):
+    """
+    Recorta a imagem ao retângulo que contém tinta, com uma pequena margem.
+    Linhas e colunas com menos de `minimo_tinta` pixels escuros são tratadas
+    como ruído de digitalização.
+    """
+    import numpy as np
+
+    tinta = np.asarray(imagem) < 128
+    linhas = np.flatnonzero(tinta.sum(axis=1) >= minimo_tinta)
+    colunas = np.flatnonzero(tinta.sum(axis=0) >= minimo_tinta)
+    if linhas.size == 0 or colunas.size == 0:
+        return imagem
+    return imagem.crop((
+        max(0, colunas[0] - margem),
+        max(0, linhas[0] - margem),
+        min(imagem.width, colunas[-1] + margem + 1),
+        min(imagem.height, linhas[-1] + margem + 1),
+    ))
+
+
+def preprocessar_imagem(imagem, config=CONFIGURACAO_PADRAO):
+    """
+    Prepara uma página para o Tesseract: tons de cinza, recorte da região
+    configurada, correção de inclinação, binarização e remoção das margens.
+    Imagens menores e sem ruído reduzem o tempo do OCR.
+    """
+    from PIL import Image
+    import numpy as np
+
+    imagem = imagem.convert('L')
+
+    if config.regiao:
+        esquerda, topo, direita, base = config.regiao
+        imagem = imagem.crop((
+            int(esquerda * imagem.width), int(topo * imagem.height),
+            int(direita * imagem.width), int(base * imagem.height),
+        ))
+
+    if config.corrigir_inclinacao:
+        angulo = estimar_inclinacao(imagem)
+        if angulo:
+            imagem = imagem.rotate(angulo, fillcolor=255, resample=Image.BILINEAR)
+
+    if config.binarizar:
+        pixels = np.asarray(imagem)
+        limiar = limiar_otsu(pixels)
+        imagem = Image.fromarray(np.where(pixels < limiar, 0, 255).astype(np.uint8))
+
+    if config.recortar_conteudo:
+        imagem = recortar_area_util(imagem)
+
+    return imagem
+
+
+class MotorPytesseract:
+    """
+    Motor original: cada página chama o executável `tesseract` em um novo
+    processo (via pytesseract), recarregando o modelo a cada chamada.
+    """
+    nome = 'pytesseract'
+
+    def reconhecer(self, imagem, config):
+        import pytesseract
+
+        return pytesseract.image_to_string(imagem, lang=config.lang, config=config.config_tesseract())
+
+    def encerrar(self):
+        pass
+
+
+class MotorTesserocr:
+    nome = 'tesserocr'
+
+    def __init__(self):
+        """
+        Motor com o Tesseract carregado em memória via tesserocr. Cada thread
+        mantém a sua própria instância da API (o modelo é carregado uma vez
+        por thread e reaproveitado em todas as páginas seguintes).
+        """
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._local = threading.local()
+        self._apis = []
+        self._lock = threading.Lock()
+
+    def _api(self, lang):
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=lang)
+            self._local.api = api
+            self._local.lang = lang
+            with self._lock:
+                self._apis.append(api)
+        elif self._local.lang != lang:
+            api.Init(lang=lang)
+            self._local.lang = lang
+        return api
+
+    def reconhecer(self, imagem, config):
+        api = self._api(config.lang)
+        api.SetPageSegMode(config.psm if config.psm is not None else self._tesserocr.PSM.AUTO)
+        api.SetVariable('tessedit_char_whitelist', config.caracteres_aceitos or '')
+        api.SetImage(imagem)
+        return api.GetUTF8Text()
+
+    def encerrar(self):
+        with self._lock:
+            for api in self._apis:
+                api.End()
+            self._apis = []
+        self._local = threading.local()
+
+
+class PoolOCR:
+    def __init__(self, motor, workers=None):
+        """
+        Pool de threads de longa duração que processa páginas em paralelo
+        com o motor informado. Com o tesserocr cada worker mantém o modelo
+        carregado; com o pytesseract as páginas ao menos rodam em paralelo.
+        """
+        self.motor = motor
+        self._reserva = MotorPytesseract()
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr')
+
+    def _processar(self, indice, imagem, config):
+        with span('ocr_pagina', pagina=indice, motor=self.motor.nome):
+            with span('preprocessamento_ocr'):
+                imagem = preprocessar_imagem(imagem, config)
+            try:
+                return self.motor.reconhecer(imagem, config)
+            except Exception as e:
+                if self.motor.nome == self._reserva.nome:
+                    raise
+                # Volta para o caminho original se o motor persistente falhar
+                print(f'Erro no OCR com {self.motor.nome}: {str(e)}. Usando {self._reserva.nome}...')
+                return self._reserva.reconhecer(imagem, config)
+
+    def reconhecer_paginas(self, imagens, config=CONFIGURACAO_PADRAO, paginas=None):
+        """
+        Reconhece uma sequência de imagens e devolve os textos na ordem
+        original das páginas, conforme cada página fica pronta. `paginas`
+        são os números das páginas, usados só no rastreamento.
+        """
+        futuros = [
+            self._executor.submit(self._processar, indice, imagem, config)
+            for indice, imagem in zip(paginas or range(1, len(imagens) + 1), imagens)
+        ]
+        for futuro in futuros:
+            yield futuro.result()
+
+    def encerrar(self):
+        self._executor.shutdown(wait=True)
+        self.motor.encerrar()
+
+
+def criar_motor(nome=None):
+    """
+    Cria o motor de OCR pedido. Sem nome, usa o tesserocr se estiver
+    instalado e cai para o pytesseract caso contrário.
+    """
+    nome = nome or os.environ.get('TOMBAMENTO_OCR_MOTOR')
+    if nome in (None, '', 'tesserocr'):
+        try:
+            return MotorTesserocr()
+        except Exception as e:
+            if nome == 'tesserocr':
+                print(f'tesserocr indisponível ({str(e)}), usando pytesseract')
+    return MotorPytesseract()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool():
+    """Retorna o pool de OCR do processo, criando-o no primeiro uso"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = os.environ.get('TOMBAMENTO_OCR_WORKERS')
+            _pool = PoolOCR(criar_motor(), int(workers) if workers else None)
+        return _pool
+
+
+def converter_paginas(pdf_path, config=CONFIGURACAO_PADRAO, primeira=None, ultima=None):
+    """
+    Converte páginas do PDF em imagens em tons de cinza no DPI configurado.
+    `primeira`/`ultima` (base 1) limitam a conversão a um intervalo.
+    """
+    import platform
+    from pdf2image import convert_from_path
+
+    opcoes = {'dpi': config.dpi, 'grayscale': True}
+    if primeira is not None:
+        opcoes['first_page'] = primeira
+    if ultima is not None:
+        opcoes['last_page'] = ultima
+
+    # No Mac não precisa especificar poppler_path
+    if platform.system() == 'Windows':
+        opcoes['poppler_path'] = r'C:\Program Files\poppler-xx\Library\bin'
+
+    with span('conversao_imagens', primeira=primeira, ultima=ultima):
+        return convert_from_path(pdf_path, **opcoes)
+
+
+def ocr_paginas_pdf(pdf_path, paginas, config=CONFIGURACAO_PADRAO):
+    """
+    Reconhece as páginas informadas (base 1, em ordem crescente) do PDF e
+    gera os textos na mesma ordem. Cada sequência de páginas consecutivas é
+    convertida em uma chamada ao poppler (first_page/last_page), sem
+    rasterizar as páginas com texto que ficam entre elas, e as páginas são
+    reconhecidas em paralelo no pool.
+    """
+    paginas = list(paginas)
+    if not paginas:
+        return
+
+    # [3, 4, 5, 9, 10] -> [(3, 5), (9, 10)]
+    sequencias = []
+    for pagina in paginas:
+        if sequencias and pagina == sequencias[-1][1] + 1:
+            sequencias[-1][1] = pagina
+        else:
+            sequencias.append([pagina, pagina])
+
+    imagens = []
+    for primeira, ultima in sequencias:
+        imagens.extend(converter_paginas(pdf_path, config, primeira, ultima))
+    yield from obter_pool().reconhecer_paginas(imagens, config, paginas)
+
+
+def ocr_imagem(imagem, config=CONFIGURACAO_PADRAO):
+    """Pré-processa a imagem e executa o OCR com o motor do pool do processo"""
+    with span('preprocessamento_ocr'):
+        imagem = preprocessar_imagem(imagem, config)
+    return obter_pool().motor.reconhecer(imagem, config)
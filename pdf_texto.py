@@ -0,0 +1,97 @@
+import os
+
+
+class BackendPyPDF2:
+    """Extração em Python puro com o PyPDF2 (sempre disponível)"""
+    nome = 'pypdf2'
+
+    def paginas(self, pdf_path):
+        from PyPDF2 import PdfReader
+
+        for page in PdfReader(pdf_path).pages:
+            yield page.extract_text() or ''
+
+
+class BackendPypdfium2:
+    """Extração com o PDFium (biblioteca nativa do Chrome) via pypdfium2"""
+    nome = 'pypdfium2'
+
+    def __init__(self):
+        import pypdfium2
+        self._pdfium = pypdfium2
+
+    def paginas(self, pdf_path):
+        documento = self._pdfium.PdfDocument(pdf_path)
+        try:
+            for indice in range(len(documento)):
+                pagina = documento[indice]
+                texto_pagina = pagina.get_textpage()
+                try:
+                    yield texto_pagina.get_text_range()
+                finally:
+                    texto_pagina.close()
+                    pagina.close()
+        finally:
+            documento.close()
+
+
+class BackendPdfminer:
+    """Extração com o pdfminer.six (mais lento, mas robusto em layouts difíceis)"""
+    nome = 'pdfminer'
+
+    def __init__(self):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        self._extract_pages = extract_pages
+        self._container = LTTextContainer
+
+    def paginas(self, pdf_path):
+        for layout in self._extract_pages(pdf_path):
+            yield ''.join(
+                elemento.get_text() for elemento in layout
+                if isinstance(elemento, self._container)
+            )
+
+
+# Ordem de preferência na seleção automática (mais rápido primeiro)
+# (o pdfminer fica por último: é bem mais lento que o PyPDF2 em documentos longos)
+BACKENDS = {
+    BackendPypdfium2.nome: BackendPypdfium2,
+    BackendPyPDF2.nome: BackendPyPDF2,
+    BackendPdfminer.nome: BackendPdfminer,
+}
+
+
+def backends_disponiveis():
+    """Retorna instâncias de todos os backends cujas bibliotecas estão instaladas"""
+    disponiveis = []
+    for classe in BACKENDS.values():
+        try:
+            disponiveis.append(classe())
+        except ImportError:
+            continue
+    return disponiveis
+
+
+_backend = None
+
+
+def obter_backend(nome=None):
+    """
+    Retorna o backend de extração de texto. Sem nome, usa a variável de
+    ambiente TOMBAMENTO_PDF_BACKEND ou o mais rápido disponível.
+    """
+    global _backend
+    nome = nome or os.environ.get('TOMBAMENTO_PDF_BACKEND')
+
+    if nome:
+        if nome not in BACKENDS:
+            raise ValueError(f'Backend de PDF desconhecido: {nome}')
+        try:
+            return BACKENDS[nome]()
+        except ImportError:
+            print(f'Backend {nome} indisponível, usando seleção automática')
+
+    if _backend is None:
+        _backend = backends_disponiveis()[0]
+    return _backend
@@ -0,0 +1,309 @@
+import contextvars
+import os
+import queue
+import threading
+
+from concorrencia import admitir
+from rastreamento import pausa, rastreador, span
+
+# Marca o fim da extração na fila de números
+FIM = object()
+
+# Números extraídos por vez com a vaga de OCR ocupada; a vaga é liberada
+# antes de colocá-los na fila (que pode ficar cheia esperando o navegador)
+LOTE_EXTRACAO = 50
+
+# Segundos que executar() espera as threads terminarem ao encerrar
+ESPERA_ENCERRAMENTO = 30
+
+
+class PipelineTombamento:
+    def __init__(self, pdf_paths, cpf, senha, tamanho_fila=200, paginas_sem_numeros=3,
+                 base_url=None, headless=False, guarda=None):
+        """
+        Extrai números dos PDFs e os envia ao SISGEPAT ao mesmo tempo.
+
+        Uma thread extrai os números página a página (process_pdf_stream) e os
+        coloca em uma fila limitada; outra thread abre o navegador, faz login,
+        navega até Dados Gerais e vai preenchendo os números conforme chegam.
+        Login e navegação acontecem enquanto o OCR ainda está rodando, então o
+        tempo total fica próximo do maior entre extração e envio.
+
+        Com uma `guarda` (GuardaIdempotencia) os números já enviados ou em
+        envio por outro processamento são ignorados, como em
+        processar_tombamentos.
+
+        A extração e o navegador ocupam vagas do controle de admissão
+        (concorrencia.py); enquanto esperam a vez é gerado o evento
+        'aguardando'. A vaga de OCR é ocupada a cada lote de números
+        extraídos e liberada enquanto o envio não alcança a extração, para
+        não prender a vaga de outros usuários.
+        """
+        self.pdf_paths = list(pdf_paths)
+        self.cpf = cpf
+        self.senha = senha
+        self.paginas_sem_numeros = paginas_sem_numeros
+        self.base_url = base_url
+        self.headless = headless
+        self.guarda = guarda
+
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._eventos = queue.Queue()
+        self._parar = threading.Event()
+        self._extracao_concluida = threading.Event()
+        self.extraidos = 0
+        self.execucao_id = None
+
+    def cancelar(self):
+        """Interrompe extração e envio o quanto antes"""
+        self._parar.set()
+
+    def _colocar(self, item):
+        # Respeita a fila limitada sem travar para sempre se o envio parar
+        while not self._parar.is_set():
+            try:
+                self._fila.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _aguardando(self, recurso):
+        """Callback do controle de admissão: informa a posição na fila"""
+        def aguardando(posicao):
+            if self._parar.is_set():
+                raise RuntimeError('Processamento cancelado')
+            self._eventos.put({'status': 'aguardando', 'recurso': recurso, 'posicao': posicao})
+        return aguardando
+
+    def _extrair_lote(self, numeros):
+        """
+        Próximos números (até LOTE_EXTRACAO) do gerador de um PDF, com a vaga
+        de OCR ocupada só enquanto eles são extraídos. Retorna (lote, fim).
+        """
+        lote = []
+        with admitir('ocr', self.cpf, self._aguardando('ocr')):
+            for numero in numeros:
+                lote.append(numero)
+                if len(lote) >= LOTE_EXTRACAO:
+                    return lote, False
+        return lote, True
+
+    def _extrair(self):
+        from tomb import process_pdf_stream
+
+        vistos = set()
+        try:
+            for pdf_path in self.pdf_paths:
+                if self._parar.is_set():
+                    return
+                # Um PDF com erro não impede a extração dos seguintes
+                try:
+                    if not self._extrair_pdf(pdf_path, process_pdf_stream, vistos):
+                        return
+                except Exception as e:
+                    self._eventos.put({
+                        'status': 'aviso',
+                        'arquivo': pdf_path,
+                        'mensagem': f'Erro na extração de {os.path.basename(pdf_path)}: {str(e)}',
+                    })
+        finally:
+            self._extracao_concluida.set()
+            self._eventos.put({'status': 'extracao_concluida', 'extraidos': self.extraidos})
+            self._colocar(FIM)
+
+    def _extrair_pdf(self, pdf_path, process_pdf_stream, vistos):
+        """Extrai os números de um PDF para a fila; False se o envio parou"""
+        with span('pipeline_extracao_pdf', arquivo=pdf_path):
+            numeros = process_pdf_stream(pdf_path, self.paginas_sem_numeros)
+            try:
+                fim = False
+                while not fim:
+                    lote, fim = self._extrair_lote(numeros)
+                    for numero in lote:
+                        if self._parar.is_set():
+                            return False
+                        if numero in vistos:
+                            continue
+                        vistos.add(numero)
+                        self.extraidos += 1
+                        self._eventos.put({
+                            'status': 'extraido',
+                            'numero': numero,
+                            'arquivo': pdf_path,
+                            'extraidos': self.extraidos,
+                        })
+                        if not self._colocar(numero):
+                            return False
+            finally:
+                numeros.close()
+        return True
+
+    def _submeter(self):
+        try:
+            with admitir('navegador', self.cpf, self._aguardando('navegador')):
+                self._enviar()
+        except Exception as e:
+            self._eventos.put({'status': 'erro', 'mensagem': f"Erro no envio: {str(e)}"})
+
+    def _enviar(self):
+        from tomb import SisgepatAutomation
+
+        bot = None
+        try:
+            bot = SisgepatAutomation(base_url=self.base_url, headless=self.headless,
+                                     execucao_id=self.execucao_id)
+            if not bot.login_with_javascript(self.cpf, self.senha):
+                self._eventos.put({'status': 'erro', 'mensagem': 'Falha no login!'})
+                return
+            if not bot.navegar_para_dados_gerais():
+                self._eventos.put({'status': 'erro', 'mensagem': 'Erro na navegação inicial'})
+                return
+            self._eventos.put({'status': 'pronto', 'extraidos': self.extraidos})
+
+            index = 0
+            sucessos = 0
+            preenchidos = []
+            while not self._parar.is_set():
+                try:
+                    numero = self._fila.get(timeout=0.5)
+                except queue.Empty:
+                    if self.guarda is not None:
+                        # A extração pode demorar: mantém as reservas dos já preenchidos
+                        self.guarda.renovar()
+                    continue
+                if numero is FIM:
+                    break
+
+                index += 1
+                # Enquanto a extração continua o total ainda pode crescer
+                total = max(self.extraidos, index)
+
+                if self.guarda is not None:
+                    motivo = self.guarda.reservar(numero)
+                    if motivo:
+                        self._eventos.put({
+                            'status': 'ignorado',
+                            'numero': numero,
+                            'index': index,
+                            'total': total,
+                            'progresso': min(index / total, 1.0),
+                            'sucessos': sucessos,
+                            'motivo': motivo,
+                        })
+                        continue
+
+                resultado = bot.preencher_com_retry(numero, guarda=self.guarda)
+                if resultado['sucesso']:
+                    sucessos += 1
+                    preenchidos.append(numero)
+
+                self._eventos.put({
+                    'status': 'processando',
+                    'numero': numero,
+                    'index': index,
+                    'total': total,
+                    'progresso': min(index / total, 1.0),
+                    'sucessos': sucessos,
+                    'sucesso': resultado['sucesso'],
+                    'tentativas': resultado['tentativas'],
+                    'tipo_falha': resultado['tipo_falha'],
+                    'mensagem_erro': resultado['mensagem_erro'],
+                    'extracao_concluida': self._extracao_concluida.is_set(),
+                })
+                if resultado.get('sessao_perdida'):
+                    self._eventos.put({
+                        'status': 'erro',
+                        'mensagem': f"Sessão perdida e não recuperada: {resultado['mensagem_erro']}"
+                    })
+                    return
+                pausa(2)
+
+            if self._parar.is_set():
+                self._eventos.put({'status': 'erro', 'mensagem': 'Processamento cancelado'})
+                return
+            if index == 0:
+                self._eventos.put({
+                    'status': 'concluido',
+                    'total': 0,
+                    'sucessos': 0,
+                    'mensagem': 'Nenhum número de tombamento encontrado nos PDFs.'
+                })
+                return
+
+            if self.guarda is not None and not preenchidos:
+                self._eventos.put({
+                    'status': 'concluido',
+                    'total': index,
+                    'sucessos': 0,
+                    'mensagem': 'Nenhum número novo foi preenchido; nada a emitir.'
+                })
+                return
+
+            try:
+                if self.guarda is not None:
+                    # As reservas precisam valer até a confirmação
+                    self.guarda.renovar(forcar=True)
+                bot.emitir()
+            except Exception as e:
+                self._eventos.put({'status': 'erro', 'mensagem': f"Erro ao finalizar: {str(e)}"})
+                return
+            if self.guarda is not None:
+                self.guarda.confirmar(preenchidos)
+
+            self._eventos.put({
+                'status': 'concluido',
+                'total': index,
+                'sucessos': sucessos,
+                'mensagem': 'Processamento concluído com sucesso!'
+            })
+        except Exception as e:
+            self._eventos.put({'status': 'erro', 'mensagem': f"Erro no envio: {str(e)}"})
+        finally:
+            # Libera a extração caso ela esteja esperando espaço na fila
+            self._parar.set()
+            if self.guarda is not None:
+                self.guarda.liberar()
+            if bot is not None:
+                bot.close()
+
+    def executar(self):
+        """
+        Inicia as duas etapas e gera os eventos na thread de quem chamou
+        (necessário para atualizar a interface do Streamlit). Os eventos
+        'processando', 'concluido' e 'erro' têm o mesmo formato dos de
+        processar_tombamentos; 'extraido', 'extracao_concluida', 'pronto' e
+        'aviso' informam o andamento da extração e do login.
+
+        cancelar(), chamado de outra thread, encerra a execução com um
+        evento 'erro' mesmo que o envio esteja parado; ao sair, as threads
+        têm até ESPERA_ENCERRAMENTO segundos para terminar.
+        """
+        # As duas threads gravam os spans com o mesmo identificador de execução
+        self.execucao_id = rastreador.nova_execucao()
+        extracao = threading.Thread(target=contextvars.copy_context().run, args=(self._extrair,),
+                                    name='pipeline-extracao', daemon=True)
+        envio = threading.Thread(target=contextvars.copy_context().run, args=(self._submeter,),
+                                 name='pipeline-envio', daemon=True)
+        extracao.start()
+        envio.start()
+
+        try:
+            while True:
+                try:
+                    evento = self._eventos.get(timeout=0.5)
+                except queue.Empty:
+                    if self._parar.is_set() or not envio.is_alive():
+                        # Cancelado, ou o envio terminou sem avisar
+                        yield {'status': 'erro', 'mensagem': 'Processamento cancelado'}
+                        break
+                    continue
+                yield evento
+                if evento['status'] in ('concluido', 'erro'):
+                    break
+        finally:
+            self.cancelar()
+            envio.join(ESPERA_ENCERRAMENTO)
+            extracao.join(5)
+            if envio.is_alive():
+                print(f"Envio ainda em andamento após {ESPERA_ENCERRAMENTO} s; o navegador será fechado quando ele terminar")
@@ -0,0 +1,107 @@
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Quadros por segundo do painel de progresso
+QUADROS_POR_SEGUNDO = 4
+
+# Linhas mantidas no log ao vivo (as mais recentes)
+LINHAS_LOG = 500
+
+ICONES = {
+    'sucesso': '✅',
+    'falha': '❌',
+    'ignorado': '⏭️',
+    'aviso': '⚠️',
+    'info': 'ℹ️',
+}
+
+
+class PainelProgresso:
+    def __init__(self, metricas, fps=QUADROS_POR_SEGUNDO, linhas_log=LINHAS_LOG, altura_log=240):
+        """
+        Barra de progresso, texto de status, métricas e log de um
+        processamento, redesenhados no máximo `fps` vezes por segundo.
+
+        Os eventos só atualizam o estado em memória; a cada quadro apenas os
+        elementos que mudaram são enviados ao navegador. O log guarda as
+        últimas `linhas_log` ocorrências e é exibido em uma tabela de altura
+        fixa (o st.dataframe só desenha as linhas visíveis).
+
+        metricas - rótulos iniciais das colunas de métricas
+        """
+        self.intervalo = 1 / fps if fps else 0
+        self._barra = st.progress(0)
+        self._status = st.empty()
+        colunas = st.columns(len(metricas))
+        self._metricas = [coluna.empty() for coluna in colunas]
+        self._log = st.empty()
+        self.altura_log = altura_log
+
+        self.progresso = 0.0
+        self.status = ''
+        self.metricas = [(rotulo, '0') for rotulo in metricas]
+        self.linhas = deque(maxlen=linhas_log)
+
+        # O que está na tela, para só reenviar o que mudou
+        self._exibido = {}
+        self._log_alterado = False
+        self._ultimo_quadro = 0.0
+        self.quadros = 0
+        self.mensagens = 0
+
+    def atualizar(self, progresso=None, status=None):
+        if progresso is not None:
+            self.progresso = min(max(progresso, 0.0), 1.0)
+        if status is not None:
+            self.status = status
+        self._talvez_renderizar()
+
+    def metrica(self, indice, valor, rotulo=None):
+        rotulo_atual, _ = self.metricas[indice]
+        self.metricas[indice] = (rotulo or rotulo_atual, str(valor))
+        self._talvez_renderizar()
+
+    def registrar(self, resultado, numero='', detalhe=''):
+        """Acrescenta uma linha ao log ('sucesso', 'falha', 'ignorado', 'aviso' ou 'info')"""
+        self.linhas.appendleft({
+            'hora': datetime.now().strftime('%H:%M:%S'),
+            '': ICONES.get(resultado, ''),
+            'numero': numero,
+            'detalhe': detalhe or '',
+        })
+        self._log_alterado = True
+        self._talvez_renderizar()
+
+    def _talvez_renderizar(self):
+        if time.monotonic() - self._ultimo_quadro >= self.intervalo:
+            self.renderizar()
+
+    def _enviar(self, chave, valor, desenhar):
+        if self._exibido.get(chave) != valor:
+            desenhar()
+            self._exibido[chave] = valor
+            self.mensagens += 1
+
+    def renderizar(self):
+        """Desenha o estado atual (chamar também ao final, para o último quadro)"""
+        self._ultimo_quadro = time.monotonic()
+        self.quadros += 1
+
+        # A barra só muda de pixel a cada 0,1%
+        progresso = round(self.progresso, 3)
+        self._enviar('progresso', progresso, lambda: self._barra.progress(progresso))
+        self._enviar('status', self.status, lambda: self._status.text(self.status))
+        for indice, (rotulo, valor) in enumerate(self.metricas):
+            self._enviar(('metrica', indice), (rotulo, valor),
+                         lambda indice=indice, rotulo=rotulo, valor=valor:
+                         self._metricas[indice].metric(rotulo, valor))
+
+        if self._log_alterado:
+            self._log_alterado = False
+            self.mensagens += 1
+            self._log.dataframe(pd.DataFrame(list(self.linhas)), height=self.altura_log,
+                                use_container_width=True, hide_index=True)
@@ -0,0 +1,199 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# Arquivo JSON-lines onde os spans são gravados (um objeto por linha)
+SPANS_FILE = os.environ.get('TOMBAMENTO_SPANS_FILE', 'spans.jsonl')
+# Tamanho a partir do qual o arquivo é renomeado para `<arquivo>.1` e recomeçado
+SPANS_MAX_BYTES = int(os.environ.get('TOMBAMENTO_SPANS_MAX_BYTES', 20 * 1024 * 1024))
+
+
+class Rastreador:
+    def __init__(self, arquivo=SPANS_FILE, max_bytes=SPANS_MAX_BYTES):
+        """
+        Registra spans (etapas cronometradas) em um arquivo JSON-lines.
+        Cada execução recebe um identificador próprio para permitir
+        comparar etapas entre execuções diferentes. O identificador vale
+        para o contexto atual (thread), então execuções simultâneas não
+        trocam de identificador umas com as outras.
+
+        O arquivo fica aberto entre os spans; ao passar de `max_bytes` ele é
+        renomeado para `<arquivo>.1` (substituindo o anterior) e recomeçado.
+        """
+        self.arquivo = arquivo
+        self.max_bytes = max_bytes
+        self._execucao_padrao = uuid.uuid4().hex[:12]
+        self._execucao = contextvars.ContextVar(f'execucao_{id(self)}', default=None)
+        self._pilha = contextvars.ContextVar(f'pilha_{id(self)}', default=())
+        self._lock = threading.Lock()
+        self._saida = None
+
+    @property
+    def execucao_id(self):
+        return self._execucao.get() or self._execucao_padrao
+
+    def nova_execucao(self, execucao_id=None):
+        """
+        Inicia um identificador de execução no contexto atual (novo, ou
+        `execucao_id` para continuar uma execução em outra thread) e o retorna
+        """
+        execucao_id = execucao_id or uuid.uuid4().hex[:12]
+        self._execucao.set(execucao_id)
+        return execucao_id
+
+    @contextmanager
+    def span(self, etapa, **atributos):
+        """
+        Cronometra o bloco e grava um span com a etapa informada.
+        O dicionário retornado pode receber atributos extras dentro do bloco
+        (por exemplo `s['sucesso'] = False`).
+        """
+        pilha = self._pilha.get()
+        registro = {
+            'execucao': self.execucao_id,
+            'span_id': uuid.uuid4().hex[:12],
+            'pai': pilha[-1] if pilha else None,
+            'etapa': etapa,
+            'inicio': datetime.now().isoformat(timespec='milliseconds'),
+        }
+        registro.update(atributos)
+        self._pilha.set(pilha + (registro['span_id'],))
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        except BaseException as e:
+            registro['sucesso'] = False
+            registro['erro'] = str(e)
+            raise
+        finally:
+            registro['duracao_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+            registro.setdefault('sucesso', True)
+            # Remove só o próprio span: um gerador fechado fora de ordem não
+            # pode desempilhar o span de quem o consumia
+            self._pilha.set(tuple(s for s in self._pilha.get() if s != registro['span_id']))
+            self._gravar(registro)
+
+    @contextmanager
+    def suspenso(self, registro):
+        """
+        Tira da pilha o span `registro` (e os abertos dentro dele) durante o
+        bloco. Use em volta do `yield` de um gerador que está dentro de um
+        span, para que os spans do consumidor não fiquem como filhos dele.
+        """
+        pilha = self._pilha.get()
+        if registro['span_id'] in pilha:
+            self._pilha.set(pilha[:pilha.index(registro['span_id'])])
+        try:
+            yield
+        finally:
+            self._pilha.set(pilha)
+
+    def rastrear(self, etapa):
+        """
+        Decorador que registra um span para cada chamada da função.
+        Funções que retornam booleano têm o resultado gravado como sucesso.
+        """
+        def decorador(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(etapa) as registro:
+                    resultado = func(*args, **kwargs)
+                    if isinstance(resultado, bool):
+                        registro['sucesso'] = resultado
+                    return resultado
+            return wrapper
+        return decorador
+
+    def pausa(self, segundos):
+        """
+        Substitui time.sleep nas esperas propositais. Não grava span: o tempo
+        já aparece no span da etapa que esperou.
+        """
+        time.sleep(segundos)
+
+    def _gravar(self, registro):
+        try:
+            linha = json.dumps(registro, ensure_ascii=False, default=str)
+            with self._lock:
+                if self._saida is None:
+                    self._saida = open(self.arquivo, 'a', encoding='utf-8', buffering=1)
+                self._saida.write(linha + '\n')
+                if self.max_bytes and self._saida.tell() >= self.max_bytes:
+                    self._rotacionar()
+        except Exception as e:
+            # O rastreamento nunca deve interromper o processamento
+            print(f"Erro ao gravar span: {str(e)}")
+
+    def _rotacionar(self):
+        """Fecha o arquivo cheio e o guarda como `<arquivo>.1` (chamado com o lock)"""
+        self._saida.close()
+        self._saida = None
+        os.replace(self.arquivo, self.arquivo + '.1')
+
+
+def carregar_spans(arquivo=SPANS_FILE):
+    """Lê os spans gravados no arquivo JSON-lines e no anterior à última rotação"""
+    spans = []
+    for caminho in (arquivo + '.1', arquivo):
+        if not os.path.exists(caminho):
+            continue
+        with open(caminho, encoding='utf-8') as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    spans.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def assinatura_spans(arquivo=SPANS_FILE):
+    """(mtime, tamanho) do arquivo de spans, para saber se o resumo mudou"""
+    try:
+        info = os.stat(arquivo)
+    except OSError:
+        return None
+    return info.st_mtime, info.st_size
+
+
+def resumo_por_etapa(arquivo=SPANS_FILE):
+    """
+    Retorna um DataFrame com a latência por etapa (p50/p95/máximo em ms),
+    quantidade de ocorrências, execuções e taxa de sucesso.
+    """
+    import pandas as pd
+
+    colunas = ['etapa', 'ocorrencias', 'execucoes', 'p50_ms', 'p95_ms',
+               'max_ms', 'total_s', 'taxa_sucesso']
+    spans = carregar_spans(arquivo)
+    if not spans:
+        return pd.DataFrame(columns=colunas)
+
+    df = pd.DataFrame(spans)
+    grupos = df.groupby('etapa')
+    resumo = pd.DataFrame({
+        'ocorrencias': grupos.size(),
+        'execucoes': grupos['execucao'].nunique(),
+        'p50_ms': grupos['duracao_ms'].quantile(0.50),
+        'p95_ms': grupos['duracao_ms'].quantile(0.95),
+        'max_ms': grupos['duracao_ms'].max(),
+        'total_s': grupos['duracao_ms'].sum() / 1000,
+        'taxa_sucesso': grupos['sucesso'].mean() * 100,
+    }).reset_index()
+
+    return resumo[colunas].round(2).sort_values('total_s', ascending=False)
+
+
+# Rastreador padrão compartilhado pelos módulos
+rastreador = Rastreador()
+span = rastreador.span
+pausa = rastreador.pausa
+rastrear = rastreador.rastrear
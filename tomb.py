@@ -4,84 +4,126 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import pandas as pd
-import time
-from datetime import datetime
+import os
+import random
+import itertools
+from pdf_texto import obter_backend
+from rastreamento import rastreador, span, pausa, rastrear
+from extrator import ExtratorTombamento, extrair_numeros
+from ingestao import ingerir
+from localizador import normalizar_texto
 
+# Endereço do SISGEPAT; pode ser trocado (ex.: servidor simulado local) via variável de ambiente
+SISGEPAT_URL = os.environ.get('SISGEPAT_URL', 'https://sisgepat.fazenda.df.gov.br/')
+PAGINA_DADOS_GERAIS = 'SIGGO/SISGEPAT/Paginas/070_Dados_Gerais/FrmDGComplementar.aspx'
+
+ID_CAMPO_TOMBAMENTO = "ctl00_ctl00_ctl00_CphBody_CphFormulario_CphFormularioInclusaoAlteracao_TxtTombamento"
+ID_BOTAO_ADICIONAR_ITEM = "ctl00_ctl00_ctl00_CphBody_CphFormulario_CphFormularioInclusaoAlteracao_BtnFRecursoAdd"
+ID_MENSAGEM = "ctl00_ctl00_ctl00_CphBody_CphFormulario_LblMensagem"
+
+# Novas tentativas de um número dentro do mesmo processamento
+MAX_TENTATIVAS = int(os.environ.get('TOMBAMENTO_TENTATIVAS', '3'))
+ESPERA_BASE_TENTATIVA = 2
+
+# Tipos de falha ao preencher um número. Só 'rejeitado' (o SISGEPAT recusou
+# o número) é definitiva; as demais são tentadas de novo no mesmo
+# processamento, refazendo login e navegação quando a sessão ou a página se
+# perderam.
+FALHAS_NA_PAGINA = ('elemento_obsoleto', 'tempo_esgotado', 'mensagem_desconhecida', 'desconhecida')
+
+# Trechos (sem acento, minúsculos) das mensagens do LblMensagem que recusam o
+# número; outras mensagens (avisos, erros do servidor) são tentadas de novo.
+# TOMBAMENTO_MENSAGENS_REJEICAO acrescenta trechos, separados por vírgula
+MENSAGENS_REJEICAO = (
+    'nao encontrado', 'indisponivel', 'invalido', 'inexistente', 'ja incluido', 'ja adicionado',
+    'ja cadastrado', 'ja consta', 'baixado', 'nao pertence',
+) + tuple(
+    normalizar_texto(trecho.strip())
+    for trecho in os.environ.get('TOMBAMENTO_MENSAGENS_REJEICAO', '').split(',') if trecho.strip()
+)
+FALHAS_DE_SESSAO = ('sessao_expirada', 'pagina_perdida')
+# Trechos de MENSAGENS_REJEICAO que dizem que o número já está no formulário;
+# ao restaurar o formulário depois de perder a sessão, contam como sucesso
+MENSAGENS_JA_INCLUIDO = ('ja incluido', 'ja adicionado')
 
-import re
-import pandas as pd
-from PyPDF2 import PdfReader
 
-def extract_tombamento_numbers(text):
+class FalhaTombamento(Exception):
+    def __init__(self, tipo, mensagem):
+        super().__init__(mensagem)
+        self.tipo = tipo
+
+def extract_tombamento_numbers(text, ocr=False):
     """
-    Extrai números de tombamento do texto usando expressão regular.
-    O padrão procura por números no formato 00000.000.000
+    Extrai números de tombamento do texto.
+    O padrão procura por números no formato 00000.000.000, tolerando as
+    variações comuns do OCR (vírgulas, O/0, l/1 e quebras de linha); com
+    ocr=False o formato exato é tentado primeiro (veja ExtratorTombamento).
+    Os números retornam normalizados, na ordem em que aparecem e sem duplicatas.
     """
-    # Padrão regex para encontrar números de tombamento
-    pattern = r'\d{5}\.\d{3}\.\d{3}'
-    
-    # Encontra todos os números de tombamento no texto
-    tombamentos = re.findall(pattern, text)
-    
-    return tombamentos
+    return extrair_numeros([text], ocr)
 
-def read_pdf(pdf_path):
+def read_pdf(pdf_path, backend=None):
     """
     Lê o conteúdo de um arquivo PDF e retorna o texto completo.
     Tenta primeiro extrair texto diretamente, se falhar, usa OCR.
+    `backend` escolhe a biblioteca de extração de texto (veja pdf_texto.py);
+    por padrão usa a mais rápida instalada.
+    """
+    return ler_pdf(pdf_path, backend)[0]
+
+@rastrear('leitura_pdf')
+def ler_pdf(pdf_path, backend=None):
+    """
+    Como read_pdf, mas retorna (texto, usou_ocr): quem extrai os números
+    precisa saber se o texto veio do OCR (veja ExtratorTombamento).
     """
     try:
         # Primeira tentativa: extrair texto diretamente
-        pdf_reader = PdfReader(pdf_path)
+        backend = obter_backend(backend)
         text_content = []
         
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text.strip():  # Verifica se há texto significativo
-                text_content.append(text)
+        with span('extracao_texto', backend=backend.nome) as registro:
+            for text in backend.paginas(pdf_path):
+                if text.strip():  # Verifica se há texto significativo
+                    text_content.append(text)
+            registro['paginas_com_texto'] = len(text_content)
         
         # Se encontrou texto em todas as páginas, retorna
         if text_content and all(text.strip() for text in text_content):
-            return '\n'.join(text_content)
+            return '\n'.join(text_content), False
         
         # Se não encontrou texto, tenta OCR
         print('Texto não encontrado diretamente. Tentando OCR...')
-        return extract_text_with_ocr(pdf_path)
+        return extract_text_with_ocr(pdf_path), True
         
     except Exception as e:
         print(f'Erro ao ler o arquivo PDF: {str(e)}')
-        return ''
+        return '', False
 
-def extract_text_with_ocr(pdf_path):
+@rastrear('ocr_documento')
+def extract_text_with_ocr(pdf_path, config=None):
     """
     Extrai texto de um PDF usando OCR.
+    As páginas passam pelo pré-processamento de `ocr.py` (DPI, binarização,
+    correção de inclinação e recorte) antes do Tesseract.
     """
     try:
-        from pdf2image import convert_from_path
-        import pytesseract
-        import tempfile
-        import os
-        import platform
+        from ocr import CONFIGURACAO_PADRAO, converter_paginas, obter_pool
         
+        config = config or CONFIGURACAO_PADRAO
         text_content = []
         
         # Converte PDF para imagens
         print('Convertendo PDF para imagens...')
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # No Mac não precisa especificar poppler_path
-            if platform.system() == 'Windows':
-                images = convert_from_path(pdf_path, poppler_path=r'C:\Program Files\poppler-xx\Library\bin')
-            else:
-                images = convert_from_path(pdf_path)
-            
-            # Processa cada página
-            for i, image in enumerate(images, 1):
-                print(f'Processando página {i} com OCR...')
-                # Extrai texto da imagem usando OCR
-                text = pytesseract.image_to_string(image, lang='por')
-                text_content.append(text)
+        images = converter_paginas(pdf_path, config)
+        
+        # Processa as páginas no pool de OCR (modelo mantido carregado entre páginas)
+        pool = obter_pool()
+        print(f'Processando {len(images)} páginas com OCR ({pool.motor.nome}, {pool.workers} workers)...')
+        for text in pool.reconhecer_paginas(images, config):
+            text_content.append(text)
         
         return '\n'.join(text_content)
         
@@ -89,30 +131,127 @@ def extract_text_with_ocr(pdf_path):
         print(f'Erro ao processar OCR: {str(e)}')
         return ''
 
-def process_pdf(pdf_path):
+def carregar_numeros(caminho, coluna='Numero_Tombamento'):
+    """
+    Lê a lista de números de tombamento de um arquivo (xlsx, xls, csv ou
+    parquet) em fluxo com o módulo ingestao. Sem a coluna informada, usa a
+    coluna cujos valores têm o formato de número de tombamento.
+    """
+    return ingerir(caminho, coluna=coluna).numeros
+
+def normalizar_entrada_numeros(numeros, coluna='Numero_Tombamento'):
+    """
+    Converte as entradas aceitas por processar_tombamentos em um iterável de
+    números: caminhos de arquivo são lidos, DataFrames/Series viram listas e
+    listas ou geradores passam direto.
+    """
+    if isinstance(numeros, (str, os.PathLike)):
+        return carregar_numeros(numeros, coluna)
+    if isinstance(numeros, pd.DataFrame):
+        serie = numeros[coluna] if coluna in numeros.columns else numeros.iloc[:, 0]
+        return serie.tolist()
+    if isinstance(numeros, pd.Series):
+        return numeros.tolist()
+    return numeros
+
+def extrair_paginas(pdf_path, backend=None, config=None, forcar_ocr=False):
+    """
+    Gera (numero_pagina, texto, usou_ocr) página a página.
+    Usa a camada de texto quando existe e faz OCR apenas das páginas sem texto,
+    em lotes de PAGINAS_POR_CONVERSAO páginas (uma conversão para imagem por
+    lote, páginas reconhecidas em paralelo), então quem consome o gerador
+    pode parar antes de pagar o OCR do resto.
+    """
+    from ocr import CONFIGURACAO_PADRAO, PAGINAS_POR_CONVERSAO, ocr_paginas_pdf
+
+    config = config or CONFIGURACAO_PADRAO
+    backend = obter_backend(backend)
+
+    if forcar_ocr:
+        from PyPDF2 import PdfReader
+        paginas = ('' for _ in PdfReader(pdf_path).pages)
+    else:
+        paginas = backend.paginas(pdf_path)
+
+    paginas = enumerate(paginas, 1)
+    while True:
+        lote = list(itertools.islice(paginas, PAGINAS_POR_CONVERSAO))
+        if not lote:
+            return
+        textos_ocr = ocr_paginas_pdf(pdf_path, [n for n, text in lote if not text.strip()], config)
+        for num_pagina, text in lote:
+            if text.strip():
+                yield num_pagina, text, False
+                continue
+            with span('ocr_pagina_pdf', pagina=num_pagina):
+                text = next(textos_ocr)
+            yield num_pagina, text, True
+
+def process_pdf_stream(pdf_path, paginas_sem_numeros=3, backend=None, config=None):
+    """
+    Extrai os números de tombamento página a página e os gera assim que são
+    encontrados (normalizados e sem duplicatas).
+
+    Para antecipadamente quando, depois de já ter encontrado algum número,
+    `paginas_sem_numeros` páginas seguidas não trazem números novos (a tabela
+    terminou e o restante são assinaturas/anexos). Use None para ler tudo.
+    Se a camada de texto não tiver nenhum número, o documento é lido de novo
+    com OCR, como em process_pdf.
+    """
+    for forcar_ocr in (False, True):
+        extrator = ExtratorTombamento()
+        paginas_vazias = 0
+        houve_texto = False
+
+        with span('processamento_pdf_stream', forcar_ocr=forcar_ocr) as registro:
+            for num_pagina, text, usou_ocr in extrair_paginas(pdf_path, backend, config, forcar_ocr):
+                houve_texto = houve_texto or not usou_ocr
+                novos = extrator.alimentar(text, usou_ocr)
+                with rastreador.suspenso(registro):
+                    yield from novos
+
+                if novos:
+                    paginas_vazias = 0
+                elif len(extrator):
+                    paginas_vazias += 1
+
+                if paginas_sem_numeros is not None and paginas_vazias >= paginas_sem_numeros:
+                    print(f'Parando na página {num_pagina}: {paginas_vazias} páginas seguidas sem números.')
+                    registro['parada_antecipada'] = num_pagina
+                    break
+            registro['numeros'] = len(extrator)
+
+        # Só repete com OCR se nenhuma página passou por OCR e nada foi encontrado
+        if len(extrator) or not houve_texto:
+            return
+        print('Nenhum número encontrado no texto direto. Tentando OCR...')
+
+@rastrear('processamento_pdf')
+def process_pdf(pdf_path, output_file='numeros_tombamento.xlsx'):
     """
     Processa o arquivo PDF e extrai os números de tombamento.
     Se não encontrar números no texto direto, tenta OCR.
+    Os números são salvos em `output_file` (None para não salvar).
     """
     try:
         # Lê o conteúdo do PDF
         print('Lendo o arquivo PDF...')
-        content = read_pdf(pdf_path)
+        content, usou_ocr = ler_pdf(pdf_path)
         
         if not content:
             print('Não foi possível extrair texto do PDF.')
             return []
         
         print('Extraindo números de tombamento...')
-        # Extrai os números de tombamento
-        tombamentos = extract_tombamento_numbers(content)
+        # Extrai os números de tombamento (texto de OCR vai direto ao padrão tolerante)
+        tombamentos = extract_tombamento_numbers(content, ocr=usou_ocr)
         
-        # Se não encontrou números, tenta OCR
-        if not tombamentos:
+        # Se não encontrou números no texto direto, tenta OCR (uma vez só)
+        if not tombamentos and not usou_ocr:
             print('Nenhum número encontrado no texto direto. Tentando OCR...')
             content_ocr = extract_text_with_ocr(pdf_path)
             if content_ocr:
-                tombamentos = extract_tombamento_numbers(content_ocr)
+                tombamentos = extract_tombamento_numbers(content_ocr, ocr=True)
         
         # Remove possíveis duplicatas mantendo a ordem
         tombamentos = list(dict.fromkeys(tombamentos))
@@ -121,15 +260,13 @@ def process_pdf(pdf_path):
             print('Nenhum número de tombamento encontrado, mesmo após OCR.')
             return []
         
-        # Cria um DataFrame com os números de tombamento
-        df = pd.DataFrame(tombamentos, columns=['Numero_Tombamento'])
-        
-        # Salva em um arquivo Excel
-        output_file = 'numeros_tombamento.xlsx'
-        df.to_excel(output_file, index=False)
-        
         print(f'\nForam encontrados {len(tombamentos)} números de tombamento únicos.')
-        print(f'Os dados foram salvos em {output_file}')
+
+        if output_file:
+            # Salva em um arquivo Excel
+            df = pd.DataFrame(tombamentos, columns=['Numero_Tombamento'])
+            df.to_excel(output_file, index=False)
+            print(f'Os dados foram salvos em {output_file}')
         
         return tombamentos
         
@@ -154,14 +291,25 @@ if __name__ == "__main__":
 
     
 class SisgepatAutomation:
-    def __init__(self):
+    def __init__(self, base_url=None, headless=False, execucao_id=None):
         """
-        Inicializa o navegador com configurações específicas para Mac ARM
+        Inicializa o navegador com configurações específicas para Mac ARM.
+        `base_url` permite apontar para outro servidor (padrão: SISGEPAT_URL).
+        Os spans da thread que criou a automação ficam com um identificador
+        de execução próprio (ou `execucao_id`, se informado).
         """
+        self.execucao_id = rastreador.nova_execucao(execucao_id)
+        self.base_url = (base_url or SISGEPAT_URL).rstrip('/') + '/'
+        # Credenciais do último login, para refazê-lo se a sessão expirar
+        self._credenciais = None
+        # Números já adicionados ao formulário aberto (repetidos se ele se perder)
+        self.itens_formulario = []
         try:
             # Configurações do Chrome
             chrome_options = webdriver.ChromeOptions()
             chrome_options.add_argument('--start-maximized')
+            if headless:
+                chrome_options.add_argument('--headless=new')
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
             
@@ -180,20 +328,21 @@ class SisgepatAutomation:
             
             for _ in range(3):  # Tenta 3 vezes
                 try:
-                    service = Service(ChromeDriverManager().install())
-                    
-                    # Inicializa o Chrome
-                    self.driver = webdriver.Chrome(
-                        service=service,
-                        options=chrome_options
-                    )
+                    with span('inicializacao_driver'):
+                        service = Service(ChromeDriverManager().install())
+
+                        # Inicializa o Chrome
+                        self.driver = webdriver.Chrome(
+                            service=service,
+                            options=chrome_options
+                        )
                     self.wait = WebDriverWait(self.driver, 10)
                     print("✓ Chrome inicializado com sucesso")
                     break
                     
                 except Exception as e:
                     print(f"Tentativa de inicialização falhou: {str(e)}")
-                    time.sleep(2)
+                    pausa(2)
             else:
                 raise Exception("Não foi possível inicializar o Chrome após 3 tentativas")
                 
@@ -201,39 +350,48 @@ class SisgepatAutomation:
             print(f"Erro fatal ao inicializar Chrome: {str(e)}")
             raise
 
+    def _esperar(self, condicao):
+        """
+        Aguarda uma condição do WebDriverWait registrando o tempo de espera
+        """
+        with span('espera_elemento'):
+            return self.wait.until(condicao)
+
+    @rastrear('login')
     def login(self, cpf, senha, ano="2024"):
         """
         Realiza o login no sistema
         """
+        self._credenciais = (cpf, senha)
         try:
             # Acessa a página
-            self.driver.get("https://sisgepat.fazenda.df.gov.br/")
+            self.driver.get(self.base_url)
             
             # Aguarda e preenche os campos
-            cpf_field = self.wait.until(EC.presence_of_element_located((By.ID, "TxtLogin")))
+            cpf_field = self._esperar(EC.presence_of_element_located((By.ID, "TxtLogin")))
             cpf_field.send_keys(cpf)
 
             # Tenta localizar o campo de senha usando diferentes estratégias
             try:
                 # Primeira tentativa: usando name e type
-                senha_field = self.wait.until(
+                senha_field = self._esperar(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "input[name='TxtSenha'][type='password']"))
                 )
             except:
                 try:
                     # Segunda tentativa: usando apenas o name
-                    senha_field = self.wait.until(
+                    senha_field = self._esperar(
                         EC.presence_of_element_located((By.NAME, "TxtSenha"))
                     )
                 except:
                     # Terceira tentativa: usando a classe e type
-                    senha_field = self.wait.until(
+                    senha_field = self._esperar(
                         EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password'].grid_100"))
                     )
 
             # Limpa e preenche o campo
             senha_field.clear()
-            time.sleep(1)  # Pequena pausa antes de inserir a senha
+            pausa(1)  # Pequena pausa antes de inserir a senha
             senha_field.send_keys(senha)
             
             
@@ -242,7 +400,7 @@ class SisgepatAutomation:
             entrar_button.click()
             
             # Aguarda a página carregar
-            time.sleep(2)
+            pausa(2)
             
             return True
             
@@ -250,14 +408,16 @@ class SisgepatAutomation:
             print(f"Erro no login: {str(e)}")
             return False
         
+    @rastrear('login')
     def login_with_javascript(self, cpf, senha):
         """
         Tenta fazer login usando JavaScript Executor
         """
+        self._credenciais = (cpf, senha)
         try:
             # Acessa a página
-            self.driver.get("https://sisgepat.fazenda.df.gov.br/")
-            time.sleep(3)
+            self.driver.get(self.base_url)
+            pausa(3)
             
             # Insere CPF via JavaScript
             self.driver.execute_script(
@@ -274,13 +434,14 @@ class SisgepatAutomation:
                 'document.getElementById("BtnEnviar").click();'
             )
             
-            time.sleep(3)
+            pausa(3)
             return True
             
         except Exception as e:
             print(f"Erro no login via JavaScript: {str(e)}")
             return False
 
+    @rastrear('navegar_para_dados_gerais')
     def navegar_para_dados_gerais(self):
         """
         Navega até a tela de Dados Gerais
@@ -289,18 +450,18 @@ class SisgepatAutomation:
             try:
                 print("Procurando link PAT...")
                 # Aguarda mais tempo
-                time.sleep(5)
+                pausa(5)
                 
                 # Tenta diferentes estratégias para encontrar o elemento
                 try:
                     # Tenta pelo texto
-                    pat_link = self.wait.until(
+                    pat_link = self._esperar(
                         EC.presence_of_element_located((By.XPATH, "//span[contains(text(), 'PAT')]"))
                     )
                 except:
                     try:
                         # Tenta pela classe
-                        pat_link = self.wait.until(
+                        pat_link = self._esperar(
                             EC.presence_of_element_located((By.CSS_SELECTOR, ".mouseHover.text"))
                         )
                     except:
@@ -322,7 +483,7 @@ class SisgepatAutomation:
                         self.driver.execute_script("arguments[0].click();", parent)
 
                 print("✓ Clicou no PAT")
-                time.sleep(5)  # Aguarda mais tempo após o clique
+                pausa(5)  # Aguarda mais tempo após o clique
                 
             except Exception as e:
                 print(f"Erro ao clicar no PAT: {str(e)}")
@@ -331,24 +492,25 @@ class SisgepatAutomation:
             try:
                 print("Navegando para DGCD - Dados Gerais...")
                 # Navega diretamente para a URL
-                self.driver.get("https://sisgepat.fazenda.df.gov.br/SIGGO/SISGEPAT/Paginas/070_Dados_Gerais/FrmDGComplementar.aspx")
+                self.driver.get(self.base_url + PAGINA_DADOS_GERAIS)
                 
                 # Aguarda a página carregar
-                time.sleep(5)
+                pausa(5)
                 
                 print("✓ Navegou para DGCD - Dados Gerais")
 
                 # Clica no botão Adicionar
                 try:
                     print("Procurando botão Adicionar...")
-                    add_button = self.wait.until(
+                    add_button = self._esperar(
                         EC.element_to_be_clickable((
                             By.ID, "ctl00_ctl00_ctl00_CphBody_CphFormulario_BtnAdicionar"
                         ))
                     )
                     self.driver.execute_script("arguments[0].click();", add_button)
                     print("✓ Clicou em Adicionar")
-                    time.sleep(3)
+                    pausa(3)
+                    self.itens_formulario = []
                     return True
                 
                 except Exception as e:
@@ -362,131 +524,301 @@ class SisgepatAutomation:
             print(f"Erro na navegação: {str(e)}")
             return False
 
-    def preencher_tombamento(self, numero):
+    @rastrear('preencher_tombamento')
+    def _preencher(self, numero):
         """
-        Preenche um número de tombamento
+        Uma tentativa de adicionar o número ao formulário. Lança exceção se
+        falhar; FalhaTombamento('rejeitado') quando o SISGEPAT recusa o
+        número (mensagem com um trecho de MENSAGENS_REJEICAO),
+        FalhaTombamento('mensagem_desconhecida') para outras mensagens e
+        FalhaTombamento('pagina_perdida') quando o postback não volta para o
+        formulário.
         """
+        print(f"Preenchendo tombamento: {numero}")
+
+        # Aguarda um pouco
+        pausa(1)
+
+        # Localiza o campo de tombamento usando o ID exato
+        input_field = self._esperar(EC.presence_of_element_located((By.ID, ID_CAMPO_TOMBAMENTO)))
+
+        # Limpa o campo
+        input_field.clear()
+        pausa(1)
+
+        # Preenche usando JavaScript para garantir
+        self.driver.execute_script(f'document.getElementById("{ID_CAMPO_TOMBAMENTO}").value = "{numero}";')
+
+        # Dispara o evento de mudança para ativar validações do campo
+        self.driver.execute_script(
+            f'document.getElementById("{ID_CAMPO_TOMBAMENTO}").dispatchEvent(new Event("change"));'
+        )
+
+        pausa(1)
+
+        # Procura e clica no botão ">>"
+        add_button = self._esperar(EC.element_to_be_clickable((By.ID, ID_BOTAO_ADICIONAR_ITEM)))
+        self.driver.execute_script("arguments[0].click();", add_button)
+
+        # Espera o postback recarregar a página antes de ler o resultado
         try:
-            print(f"Preenchendo tombamento: {numero}")
-            
-            # Aguarda um pouco
-            time.sleep(1)
-            
-            # Localiza o campo de tombamento usando o ID exato
-            input_field = self.wait.until(
-                EC.presence_of_element_located((
-                    By.ID, "ctl00_ctl00_ctl00_CphBody_CphFormulario_CphFormularioInclusaoAlteracao_TxtTombamento"
-                ))
-            )
-            
-            # Limpa o campo
-            input_field.clear()
-            time.sleep(1)
-            
-            # Preenche usando JavaScript para garantir
-            self.driver.execute_script(
-                f'document.getElementById("ctl00_ctl00_ctl00_CphBody_CphFormulario_CphFormularioInclusaoAlteracao_TxtTombamento").value = "{numero}";'
-            )
-            
-            # Dispara o evento de mudança para ativar validações do campo
-            self.driver.execute_script(
-                'document.getElementById("ctl00_ctl00_ctl00_CphBody_CphFormulario_CphFormularioInclusaoAlteracao_TxtTombamento").dispatchEvent(new Event("change"));'
-            )
-            
-            time.sleep(1)
+            WebDriverWait(self.driver, 10).until(EC.staleness_of(add_button))
+        except TimeoutException:
+            pass
 
-            # Procura e clica no botão ">>"
-            add_button = self.wait.until(
-                EC.element_to_be_clickable((
-                    By.ID, "ctl00_ctl00_ctl00_CphBody_CphFormulario_CphFormularioInclusaoAlteracao_BtnFRecursoAdd"
-                ))
-            )
-            self.driver.execute_script("arguments[0].click();", add_button)
-            
-            print(f"✓ Preencheu tombamento: {numero}")
-            time.sleep(1)
+        mensagens = self.driver.find_elements(By.ID, ID_MENSAGEM)
+        mensagem = mensagens[0].text.strip() if mensagens else ''
+        if mensagem:
+            if any(trecho in normalizar_texto(mensagem) for trecho in MENSAGENS_REJEICAO):
+                raise FalhaTombamento('rejeitado', mensagem)
+            raise FalhaTombamento('mensagem_desconhecida', mensagem)
+        if not self.driver.find_elements(By.ID, ID_CAMPO_TOMBAMENTO):
+            raise FalhaTombamento('pagina_perdida', 'O formulário não voltou depois de adicionar o número')
+
+        self.itens_formulario.append(numero)
+        print(f"✓ Preencheu tombamento: {numero}")
+        pausa(1)
+
+    def preencher_tombamento(self, numero):
+        """
+        Preenche um número de tombamento (uma tentativa)
+        """
+        try:
+            self._preencher(numero)
             return True
-            
         except Exception as e:
             print(f"Erro ao preencher tombamento {numero}: {str(e)}")
             return False
 
-    def processar_tombamentos(self, excel_file, selected_indices=None):
+    def classificar_falha(self, erro):
+        """
+        Classifica a falha de uma tentativa de preenchimento:
+        'rejeitado', 'sessao_expirada', 'pagina_perdida', 'elemento_obsoleto',
+        'tempo_esgotado', 'mensagem_desconhecida' ou 'desconhecida'.
+        """
+        if isinstance(erro, FalhaTombamento):
+            return erro.tipo
+        if isinstance(erro, StaleElementReferenceException):
+            return 'elemento_obsoleto'
+
+        # Onde o navegador está diz se a sessão ou a página se perderam
+        try:
+            if self.driver.find_elements(By.ID, "TxtLogin"):
+                return 'sessao_expirada'
+            if not self.driver.find_elements(By.ID, ID_CAMPO_TOMBAMENTO):
+                return 'pagina_perdida'
+        except Exception:
+            return 'desconhecida'
+
+        if isinstance(erro, TimeoutException):
+            return 'tempo_esgotado'
+        return 'desconhecida'
+
+    def recuperar_formulario(self, tipo):
+        """
+        Refaz login (se a sessão expirou) e a navegação até Dados Gerais e
+        adiciona de novo os números que já estavam no formulário perdido.
+        O formulário novo pode voltar vazio ou com os números ainda guardados
+        no servidor; por isso cada número é adicionado de novo e a resposta
+        "já incluído" (MENSAGENS_JA_INCLUIDO) conta como restaurado.
+        Retorna True se o formulário voltou ao estado anterior.
+        """
+        with span('recuperar_formulario', tipo=tipo):
+            if tipo == 'sessao_expirada':
+                if self._credenciais is None:
+                    print("Sessão expirada e não há credenciais para refazer o login")
+                    return False
+                print("Sessão expirada: refazendo login")
+                if not self.login_with_javascript(*self._credenciais):
+                    return False
+
+            itens = list(self.itens_formulario)
+            if not self.navegar_para_dados_gerais():
+                return False
+
+            try:
+                for numero in itens:
+                    try:
+                        self._preencher(numero)
+                    except FalhaTombamento as e:
+                        mensagem = normalizar_texto(str(e))
+                        if e.tipo != 'rejeitado' or not any(t in mensagem for t in MENSAGENS_JA_INCLUIDO):
+                            raise
+                        self.itens_formulario.append(numero)
+            except Exception as e:
+                print(f"Erro ao restaurar o formulário: {str(e)}")
+                return False
+            print(f"✓ Formulário restaurado com {len(itens)} número(s)")
+            return True
+
+    def preencher_com_retry(self, numero, max_tentativas=None, guarda=None):
+        """
+        Preenche um número tentando de novo, com espera exponencial, as
+        falhas que não são do número: elementos obsoletos e esperas
+        esgotadas são repetidos na mesma página; sessão expirada ou página
+        perdida refazem login e navegação antes da próxima tentativa. Uma
+        rejeição do SISGEPAT não é repetida.
+
+        Com uma `guarda`, as reservas dos números já preenchidos são
+        renovadas a cada tentativa, para não expirarem durante as esperas e
+        a recuperação da sessão.
+
+        Retorna um dicionário com sucesso, tentativas, tipo_falha e
+        mensagem_erro (os dois últimos None em caso de sucesso) e, quando a
+        sessão não pôde ser recuperada, sessao_perdida=True.
+        """
+        max_tentativas = max_tentativas or MAX_TENTATIVAS
+        tipo, mensagem = None, None
+        for tentativa in range(1, max_tentativas + 1):
+            if guarda is not None:
+                guarda.renovar()
+            try:
+                self._preencher(numero)
+                return {'sucesso': True, 'tentativas': tentativa, 'tipo_falha': None, 'mensagem_erro': None}
+            except Exception as e:
+                tipo = self.classificar_falha(e)
+                detalhe = (getattr(e, 'msg', None) or str(e)).strip()
+                detalhe = detalhe.splitlines()[0] if detalhe else type(e).__name__
+                mensagem = f"{tipo}: {detalhe}"
+                print(f"Falha ao preencher {numero} (tentativa {tentativa}/{max_tentativas}): {mensagem}")
+
+            if tipo == 'rejeitado' or tentativa == max_tentativas:
+                break
+
+            pausa(ESPERA_BASE_TENTATIVA * 2 ** (tentativa - 1) * random.uniform(0.8, 1.2))
+            if tipo in FALHAS_DE_SESSAO and not self.recuperar_formulario(tipo):
+                return {'sucesso': False, 'tentativas': tentativa, 'tipo_falha': tipo,
+                        'mensagem_erro': f"{mensagem} (não foi possível recuperar a sessão)",
+                        'sessao_perdida': True}
+
+        return {'sucesso': False, 'tentativas': tentativa, 'tipo_falha': tipo, 'mensagem_erro': mensagem}
+
+    def emitir(self):
+        """
+        Clica em Emitir e confirma o alerta.
+        Lança exceção se algum dos botões não ficar disponível.
+        """
+        with span('emitir'):
+            emitir_button = self._esperar(
+                EC.element_to_be_clickable((
+                    By.ID, "ctl00_ctl00_ctl00_CphBody_CphFormulario_BtnSalvar"
+                ))
+            )
+            self.driver.execute_script("arguments[0].click();", emitir_button)
+
+        # Aguarda e clica no botão Sim do alerta
+        with span('confirmar'):
+            confirmar_button = self._esperar(
+                EC.element_to_be_clickable((By.ID, "btnModalOk"))
+            )
+            self.driver.execute_script("arguments[0].click();", confirmar_button)
+
+    def processar_tombamentos(self, numeros, selected_indices=None, total=None, guarda=None):
+        """
+        Preenche os números de tombamento e emite o documento, gerando um
+        evento por número processado.
+
+        `numeros` pode ser uma lista, um gerador, uma Series/DataFrame com a
+        coluna Numero_Tombamento ou o caminho de um arquivo (.csv, .parquet,
+        .xlsx). Para geradores o total só é conhecido se for informado em
+        `total`; sem ele, 'total' e 'progresso' dos eventos vêm como None.
+
+        Com uma `guarda` (GuardaIdempotencia), cada número é reservado antes
+        de ser preenchido; números já enviados ou reservados por outro
+        processamento geram um evento 'ignorado' e não são preenchidos. Os
+        preenchidos são confirmados como enviados depois do Emitir.
+
+        Cada número passa por preencher_com_retry: os eventos 'processando'
+        trazem também tentativas e tipo_falha, e só falhas definitivas
+        chegam como sucesso=False.
+        """
+        preenchidos = []
         try:
-            # Lê o arquivo Excel
-            df = pd.read_excel(excel_file)
+            numeros = normalizar_entrada_numeros(numeros)
             
-            # Se tiver tombamentos selecionados, filtra o DataFrame
+            # Se tiver tombamentos selecionados, filtra pelas posições
             if selected_indices is not None and len(selected_indices) > 0:
-                df = df.iloc[selected_indices]
-            
-            total = len(df)
-            
+                numeros = list(numeros)
+                numeros = [numeros[i] for i in selected_indices]
             
+            if total is None and hasattr(numeros, '__len__'):
+                total = len(numeros)
             
             # Navega até a tela correta
             if not self.navegar_para_dados_gerais():
                 yield {'status': 'erro', 'mensagem': 'Erro na navegação inicial'}
                 return
             
-            time.sleep(5)
+            pausa(5)
             sucessos = 0
 
             # Para cada número de tombamento
-            for index, row in df.iterrows():
-                numero = row['Numero_Tombamento']
-                
+            for index, numero in enumerate(numeros):
                 if index == 0:
-                    time.sleep(3)
+                    pausa(3)
                 
-                progresso = min((index + 1) / total, 1.0)
+                progresso = min((index + 1) / total, 1.0) if total else None
+
+                if guarda is not None:
+                    motivo = guarda.reservar(numero)
+                    if motivo:
+                        yield {
+                            'status': 'ignorado',
+                            'numero': numero,
+                            'index': index + 1,
+                            'total': total,
+                            'progresso': progresso,
+                            'sucessos': sucessos,
+                            'motivo': motivo
+                        }
+                        continue
                 
-                # Processa o tombamento
-                try:
-                    sucesso = self.preencher_tombamento(numero)
-                    if sucesso:
-                        sucessos += 1
+                # Processa o tombamento (falhas transitórias são repetidas aqui)
+                resultado = self.preencher_com_retry(numero, guarda=guarda)
+                if resultado['sucesso']:
+                    sucessos += 1
+                    preenchidos.append(numero)
 
-                    # Retorna informações do processamento
-                    yield {
-                        'status': 'processando',
-                        'numero': numero,
-                        'index': index + 1,
-                        'total': total,
-                        'progresso': progresso,
-                        'sucessos': sucessos,
-                        'sucesso': sucesso,
-                        'mensagem_erro': None if sucesso else 'Falha no preenchimento'
-                    }
-                    
-                except Exception as e:
+                # Retorna informações do processamento
+                yield {
+                    'status': 'processando',
+                    'numero': numero,
+                    'index': index + 1,
+                    'total': total,
+                    'progresso': progresso,
+                    'sucessos': sucessos,
+                    'sucesso': resultado['sucesso'],
+                    'tentativas': resultado['tentativas'],
+                    'tipo_falha': resultado['tipo_falha'],
+                    'mensagem_erro': resultado['mensagem_erro']
+                }
+
+                if resultado.get('sessao_perdida'):
                     yield {
-                        'status': 'processando',
-                        'numero': numero,
-                        'index': index + 1,
-                        'total': total,
-                        'progresso': progresso,
-                        'sucesso': False,
-                        'sucessos': sucessos,
-                        'mensagem_erro': str(e)
+                        'status': 'erro',
+                        'mensagem': f"Sessão perdida e não recuperada: {resultado['mensagem_erro']}"
                     }
+                    return
                 
-                time.sleep(2)
+                pausa(2)
             
+            if guarda is not None and not preenchidos:
+                yield {
+                    'status': 'concluido',
+                    'total': total,
+                    'sucessos': 0,
+                    'mensagem': 'Nenhum número novo foi preenchido; nada a emitir.'
+                }
+                return
+
              # Após inserir todos, clica em Emitir
             try:
-                emitir_button = self.wait.until(
-                    EC.element_to_be_clickable((
-                        By.ID, "ctl00_ctl00_ctl00_CphBody_CphFormulario_BtnSalvar"
-                    ))
-                )
-                self.driver.execute_script("arguments[0].click();", emitir_button)
-                
-                # Aguarda e clica no botão Sim do alerta
-                confirmar_button = self.wait.until(
-                    EC.element_to_be_clickable((By.ID, "btnModalOk"))
-                )
-                self.driver.execute_script("arguments[0].click();", confirmar_button)
+                if guarda is not None:
+                    # As reservas precisam valer até a confirmação
+                    guarda.renovar(forcar=True)
+                self.emitir()
+                if guarda is not None:
+                    guarda.confirmar(preenchidos)
                 
                 # Informa conclusão
                 yield {
@@ -506,6 +838,9 @@ class SisgepatAutomation:
                 'status': 'erro',
                 'mensagem': f"Erro ao processar arquivo: {str(e)}"
             }
+        finally:
+            if guarda is not None:
+                guarda.liberar()
 
     def close(self):
         """
@@ -515,7 +850,7 @@ class SisgepatAutomation:
             if hasattr(self, 'driver'):
                 # Tenta fechar todas as janelas
                 self.driver.quit()
-                time.sleep(1)  # Pequena pausa para garantir que fechou
+                pausa(1)  # Pequena pausa para garantir que fechou
         except Exception as e:
             print(f"Erro ao fechar navegador: {str(e)}")
             # Tenta forçar o fechamento se necessário
@@ -552,7 +887,7 @@ def main():
             
     finally:
         # Aguarda um pouco antes de fechar
-        time.sleep(5)
+        pausa(5)
         bot.close()
 
 if __name__ == "__main__":